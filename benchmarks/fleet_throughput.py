@@ -0,0 +1,52 @@
+"""
+フリートトラッカのスループットのベンチマーク
+
+ワーカスレッド数を変えて FleetTracker.step の1秒あたりのロボット更新数を比較する
+
+使い方:
+    python benchmarks/fleet_throughput.py [--robots N] [--steps T]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# パスを追加
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.fleet_tracker import FleetTracker
+
+
+def measure(n_workers, n_robots, n_steps):
+    """n_workers スレッドでの1秒あたりのロボット更新数"""
+    rng = np.random.default_rng(0)
+    us = np.column_stack([np.ones(n_robots), np.full(n_robots, 0.2)])
+    zs = rng.normal(size=(n_robots, 3))
+    with FleetTracker(np.eye(3) * 0.01, np.eye(3) * 0.1, dt=0.1, n_workers=n_workers) as tracker:
+        ids = tracker.add_robots(np.zeros((n_robots, 3)), np.eye(3))
+        tracker.step(ids, us, zs)
+        t0 = time.perf_counter()
+        for _ in range(n_steps):
+            tracker.step(ids, us, zs)
+        elapsed = time.perf_counter() - t0
+    return n_robots * n_steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--robots", type=int, default=100_000)
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+
+    n = 1
+    while n <= (os.cpu_count() or 1):
+        rate = measure(n, args.robots, args.steps)
+        print(f"workers={n:<3} {rate / 1e6:8.2f} M updates/s")
+        n *= 2
+
+
+if __name__ == "__main__":
+    main()
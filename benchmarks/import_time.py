@@ -0,0 +1,49 @@
+"""
+インポート時間のベンチマーク
+
+新しいインタプリタで各インポートを実行し、起動時間の中央値を比較する。
+フィルタのみを使うワーカ（src.ExtendedKalmanFilter）は matplotlib を読み込まない
+
+使い方:
+    python benchmarks/import_time.py [--repeat N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# リポジトリのルート（チェックアウトのままで src をインポートできるようにする）
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+CASES = {
+    "python (baseline)": "pass",
+    "import src": "import src",
+    "src.ExtendedKalmanFilter": "import src; src.ExtendedKalmanFilter",
+    "src.visualizer_2d": "import src; src.visualizer_2d",
+}
+
+
+def measure(code, repeat):
+    """新しいプロセスで code を repeat 回実行し、所要時間 (ms) の中央値を返す"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
+        times.append((time.perf_counter() - t0) * 1e3)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for label, code in CASES.items():
+        print(f"{label:<28} {measure(code, args.repeat):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
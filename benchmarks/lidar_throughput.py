@@ -0,0 +1,56 @@
+"""
+LiDAR シミュレーションのスループットのベンチマーク
+
+ランダムな線分地図と占有格子に対する Lidar2D.scan_batch の1秒あたりのビーム数を測る
+
+使い方:
+    python benchmarks/lidar_throughput.py [--segments S] [--beams B] [--poses N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# パスを追加
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.lidar import Lidar2D, OccupancyGrid, SegmentMap
+
+
+def measure(world, n_beams, poses, max_range):
+    """1秒あたりに計算したビーム数"""
+    lidar = Lidar2D(world, n_beams=n_beams, max_range=max_range)
+    lidar.scan_batch(poses[:1])
+    t0 = time.perf_counter()
+    lidar.scan_batch(poses)
+    elapsed = time.perf_counter() - t0
+    return len(poses) * n_beams / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, default=5000)
+    parser.add_argument("--beams", type=int, default=360)
+    parser.add_argument("--poses", type=int, default=500)
+    parser.add_argument("--max-range", type=float, default=30.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    size = 10.0 * np.sqrt(args.segments)
+    start = rng.uniform(0, size, (args.segments, 2))
+    segments = np.hstack([start, start + rng.normal(0, 2, (args.segments, 2))])
+    poses = np.column_stack(
+        [rng.uniform(0, size, (args.poses, 2)), rng.uniform(-np.pi, np.pi, args.poses)]
+    )
+    grid = OccupancyGrid(rng.random((int(size), int(size))) < 0.02, resolution=1.0)
+
+    for name, world in (("segments", SegmentMap(segments)), ("occupancy", grid)):
+        rate = measure(world, args.beams, poses, args.max_range)
+        print(f"{name:<10} {rate / 1e6:8.2f} M beams/s")
+
+
+if __name__ == "__main__":
+    main()
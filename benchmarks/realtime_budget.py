@@ -0,0 +1,76 @@
+"""
+EKF の実時間ループのタイミング計測
+
+ExtendedKalmanFilter.filter_step を目標の周波数で実行し、締め切り超過の回数と
+遅れ・処理時間・ジッタの分位点を表示する
+
+使い方:
+    python benchmarks/realtime_budget.py [--rate HZ] [--duration S] [--policy POLICY]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# パスを追加
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.extended_kf import ExtendedKalmanFilter
+from src.realtime import OVERRUN_POLICIES, RealTimeRunner
+
+
+def _format_us(ns):
+    """ns を µs 表記の文字列に変換（None は "n/a"）"""
+    if ns is None:
+        return f"{'n/a':>11}"
+    return f"{ns / 1e3:8.1f} us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rate", type=float, default=1000.0)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--policy", choices=OVERRUN_POLICIES, default="catch_up")
+    args = parser.parse_args()
+
+    dt = 1.0 / args.rate
+    n = int(args.rate * args.duration)
+    zs = np.random.default_rng(0).normal(size=(n, 3))
+    ekf = ExtendedKalmanFilter(
+        Q=np.diag([0.01, 0.01, 0.001]),
+        R=np.diag([0.1, 0.1, 0.01]),
+        x0=np.zeros(3),
+        P0=np.eye(3),
+        dt=dt,
+    )
+    u = np.array([1.0, 0.1])
+
+    def step(k, n_ticks):
+        # まとめたティックは予測のみ進め、最新の観測で更新する
+        for _ in range(n_ticks - 1):
+            ekf.predict(u)
+        ekf.filter_step(zs[k], u)
+
+    runner = RealTimeRunner(step, args.rate, overrun_policy=args.policy)
+    runner.run(duration=args.duration)
+    summary = runner.summary()
+
+    print(
+        f"rate={args.rate:g} Hz  period={summary['period_ns'] / 1e3:.1f} us  policy={args.policy}"
+    )
+    print(
+        f"ticks={summary['ticks']}  calls={summary['calls']}  overruns={summary['overruns']}  "
+        f"skipped={summary['skipped']}  coalesced={summary['coalesced']}"
+    )
+    print(f"overrun fraction={summary['overrun_fraction']:.4f}")
+    for name in ("latency", "execution", "jitter"):
+        s = summary[name]
+        # サンプルがない場合（1回しか呼び出していないときのジッタなど）は None
+        p50, p99, peak = (_format_us(s[key]) for key in ("p50_ns", "p99_ns", "max_ns"))
+        print(f"{name:<10} p50={p50}  p99={p99}  max={peak}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Kalman filter robot simulation package
+
+公開 API は初回アクセス時にサブモジュールを読み込む（遅延インポート）。
+フィルタのみを使うワーカプロセスでは matplotlib を読み込まない。
+
+インストールしたパッケージは kf_robot_sim としてインポートする
+（リポジトリのチェックアウトでは同じモジュールを src としてもインポートできる）
+"""
+
+import importlib
+
+__version__ = "0.1.0"
+
+# 公開名 -> 定義しているサブモジュール
+_EXPORTS = {
+    "LinearKalmanFilter": "linear_kf",
+    "BatchLinearKalmanFilter": "linear_kf",
+    "MatrixKalmanFilter": "matrix_kf",
+    "solve_dare": "matrix_kf",
+    "ExtendedKalmanFilter": "extended_kf",
+    "CompactLinearKalmanFilter": "compact_filters",
+    "CompactEKF": "compact_filters",
+    "MultiSensorEKF": "multi_sensor_ekf",
+    "Sensor": "multi_sensor_ekf",
+    "DelayedMeasurementEKF": "delayed_ekf",
+    "FixedLagSmoother": "fixed_lag_smoother",
+    "ExtendedInformationFilter": "information_filter",
+    "IMMFilter": "imm",
+    "EKFSLAM": "ekf_slam",
+    "AdaptiveNoiseEstimator": "adaptive_noise",
+    "fit_noise_em": "adaptive_noise",
+    "tune_noise_parameters": "tuning",
+    "DatasetCache": "dataset_cache",
+    "FleetTracker": "fleet_tracker",
+    "SharedFleetState": "shared_state",
+    "RealTimeRunner": "realtime",
+    "MultiTargetTracker": "multi_target_tracker",
+    "Robot1D": "robot_simulator",
+    "Robot2D": "robot_2d_simulator",
+    "RingBuffer": "ring_buffer",
+    "Lidar2D": "lidar",
+    "SegmentMap": "lidar",
+    "OccupancyGrid": "lidar",
+}
+
+# 遅延インポートするサブモジュール（visualizer 系は matplotlib を読み込む）
+_SUBMODULES = {
+    "adaptive_noise",
+    "backends",
+    "checkpoint",
+    "compact_filters",
+    "dataset_cache",
+    "delayed_ekf",
+    "ekf_slam",
+    "extended_kf",
+    "fixed_lag_smoother",
+    "fleet_tracker",
+    "gating",
+    "imm",
+    "information_filter",
+    "lidar",
+    "linear_kf",
+    "matrix_kf",
+    "motion_models",
+    "multi_sensor_ekf",
+    "multi_target_tracker",
+    "profiling",
+    "realtime",
+    "ring_buffer",
+    "robot_2d_simulator",
+    "robot_simulator",
+    "shared_state",
+    "tuning",
+    "visualizer",
+    "visualizer_2d",
+}
+
+__all__ = sorted(_EXPORTS) + sorted(_SUBMODULES)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        value = getattr(module, name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # 2回目以降は通常の属性参照になるようキャッシュ
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,214 @@
+import numpy as np
+
+
+class AdaptiveNoiseEstimator:
+    """
+    イノベーション統計による Q, R のオンライン推定（共分散マッチング）
+
+    C = E[y y^T]（イノベーションの標本共分散）として
+        R = C - H P^- H^T
+        Q = K C K^T
+    を推定する。統計量は指数重み付き平均、または固定長ウィンドウの
+    累積和（最古の要素を差し引く）として保持し、1ステップあたり O(1) で更新する
+    """
+
+    def __init__(self, alpha=0.05, window=None, adapt_Q=True, adapt_R=True, min_variance=1e-9):
+        """
+        Parameters
+        ----------
+        alpha : float
+            指数重み付き平均の忘却係数（window を指定した場合は無視）
+        window : int, optional
+            ウィンドウ長（指定した場合は直近 window ステップの単純平均）
+        adapt_Q : bool
+            Q を推定するかどうか
+        adapt_R : bool
+            R を推定するかどうか
+        min_variance : float
+            推定した共分散の固有値の下限
+        """
+        if window is not None and window < 1:
+            raise ValueError("window must be >= 1")
+        if window is None and not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.window = window
+        self.adapt_Q = adapt_Q
+        self.adapt_R = adapt_R
+        self.min_variance = min_variance
+        self.reset()
+
+    def reset(self):
+        """蓄積した統計量を破棄"""
+        self.n = 0
+        self.C = None  # E[y y^T]
+        self.HPHt = None  # E[H P^- H^T]
+        self._buffer = None
+        self._sum = None
+
+    def step(self, innovation, HPHt, K, Q, R):
+        """
+        1ステップ分のイノベーションで統計量と Q, R の推定値を更新
+
+        Parameters
+        ----------
+        innovation : float or ndarray, shape (m,)
+            イノベーション y = z - h(x^-)
+        HPHt : float or ndarray, shape (m, m)
+            予測共分散の観測空間への射影 H P^- H^T
+        K : float or ndarray, shape (n, m)
+            カルマンゲイン
+        Q : float or ndarray, shape (n, n)
+            現在の Q（adapt_Q=False の場合はそのまま返す）
+        R : float or ndarray, shape (m, m)
+            現在の R（adapt_R=False の場合はそのまま返す）
+
+        Returns
+        -------
+        Q : float or ndarray
+            推定した Q（入力がスカラーの場合はスカラー）
+        R : float or ndarray
+            推定した R（入力がスカラーの場合はスカラー）
+        """
+        scalar = np.ndim(innovation) == 0
+        y = np.atleast_1d(np.asarray(innovation, dtype=float))
+        outer = y[:, None] * y[None, :]
+        HPHt = np.atleast_2d(np.asarray(HPHt, dtype=float))
+
+        if self.window is None:
+            if self.C is None:
+                self.C = outer.copy()
+                self.HPHt = HPHt.copy()
+            else:
+                a = self.alpha
+                self.C += a * (outer - self.C)
+                self.HPHt += a * (HPHt - self.HPHt)
+        else:
+            # [y y^T, H P H^T] の組をリングバッファと累積和で保持
+            buffer, total = self._buffer, self._sum
+            if buffer is None or total is None:
+                m = len(y)
+                buffer = self._buffer = np.zeros((self.window, 2, m, m))
+                total = self._sum = np.zeros((2, m, m))
+            i = self.n % self.window
+            total[0] += outer - buffer[i, 0]
+            total[1] += HPHt - buffer[i, 1]
+            buffer[i, 0] = outer
+            buffer[i, 1] = HPHt
+            count = min(self.n + 1, self.window)
+            self.C = total[0] / count
+            self.HPHt = total[1] / count
+        self.n += 1
+
+        if self.adapt_R:
+            R = self._clip(self.C - self.HPHt)
+        if self.adapt_Q:
+            K = np.atleast_2d(np.asarray(K, dtype=float))
+            Q = self._clip(K @ self.C @ K.T)
+        if scalar:
+            return float(np.squeeze(Q)), float(np.squeeze(R))
+        return Q, R
+
+    def _clip(self, A):
+        """対称化し、固有値を min_variance 以上に制限"""
+        A = 0.5 * (A + A.T)
+        if A.shape == (1, 1):
+            return np.maximum(A, self.min_variance)
+        w, V = np.linalg.eigh(A)
+        return (V * np.maximum(w, self.min_variance)) @ V.T
+
+
+def fit_noise_em(zs, us=0.0, Q0=1.0, R0=1.0, x0=0.0, P0=1.0, n_iter=20, tol=1e-6):
+    """
+    1次元ランダムウォークモデルの Q, R を EM 法で一括推定（最尤推定）
+
+    状態方程式: x_k = x_{k-1} + u_k + w_k  (w_k ~ N(0, Q))
+    観測方程式: z_k = x_k + v_k  (v_k ~ N(0, R))
+
+    各反復でカルマンフィルタと RTS 平滑化をチャネル方向にベクトル化して実行する
+
+    Parameters
+    ----------
+    zs : array-like, shape (T,) or (T, C)
+        観測値の系列（NaN は欠損）
+    us : float or array-like, broadcastable to (T, C)
+        制御入力の系列
+    Q0 : float or ndarray, shape (C,)
+        Q の初期値
+    R0 : float or ndarray, shape (C,)
+        R の初期値
+    x0 : float or ndarray, shape (C,)
+        初期状態の平均
+    P0 : float or ndarray, shape (C,)
+        初期状態の分散
+    n_iter : int
+        最大反復回数
+    tol : float
+        対数尤度の改善量がこれ未満になったら終了
+
+    Returns
+    -------
+    Q : ndarray, shape (C,) or float
+        推定したプロセスノイズの分散
+    R : ndarray, shape (C,) or float
+        推定した観測ノイズの分散
+    log_likelihoods : list of float
+        各反復の対数尤度（全チャネルの和）
+    """
+    zs = np.asarray(zs, dtype=float)
+    squeeze = zs.ndim == 1
+    if squeeze:
+        zs = zs[:, None]
+    T, C = zs.shape
+    us = np.broadcast_to(np.asarray(us, dtype=float), (T, C))
+    observed = ~np.isnan(zs)
+    n_obs = np.maximum(observed.sum(axis=0), 1)
+    Q = np.array(np.broadcast_to(Q0, (C,)), dtype=float)
+    R = np.array(np.broadcast_to(R0, (C,)), dtype=float)
+    x0 = np.broadcast_to(np.asarray(x0, dtype=float), (C,))
+    P0 = np.broadcast_to(np.asarray(P0, dtype=float), (C,))
+
+    x_pred = np.empty((T, C))
+    P_pred = np.empty((T, C))
+    x_filt = np.empty((T + 1, C))
+    P_filt = np.empty((T + 1, C))
+    log_likelihoods = []
+
+    for _ in range(n_iter):
+        # E ステップ（前向き）: カルマンフィルタ
+        x_filt[0] = x0
+        P_filt[0] = P0
+        ll = 0.0
+        for k in range(T):
+            x_pred[k] = x_filt[k] + us[k]
+            P_pred[k] = P_filt[k] + Q
+            S = P_pred[k] + R
+            K = np.where(observed[k], P_pred[k] / S, 0.0)
+            y = np.where(observed[k], zs[k] - x_pred[k], 0.0)
+            x_filt[k + 1] = x_pred[k] + K * y
+            P_filt[k + 1] = (1.0 - K) * P_pred[k]
+            ll += -0.5 * np.sum(observed[k] * (np.log(2 * np.pi * S) + y * y / S))
+        log_likelihoods.append(float(ll))
+
+        # E ステップ（後ろ向き）: RTS 平滑化とラグ1共分散
+        x_s = x_filt.copy()
+        P_s = P_filt.copy()
+        P_lag = np.empty((T, C))  # Cov(x_k, x_{k-1} | z_1..T), k = 1..T
+        for k in range(T - 1, -1, -1):
+            J = P_filt[k] / P_pred[k]
+            x_s[k] = x_filt[k] + J * (x_s[k + 1] - x_pred[k])
+            P_s[k] = P_filt[k] + J * J * (P_s[k + 1] - P_pred[k])
+            P_lag[k] = J * P_s[k + 1]
+
+        # M ステップ
+        dx = x_s[1:] - x_s[:-1] - us
+        Q = np.mean(dx * dx + P_s[1:] + P_s[:-1] - 2.0 * P_lag, axis=0)
+        res = np.where(observed, zs - x_s[1:], 0.0)
+        R = np.sum(observed * (res * res + P_s[1:]), axis=0) / n_obs
+
+        if len(log_likelihoods) > 1 and abs(log_likelihoods[-1] - log_likelihoods[-2]) < tol:
+            break
+
+    if squeeze:
+        return float(Q[0]), float(R[0]), log_likelihoods
+    return Q, R, log_likelihoods
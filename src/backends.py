@@ -0,0 +1,435 @@
+"""
+系列・フリート単位のフィルタ計算のバックエンド
+
+時間方向の再帰は並列化できないため、系列全体（とロボット群全体）の
+予測・更新ループを1つのカーネルとして実行する。
+
+    numpy: LinearKalmanFilter / ExtendedKalmanFilter と同じ NumPy の計算
+           （フリートはロボット方向にベクトル化）
+    numba: Numba がインストールされている場合、ループカーネルをネイティブ
+           コードにコンパイル（フリートはロボット方向に prange で並列化）
+
+既定（backend=None または "auto"）では numba が使えれば numba、
+なければ numpy を選ぶ
+"""
+
+import math
+
+import numpy as np
+
+from .extended_kf import ExtendedKalmanFilter
+from .linear_kf import BatchLinearKalmanFilter
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba は任意の依存
+    numba = None
+
+prange = numba.prange if numba is not None else range
+
+
+# ---------------------------------------------------------------------------
+# ループカーネル（Numba でコンパイル可能な形。Numba がない場合は Python で実行）
+# ---------------------------------------------------------------------------
+
+
+def _wrap(angle):
+    """角度を [-pi, pi] の範囲に正規化"""
+    while angle > math.pi:
+        angle -= 2 * math.pi
+    while angle < -math.pi:
+        angle += 2 * math.pi
+    return angle
+
+
+def _linear_sequence_loop(zs, us, Q, R, x0, P0, xs, Ks):
+    """(T, C) の1次元フィルタ系列（NaN は予測のみ）"""
+    T, C = zs.shape
+    for c in range(C):
+        x = x0[c]
+        P = P0[c]
+        for k in range(T):
+            x += us[k, c]
+            P += Q[c]
+            z = zs[k, c]
+            K = 0.0
+            if z == z:
+                K = P / (P + R[c])
+                x += K * (z - x)
+                P = (1.0 - K) * P
+            xs[k, c] = x
+            Ks[k, c] = K
+
+
+def _ekf_run(zs, us, Q, R, dt, x, P, xs, Ps):
+    """
+    1台分の EKF 系列（x, P はその場で更新）
+
+    ExtendedKalmanFilter の既定設定と同じく、欠損成分 (NaN) は
+    観測行列とノイズ共分散をマスクして扱う
+    """
+    T = zs.shape[0]
+    m = np.empty(3)
+    y = np.empty(3)
+    S = np.empty((3, 3))
+    K = np.empty((3, 3))
+    KP = np.empty((3, 3))
+    for k in range(T):
+        # 予測: オイラー積分
+        v = us[k, 0]
+        omega = us[k, 1]
+        c = math.cos(x[2])
+        s = math.sin(x[2])
+        a = -v * s * dt
+        b = v * c * dt
+        x[0] += v * c * dt
+        x[1] += v * s * dt
+        x[2] = _wrap(x[2] + omega * dt)
+
+        # P = F*P*F^T + Q（F = I + a*e0*e2^T + b*e1*e2^T）
+        for j in range(3):
+            P[0, j] += a * P[2, j]
+            P[1, j] += b * P[2, j]
+        for i in range(3):
+            P[i, 0] += a * P[i, 2]
+            P[i, 1] += b * P[i, 2]
+        for i in range(3):
+            for j in range(3):
+                P[i, j] += Q[i, j]
+
+        # 更新: H = M = diag(observed), R' = M*R*M + (I - M)
+        for i in range(3):
+            z = zs[k, i]
+            if z == z:
+                m[i] = 1.0
+                y[i] = z - x[i]
+            else:
+                m[i] = 0.0
+                y[i] = 0.0
+        y[2] = _wrap(y[2])
+        for i in range(3):
+            for j in range(3):
+                S[i, j] = m[i] * m[j] * (P[i, j] + R[i, j])
+            S[i, i] += 1.0 - m[i]
+
+        # S の逆行列（余因子展開）
+        c00 = S[1, 1] * S[2, 2] - S[1, 2] * S[2, 1]
+        c01 = S[1, 2] * S[2, 0] - S[1, 0] * S[2, 2]
+        c02 = S[1, 0] * S[2, 1] - S[1, 1] * S[2, 0]
+        inv_det = 1.0 / (S[0, 0] * c00 + S[0, 1] * c01 + S[0, 2] * c02)
+        i00 = c00 * inv_det
+        i01 = (S[0, 2] * S[2, 1] - S[0, 1] * S[2, 2]) * inv_det
+        i02 = (S[0, 1] * S[1, 2] - S[0, 2] * S[1, 1]) * inv_det
+        i10 = c01 * inv_det
+        i11 = (S[0, 0] * S[2, 2] - S[0, 2] * S[2, 0]) * inv_det
+        i12 = (S[0, 2] * S[1, 0] - S[0, 0] * S[1, 2]) * inv_det
+        i20 = c02 * inv_det
+        i21 = (S[0, 1] * S[2, 0] - S[0, 0] * S[2, 1]) * inv_det
+        i22 = (S[0, 0] * S[1, 1] - S[0, 1] * S[1, 0]) * inv_det
+
+        # K = P*M*S^(-1)
+        for i in range(3):
+            h0 = P[i, 0] * m[0]
+            h1 = P[i, 1] * m[1]
+            h2 = P[i, 2] * m[2]
+            K[i, 0] = h0 * i00 + h1 * i10 + h2 * i20
+            K[i, 1] = h0 * i01 + h1 * i11 + h2 * i21
+            K[i, 2] = h0 * i02 + h1 * i12 + h2 * i22
+
+        # x = x + K*y, P = (I - K*M)*P
+        for i in range(3):
+            x[i] += K[i, 0] * y[0] + K[i, 1] * y[1] + K[i, 2] * y[2]
+        x[2] = _wrap(x[2])
+        for i in range(3):
+            for j in range(3):
+                KP[i, j] = (
+                    K[i, 0] * m[0] * P[0, j] + K[i, 1] * m[1] * P[1, j] + K[i, 2] * m[2] * P[2, j]
+                )
+        for i in range(3):
+            for j in range(3):
+                P[i, j] -= KP[i, j]
+
+        xs[k] = x
+        if Ps is not None:
+            Ps[k] = P
+
+
+def _ekf_fleet_loop(zs, us, Q, R, dt, x, P, xs):
+    """(T, N) のロボット群の EKF 系列（ロボット方向に並列）"""
+    N = zs.shape[1]
+    for n in prange(N):
+        _ekf_run(zs[:, n], us[:, n], Q, R, dt, x[n], P[n], xs[:, n], None)
+
+
+if numba is not None:
+    _wrap = numba.njit(cache=True)(_wrap)
+    _linear_sequence_loop = numba.njit(cache=True)(_linear_sequence_loop)
+    _ekf_run = numba.njit(cache=True)(_ekf_run)
+    _ekf_fleet_loop = numba.njit(cache=True, parallel=True)(_ekf_fleet_loop)
+
+
+# ---------------------------------------------------------------------------
+# バックエンド
+# ---------------------------------------------------------------------------
+
+
+class Backend:
+    """
+    系列・フリート計算の実装の組
+
+    Attributes
+    ----------
+    name : str
+        バックエンド名
+    linear_sequence : callable
+        (zs, us, Q, R, x0, P0) -> (xs, Ks)
+    ekf_sequence : callable
+        (zs, us, Q, R, x0, P0, dt) -> (xs, Ps)
+    ekf_fleet : callable
+        (zs, us, Q, R, x0, P0, dt) -> (xs, P)
+    """
+
+    def __init__(self, name, linear_sequence, ekf_sequence, ekf_fleet):
+        self.name = name
+        self.linear_sequence = linear_sequence
+        self.ekf_sequence = ekf_sequence
+        self.ekf_fleet = ekf_fleet
+
+
+def _numpy_linear_sequence(zs, us, Q, R, x0, P0):
+    kf = BatchLinearKalmanFilter(Q=Q, R=R, x0=x0, P0=P0)
+    return kf.filter_sequence(zs, us)
+
+
+def _numpy_ekf_sequence(zs, us, Q, R, x0, P0, dt):
+    ekf = ExtendedKalmanFilter(Q=Q, R=R, x0=x0.copy(), P0=P0.copy(), dt=dt)
+    return ekf.filter_sequence(zs, us)
+
+
+def ekf_fleet_step(x, P, z, u, Q, R, dt):
+    """
+    N 台のロボットの EKF の予測と更新を1ステップ分まとめて実行（NumPy）
+
+    ロボット方向にベクトル化した NumPy 演算のみで計算する
+
+    Parameters
+    ----------
+    x : ndarray, shape (N, 3)
+        状態推定値（その場で更新）
+    P : ndarray, shape (N, 3, 3)
+        誤差共分散（その場で更新）
+    z : ndarray, shape (N, 3)
+        観測値（NaN は欠損）
+    u : ndarray, shape (N, 2)
+        制御入力 [v, omega]
+    Q, R : ndarray, shape (3, 3)
+        プロセスノイズ・観測ノイズの共分散行列
+    dt : float
+        時間ステップ (s)
+    """
+    N = x.shape[0]
+    eye = np.eye(3)
+
+    # 予測
+    v = u[:, 0]
+    omega = u[:, 1]
+    c = np.cos(x[:, 2])
+    s = np.sin(x[:, 2])
+    x[:, 0] += v * c * dt
+    x[:, 1] += v * s * dt
+    x[:, 2] = (x[:, 2] + omega * dt + np.pi) % (2 * np.pi) - np.pi
+    F = np.broadcast_to(eye, (N, 3, 3)).copy()
+    F[:, 0, 2] = -v * s * dt
+    F[:, 1, 2] = v * c * dt
+    P[...] = F @ P @ F.transpose(0, 2, 1) + Q
+
+    # 更新（欠損成分はマスク）
+    observed = ~np.isnan(z)
+    m = observed.astype(float)
+    mm = m[:, :, None] * m[:, None, :]
+    y = np.where(observed, z - x, 0.0)
+    y[:, 2] = (y[:, 2] + np.pi) % (2 * np.pi) - np.pi
+    S = mm * (P + R) + (1.0 - m)[:, :, None] * eye
+    K = (P * m[:, None, :]) @ np.linalg.inv(S)
+    x += np.einsum("nij,nj->ni", K, y)
+    x[:, 2] = (x[:, 2] + np.pi) % (2 * np.pi) - np.pi
+    P -= K @ (m[:, :, None] * P)
+
+
+def _numpy_ekf_fleet(zs, us, Q, R, x0, P0, dt):
+    T, N = zs.shape[:2]
+    x = x0.copy()
+    P = P0.copy()
+    xs = np.empty((T, N, 3))
+    for k in range(T):
+        ekf_fleet_step(x, P, zs[k], us[k], Q, R, dt)
+        xs[k] = x
+    return xs, P
+
+
+def _loop_linear_sequence(zs, us, Q, R, x0, P0):
+    T, C = zs.shape
+    xs = np.empty((T, C))
+    Ks = np.empty((T, C))
+    _linear_sequence_loop(zs, us, Q, R, x0, P0, xs, Ks)
+    return xs, Ks
+
+
+def _loop_ekf_sequence(zs, us, Q, R, x0, P0, dt):
+    T = zs.shape[0]
+    xs = np.empty((T, 3))
+    Ps = np.empty((T, 3, 3))
+    _ekf_run(zs, us, Q, R, dt, x0.copy(), P0.copy(), xs, Ps)
+    return xs, Ps
+
+
+def _loop_ekf_fleet(zs, us, Q, R, x0, P0, dt):
+    T, N = zs.shape[:2]
+    xs = np.empty((T, N, 3))
+    P = P0.copy()
+    _ekf_fleet_loop(zs, us, Q, R, dt, x0.copy(), P, xs)
+    return xs, P
+
+
+BACKENDS: dict = {}
+
+
+def register_backend(backend):
+    """
+    バックエンドを登録
+
+    Parameters
+    ----------
+    backend : Backend
+        登録するバックエンド（同名のものは置き換える）
+    """
+    BACKENDS[backend.name] = backend
+
+
+register_backend(Backend("numpy", _numpy_linear_sequence, _numpy_ekf_sequence, _numpy_ekf_fleet))
+if numba is not None:
+    register_backend(Backend("numba", _loop_linear_sequence, _loop_ekf_sequence, _loop_ekf_fleet))
+
+
+def get_backend(name=None):
+    """
+    バックエンドを取得
+
+    Parameters
+    ----------
+    name : str, optional
+        バックエンド名（None または "auto" の場合は numba、なければ numpy）
+
+    Returns
+    -------
+    backend : Backend
+        バックエンド
+    """
+    if name is None or name == "auto":
+        return BACKENDS.get("numba", BACKENDS["numpy"])
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown or unavailable backend: {name} (available: {sorted(BACKENDS)})"
+        ) from None
+
+
+def linear_sequence(zs, us=0.0, Q=1.0, R=1.0, x0=0.0, P0=1.0, backend=None):
+    """
+    独立な1次元線形カルマンフィルタ群の系列をまとめて処理
+
+    Parameters
+    ----------
+    zs : array-like, shape (T, C)
+        観測値の系列（NaN は予測のみ）
+    us : float or array-like, broadcastable to (T, C)
+        制御入力の系列
+    Q, R, x0, P0 : float or array-like, shape (C,)
+        プロセスノイズ・観測ノイズの共分散、初期推定値・初期誤差共分散
+    backend : str, optional
+        バックエンド名
+
+    Returns
+    -------
+    xs : ndarray, shape (T, C)
+        推定値の系列
+    Ks : ndarray, shape (T, C)
+        カルマンゲインの系列
+    """
+    zs = np.asarray(zs, dtype=float)
+    shape = zs.shape
+    C = shape[1]
+    us = np.ascontiguousarray(np.broadcast_to(us, shape), dtype=float)
+    params = [np.ascontiguousarray(np.broadcast_to(a, (C,)), dtype=float) for a in (Q, R, x0, P0)]
+    return get_backend(backend).linear_sequence(zs, us, *params)
+
+
+def ekf_sequence(zs, us, Q, R, x0, P0, dt=1.0, backend=None):
+    """
+    2Dロボット1台分の EKF 系列をまとめて処理
+
+    ExtendedKalmanFilter の既定設定（オイラー積分、ゲーティングなし）と同じ計算
+
+    Parameters
+    ----------
+    zs : array-like, shape (T, 3)
+        観測値の系列（NaN は欠損）
+    us : array-like, shape (T, 2)
+        制御入力の系列
+    Q, R, P0 : array-like, shape (3, 3)
+        プロセスノイズ・観測ノイズ・初期誤差の共分散行列
+    x0 : array-like, shape (3,)
+        初期状態
+    dt : float
+        時間ステップ (s)
+    backend : str, optional
+        バックエンド名
+
+    Returns
+    -------
+    xs : ndarray, shape (T, 3)
+        状態推定値の系列
+    Ps : ndarray, shape (T, 3, 3)
+        誤差共分散の系列
+    """
+    args = [np.ascontiguousarray(a, dtype=float) for a in (zs, us, Q, R, x0, P0)]
+    return get_backend(backend).ekf_sequence(*args, float(dt))
+
+
+def ekf_fleet(zs, us, Q, R, x0, P0, dt=1.0, backend=None):
+    """
+    N 台のロボットの EKF 系列をまとめて処理
+
+    Parameters
+    ----------
+    zs : array-like, shape (T, N, 3)
+        観測値の系列（NaN は欠損）
+    us : array-like, shape (T, N, 2)
+        制御入力の系列
+    Q, R : array-like, shape (3, 3)
+        プロセスノイズ・観測ノイズの共分散行列（全ロボット共通）
+    x0 : array-like, shape (N, 3)
+        初期状態
+    P0 : array-like, shape (3, 3) or (N, 3, 3)
+        初期誤差共分散行列
+    dt : float
+        時間ステップ (s)
+    backend : str, optional
+        バックエンド名
+
+    Returns
+    -------
+    xs : ndarray, shape (T, N, 3)
+        状態推定値の系列
+    P : ndarray, shape (N, 3, 3)
+        最終ステップの誤差共分散
+    """
+    zs = np.ascontiguousarray(zs, dtype=float)
+    N = zs.shape[1]
+    us = np.ascontiguousarray(us, dtype=float)
+    Q = np.ascontiguousarray(Q, dtype=float)
+    R = np.ascontiguousarray(R, dtype=float)
+    x0 = np.ascontiguousarray(x0, dtype=float)
+    P0 = np.array(np.broadcast_to(P0, (N, 3, 3)), dtype=float)
+    return get_backend(backend).ekf_fleet(zs, us, Q, R, x0, P0, float(dt))
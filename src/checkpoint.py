@@ -0,0 +1,368 @@
+"""
+フィルタ・シミュレータの状態のチェックポイント（バイナリスナップショット）
+
+履歴リストなどは含めず、動作に必要な状態（x, P, Q, R, dt、乱数状態、
+履歴カーソル）のみを固定レイアウトの float64 配列として保存する。
+
+フォーマット（リトルエンディアン）:
+    ヘッダ (16 bytes): magic "KFCP", version (uint16), type (uint8),
+                       flags (uint8), count (uint32), padding
+    乱数状態 (flags & 1 の場合, 2520 bytes): MT19937 の key (uint32 x 624),
+                       pos (int64), has_gauss (int64), cached_gaussian (float64)
+    ペイロード: float64 配列 shape (count, record_size)
+
+フリート（同じ型のオブジェクトの列）はペイロードの行として1つのバッファにまとめる
+"""
+
+import struct
+
+import numpy as np
+
+from .extended_kf import ExtendedKalmanFilter
+from .linear_kf import LinearKalmanFilter
+from .ring_buffer import RingBuffer
+from .robot_2d_simulator import Robot2D
+from .robot_simulator import Robot1D
+
+MAGIC = b"KFCP"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHBBI4x")
+_RNG_TAIL = struct.Struct("<qqd")
+_RNG_KEY_SIZE = 624
+_RNG_SIZE = 4 * _RNG_KEY_SIZE + _RNG_TAIL.size
+_FLAG_RNG = 1
+
+
+def _history_cursor(history):
+    """履歴の追加数"""
+    if history is None:
+        return 0
+    if isinstance(history, RingBuffer):
+        return history.total
+    return len(history)
+
+
+def _rewind(history, cursor):
+    """履歴を追加数 cursor の時点まで巻き戻す"""
+    if isinstance(history, RingBuffer):
+        history.truncate(cursor)
+    elif history is not None:
+        del history[cursor:]
+
+
+def _history_length(obj):
+    """履歴カーソル（これまでに記録した状態の数）"""
+    if isinstance(obj, Robot1D):
+        return len(obj.position_history)
+    return _history_cursor(obj.state_history)
+
+
+def _truncate_history(obj, cursor):
+    """履歴をカーソル位置まで巻き戻す"""
+    cursor = int(cursor)
+    if isinstance(obj, Robot1D):
+        del obj.position_history[cursor:]
+        del obj.observation_history[cursor:]
+    else:
+        # 観測は記録しない設定の場合があるため、状態の履歴との差を保って巻き戻す
+        lag = _history_cursor(obj.state_history) - _history_cursor(obj.observation_history)
+        _rewind(obj.state_history, cursor)
+        _rewind(obj.observation_history, max(cursor - lag, 0))
+
+
+class _Layout:
+    """型ごとのレコードレイアウト"""
+
+    def __init__(self, code, cls, fields, factory, has_history=False):
+        self.code = code
+        self.cls = cls
+        self.fields = []
+        offset = 0
+        for name, shape in fields:
+            size = int(np.prod(shape, dtype=int))
+            self.fields.append((name, shape, offset, offset + size))
+            offset += size
+        self.history_index = offset if has_history else None
+        self.size = offset + (1 if has_history else 0)
+        self.factory = factory
+
+    def pack(self, obj, row):
+        """オブジェクトの状態をレコード row に書き込む"""
+        for name, _, a, b in self.fields:
+            row[a:b] = np.ravel(getattr(obj, name))
+        if self.history_index is not None:
+            row[self.history_index] = _history_length(obj)
+
+    def unpack(self, row, obj):
+        """レコード row の状態をオブジェクトに書き込む（配列はその場で上書き）"""
+        for name, shape, a, b in self.fields:
+            current = getattr(obj, name, None)
+            if isinstance(current, np.ndarray) and current.shape == shape:
+                current[...] = row[a:b].reshape(shape)
+            elif shape == ():
+                setattr(obj, name, float(row[a]))
+            else:
+                setattr(obj, name, row[a:b].reshape(shape).copy())
+        if self.history_index is not None:
+            _truncate_history(obj, row[self.history_index])
+
+    def create(self, row):
+        """レコード row から新しいオブジェクトを生成"""
+        values = {name: row[a:b].reshape(shape).copy() for name, shape, a, b in self.fields}
+        obj = self.factory(values)
+        self.unpack(row, obj)
+        return obj
+
+
+_LAYOUTS = [
+    _Layout(
+        1,
+        LinearKalmanFilter,
+        [("x", ()), ("P", ()), ("Q", ()), ("R", ())],
+        lambda v: LinearKalmanFilter(Q=float(v["Q"]), R=float(v["R"])),
+    ),
+    _Layout(
+        2,
+        ExtendedKalmanFilter,
+        [("x", (3,)), ("P", (3, 3)), ("Q", (3, 3)), ("R", (3, 3)), ("dt", ())],
+        lambda v: ExtendedKalmanFilter(Q=v["Q"], R=v["R"], x0=v["x"], P0=v["P"], dt=float(v["dt"])),
+    ),
+    _Layout(
+        3,
+        Robot1D,
+        [("position", ()), ("process_noise_std", ()), ("observation_noise_std", ())],
+        lambda v: Robot1D(
+            float(v["position"]), float(v["process_noise_std"]), float(v["observation_noise_std"])
+        ),
+        has_history=True,
+    ),
+    _Layout(
+        4,
+        Robot2D,
+        [
+            ("state", (3,)),
+            ("process_noise_std", (3,)),
+            ("observation_noise_std", (3,)),
+            ("dt", ()),
+        ],
+        lambda v: Robot2D(
+            v["state"], v["process_noise_std"], v["observation_noise_std"], dt=float(v["dt"])
+        ),
+        has_history=True,
+    ),
+]
+_BY_CODE = {layout.code: layout for layout in _LAYOUTS}
+_BY_CLASS = {layout.cls: layout for layout in _LAYOUTS}
+
+
+def _layout_for(obj):
+    """
+    オブジェクトの型に対応するレイアウト
+
+    サブクラス（DelayedMeasurementEKF、FixedLagSmoother など）は基底クラスの
+    レイアウトでは保存できない状態（履歴・ラグのバッファ）を持つため、
+    型が完全に一致する場合のみ対応する
+    """
+    layout = _BY_CLASS.get(type(obj))
+    if layout is None:
+        raise TypeError(f"cannot checkpoint objects of type {type(obj).__name__}")
+    return layout
+
+
+def _pack_rng():
+    """グローバル乱数生成器 (np.random) の状態をバイト列に変換"""
+    _, key, pos, has_gauss, cached = np.random.get_state()
+    return np.asarray(key, dtype="<u4").tobytes() + _RNG_TAIL.pack(pos, has_gauss, cached)
+
+
+def _unpack_rng(data, offset):
+    """バイト列からグローバル乱数生成器の状態を復元"""
+    key = np.frombuffer(data, dtype="<u4", count=_RNG_KEY_SIZE, offset=offset)
+    pos, has_gauss, cached = _RNG_TAIL.unpack_from(data, offset + 4 * _RNG_KEY_SIZE)
+    np.random.set_state(("MT19937", key, pos, has_gauss, cached))
+
+
+def _encode(layout, objs, include_rng):
+    """オブジェクト列をヘッダ・乱数状態・ペイロードのバイト列に変換"""
+    flags = _FLAG_RNG if include_rng else 0
+    payload = np.empty((len(objs), layout.size), dtype="<f8")
+    for obj, row in zip(objs, payload):
+        layout.pack(obj, row)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, layout.code, flags, len(objs))
+    rng = _pack_rng() if include_rng else b""
+    return header + rng + payload.tobytes()
+
+
+def _decode(data):
+    """
+    バッファを解析し、(layout, payload, rng_offset) を返す
+
+    payload はバッファを参照するビュー（コピーしない）。rng_offset は
+    乱数状態の位置（含まない場合は None）
+    """
+    magic, version, code, flags, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a checkpoint buffer")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"unsupported checkpoint version: {version}")
+    try:
+        layout = _BY_CODE[code]
+    except KeyError:
+        raise ValueError(f"unknown checkpoint type code: {code}") from None
+    offset = _HEADER.size
+    rng_offset = None
+    if flags & _FLAG_RNG:
+        rng_offset = offset
+        offset += _RNG_SIZE
+    payload = np.frombuffer(data, dtype="<f8", count=count * layout.size, offset=offset)
+    return layout, payload.reshape(count, layout.size), rng_offset
+
+
+def snapshot(obj, include_rng=None):
+    """
+    フィルタ・シミュレータの状態をバイト列に保存
+
+    Parameters
+    ----------
+    obj : LinearKalmanFilter, ExtendedKalmanFilter, Robot1D or Robot2D
+        保存するオブジェクト（サブクラスは TypeError）
+    include_rng : bool, optional
+        グローバル乱数生成器の状態を含めるかどうか
+        （省略時はシミュレータのみ含める）
+
+    Returns
+    -------
+    data : bytes
+        スナップショット
+    """
+    layout = _layout_for(obj)
+    if include_rng is None:
+        include_rng = layout.history_index is not None
+    return _encode(layout, [obj], include_rng)
+
+
+def restore(data, obj):
+    """
+    スナップショットを既存のオブジェクトに復元
+
+    配列の属性は新たに確保せず、その場で上書きする
+
+    Parameters
+    ----------
+    data : bytes-like
+        snapshot で作成したバイト列
+    obj : object
+        復元先（スナップショットと同じ型）
+
+    Returns
+    -------
+    obj : object
+        復元したオブジェクト
+    """
+    layout, payload, rng_offset = _decode(data)
+    if _layout_for(obj) is not layout or len(payload) != 1:
+        raise TypeError("checkpoint does not match the target object")
+    layout.unpack(payload[0], obj)
+    if rng_offset is not None:
+        _unpack_rng(data, rng_offset)
+    return obj
+
+
+def load(data):
+    """
+    スナップショットから新しいオブジェクトを生成
+
+    Parameters
+    ----------
+    data : bytes-like
+        snapshot で作成したバイト列
+
+    Returns
+    -------
+    obj : object
+        復元したオブジェクト（動作設定はコンストラクタの既定値）
+    """
+    layout, payload, rng_offset = _decode(data)
+    if len(payload) != 1:
+        raise ValueError("checkpoint contains a fleet; use load_fleet")
+    obj = layout.create(payload[0])
+    # コンストラクタが乱数を消費する場合があるため、乱数状態は最後に復元
+    if rng_offset is not None:
+        _unpack_rng(data, rng_offset)
+    return obj
+
+
+def snapshot_fleet(objs, include_rng=False):
+    """
+    同じ型のオブジェクトの列をまとめて1つのバイト列に保存
+
+    Parameters
+    ----------
+    objs : sequence
+        保存するオブジェクト（すべて同じ型）
+    include_rng : bool
+        グローバル乱数生成器の状態を含めるかどうか
+
+    Returns
+    -------
+    data : bytes
+        スナップショット
+    """
+    objs = list(objs)
+    if not objs:
+        raise ValueError("fleet must not be empty")
+    layout = _layout_for(objs[0])
+    if any(_layout_for(obj) is not layout for obj in objs):
+        raise TypeError("all fleet members must have the same type")
+    return _encode(layout, objs, include_rng)
+
+
+def restore_fleet(data, objs):
+    """
+    フリートのスナップショットを既存のオブジェクト列に復元
+
+    Parameters
+    ----------
+    data : bytes-like
+        snapshot_fleet で作成したバイト列
+    objs : sequence
+        復元先（スナップショットと同じ型・同じ数）
+
+    Returns
+    -------
+    objs : list
+        復元したオブジェクト
+    """
+    layout, payload, rng_offset = _decode(data)
+    objs = list(objs)
+    if len(objs) != len(payload):
+        raise ValueError(f"fleet size mismatch: {len(objs)} != {len(payload)}")
+    for obj, row in zip(objs, payload):
+        if _layout_for(obj) is not layout:
+            raise TypeError("checkpoint does not match the target object")
+        layout.unpack(row, obj)
+    if rng_offset is not None:
+        _unpack_rng(data, rng_offset)
+    return objs
+
+
+def load_fleet(data):
+    """
+    フリートのスナップショットから新しいオブジェクト列を生成
+
+    Parameters
+    ----------
+    data : bytes-like
+        snapshot_fleet で作成したバイト列
+
+    Returns
+    -------
+    objs : list
+        復元したオブジェクト
+    """
+    layout, payload, rng_offset = _decode(data)
+    objs = [layout.create(row) for row in payload]
+    if rng_offset is not None:
+        _unpack_rng(data, rng_offset)
+    return objs
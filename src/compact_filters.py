@@ -0,0 +1,314 @@
+"""
+NumPy を使わない小規模フィルタ（1状態・3状態）
+
+LinearKalmanFilter / ExtendedKalmanFilter と同じモデルを Python の float と
+math だけで展開して計算する。__slots__ で属性を固定し、3×3 の対称な
+誤差共分散は上三角の6要素として保持する。組み込み向けの単一ロボットの
+ループなど、1ステップあたりの呼び出しコストが支配的な用途向け
+"""
+
+import math
+
+_PI = math.pi
+_TWO_PI = 2.0 * math.pi
+
+
+def _normalize_angle(angle):
+    """角度を [-pi, pi] の範囲に正規化"""
+    while angle > _PI:
+        angle -= _TWO_PI
+    while angle < -_PI:
+        angle += _TWO_PI
+    return angle
+
+
+def _upper(A):
+    """3×3 行列（ネストしたシーケンス）の上三角6要素"""
+    return (
+        float(A[0][0]),
+        float(A[0][1]),
+        float(A[0][2]),
+        float(A[1][1]),
+        float(A[1][2]),
+        float(A[2][2]),
+    )
+
+
+def _full(p00, p01, p02, p11, p12, p22):
+    """上三角6要素から 3×3 の対称行列（タプル）を生成"""
+    return ((p00, p01, p02), (p01, p11, p12), (p02, p12, p22))
+
+
+class CompactLinearKalmanFilter:
+    """
+    __slots__ を使う1次元線形カルマンフィルタ
+
+    LinearKalmanFilter と同じモデル（ノイズ推定とプロファイリングは省略）
+    """
+
+    __slots__ = ("Q", "R", "x", "P")
+
+    def __init__(self, Q, R, x0=0.0, P0=1.0):
+        """
+        Parameters
+        ----------
+        Q : float
+            プロセスノイズの共分散
+        R : float
+            観測ノイズの共分散
+        x0 : float
+            初期状態推定値
+        P0 : float
+            初期誤差共分散
+        """
+        self.Q = float(Q)
+        self.R = float(R)
+        self.x = float(x0)
+        self.P = float(P0)
+
+    def predict(self, u=0.0):
+        """
+        予測ステップ
+
+        Parameters
+        ----------
+        u : float
+            制御入力（移動量）
+        """
+        self.x += u
+        self.P += self.Q
+
+    def update(self, z):
+        """
+        更新ステップ
+
+        Parameters
+        ----------
+        z : float
+            観測値（NaN の場合は更新を省略）
+
+        Returns
+        -------
+        K : float
+            カルマンゲイン（更新を省略した場合は 0）
+        """
+        if z != z:
+            return 0.0
+        P = self.P
+        K = P / (P + self.R)
+        self.x += K * (z - self.x)
+        self.P = (1.0 - K) * P
+        return K
+
+    def filter_step(self, z, u=0.0):
+        """
+        予測と更新を実行
+
+        Parameters
+        ----------
+        z : float
+            観測値
+        u : float
+            制御入力
+
+        Returns
+        -------
+        x : float
+            推定値
+        K : float
+            カルマンゲイン
+        """
+        self.x += u
+        self.P += self.Q
+        K = self.update(z)
+        return self.x, K
+
+
+class CompactEKF:
+    """
+    __slots__ を使う2Dロボット用の拡張カルマンフィルタ
+
+    ExtendedKalmanFilter の既定設定（オイラー積分の運動モデル、
+    [x, y, theta] の直接観測、ゲーティングなし）と同じ計算を
+    スカラー演算に展開する。観測は3成分すべてがそろっている必要がある
+    """
+
+    __slots__ = (
+        "dt",
+        "x0",
+        "x1",
+        "x2",
+        "p00",
+        "p01",
+        "p02",
+        "p11",
+        "p12",
+        "p22",
+        "q00",
+        "q01",
+        "q02",
+        "q11",
+        "q12",
+        "q22",
+        "r00",
+        "r01",
+        "r02",
+        "r11",
+        "r12",
+        "r22",
+    )
+
+    def __init__(self, Q, R, x0, P0, dt=1.0):
+        """
+        Parameters
+        ----------
+        Q : array-like, shape (3, 3)
+            プロセスノイズ共分散行列（対称）
+        R : array-like, shape (3, 3)
+            観測ノイズ共分散行列（対称）
+        x0 : array-like, shape (3,)
+            初期状態 [x, y, theta]
+        P0 : array-like, shape (3, 3)
+            初期誤差共分散行列（対称）
+        dt : float
+            時間ステップ (s)
+        """
+        self.dt = float(dt)
+        self.x0, self.x1, self.x2 = float(x0[0]), float(x0[1]), float(x0[2])
+        self.p00, self.p01, self.p02, self.p11, self.p12, self.p22 = _upper(P0)
+        self.q00, self.q01, self.q02, self.q11, self.q12, self.q22 = _upper(Q)
+        self.r00, self.r01, self.r02, self.r11, self.r12, self.r22 = _upper(R)
+
+    @property
+    def x(self):
+        """状態推定値 (x, y, theta)"""
+        return (self.x0, self.x1, self.x2)
+
+    @property
+    def P(self):
+        """誤差共分散行列（3×3 のタプル）"""
+        return _full(self.p00, self.p01, self.p02, self.p11, self.p12, self.p22)
+
+    def predict(self, u):
+        """
+        予測ステップ
+
+        Parameters
+        ----------
+        u : sequence, shape (2,)
+            制御入力 [v, omega]
+        """
+        v, omega = u
+        dt = self.dt
+        theta = self.x2
+        vdt = v * dt
+        c = math.cos(theta) * vdt
+        s = math.sin(theta) * vdt
+
+        # 状態予測
+        self.x0 += c
+        self.x1 += s
+        self.x2 = _normalize_angle(theta + omega * dt)
+
+        # 誤差共分散予測: P = F*P*F^T + Q（F = [[1, 0, a], [0, 1, b], [0, 0, 1]]）
+        a = -s
+        b = c
+        p02 = self.p02
+        p12 = self.p12
+        p22 = self.p22
+        ap22 = a * p22
+        bp22 = b * p22
+        self.p00 += a * (2.0 * p02 + ap22) + self.q00
+        self.p01 += a * p12 + b * p02 + a * bp22 + self.q01
+        self.p02 = p02 + ap22 + self.q02
+        self.p11 += b * (2.0 * p12 + bp22) + self.q11
+        self.p12 = p12 + bp22 + self.q12
+        self.p22 = p22 + self.q22
+
+    def update(self, z):
+        """
+        更新ステップ
+
+        Parameters
+        ----------
+        z : sequence, shape (3,)
+            観測値 [x_obs, y_obs, theta_obs]
+
+        Returns
+        -------
+        K : tuple, shape (3, 3)
+            カルマンゲイン行列
+        """
+        p00, p01, p02 = self.p00, self.p01, self.p02
+        p11, p12, p22 = self.p11, self.p12, self.p22
+
+        # イノベーション: y = z - x（H = I）
+        y0 = z[0] - self.x0
+        y1 = z[1] - self.x1
+        y2 = _normalize_angle(z[2] - self.x2)
+
+        # イノベーション共分散: S = P + R と、その逆行列（余因子展開）
+        s00 = p00 + self.r00
+        s01 = p01 + self.r01
+        s02 = p02 + self.r02
+        s11 = p11 + self.r11
+        s12 = p12 + self.r12
+        s22 = p22 + self.r22
+        c00 = s11 * s22 - s12 * s12
+        c01 = s02 * s12 - s01 * s22
+        c02 = s01 * s12 - s02 * s11
+        inv_det = 1.0 / (s00 * c00 + s01 * c01 + s02 * c02)
+        i00 = c00 * inv_det
+        i01 = c01 * inv_det
+        i02 = c02 * inv_det
+        i11 = (s00 * s22 - s02 * s02) * inv_det
+        i12 = (s01 * s02 - s00 * s12) * inv_det
+        i22 = (s00 * s11 - s01 * s01) * inv_det
+
+        # カルマンゲイン: K = P*S^(-1)
+        k00 = p00 * i00 + p01 * i01 + p02 * i02
+        k01 = p00 * i01 + p01 * i11 + p02 * i12
+        k02 = p00 * i02 + p01 * i12 + p02 * i22
+        k10 = p01 * i00 + p11 * i01 + p12 * i02
+        k11 = p01 * i01 + p11 * i11 + p12 * i12
+        k12 = p01 * i02 + p11 * i12 + p12 * i22
+        k20 = p02 * i00 + p12 * i01 + p22 * i02
+        k21 = p02 * i01 + p12 * i11 + p22 * i12
+        k22 = p02 * i02 + p12 * i12 + p22 * i22
+
+        # 状態更新: x = x + K*y
+        self.x0 += k00 * y0 + k01 * y1 + k02 * y2
+        self.x1 += k10 * y0 + k11 * y1 + k12 * y2
+        self.x2 = _normalize_angle(self.x2 + k20 * y0 + k21 * y1 + k22 * y2)
+
+        # 誤差共分散更新: P = (I - K)*P（上三角のみ計算）
+        self.p00 = p00 - (k00 * p00 + k01 * p01 + k02 * p02)
+        self.p01 = p01 - (k00 * p01 + k01 * p11 + k02 * p12)
+        self.p02 = p02 - (k00 * p02 + k01 * p12 + k02 * p22)
+        self.p11 = p11 - (k10 * p01 + k11 * p11 + k12 * p12)
+        self.p12 = p12 - (k10 * p02 + k11 * p12 + k12 * p22)
+        self.p22 = p22 - (k20 * p02 + k21 * p12 + k22 * p22)
+
+        return ((k00, k01, k02), (k10, k11, k12), (k20, k21, k22))
+
+    def filter_step(self, z, u):
+        """
+        予測と更新を実行
+
+        Parameters
+        ----------
+        z : sequence, shape (3,)
+            観測値 [x_obs, y_obs, theta_obs]
+        u : sequence, shape (2,)
+            制御入力 [v, omega]
+
+        Returns
+        -------
+        x : tuple, shape (3,)
+            更新後の状態推定値
+        K : tuple, shape (3, 3)
+            カルマンゲイン行列
+        """
+        self.predict(u)
+        K = self.update(z)
+        return (self.x0, self.x1, self.x2), K
@@ -0,0 +1,468 @@
+"""
+シミュレーションデータのディスクキャッシュ
+
+Robot1D / Robot2D で生成した真値・観測・制御入力の系列を、シミュレータの
+設定（初期状態、ノイズの標準偏差、制御入力、dt、ステップ数、シード）と
+シミュレータのコードのハッシュをキーとして保存する。
+
+各エントリは <キー>/<配列名>.npy と meta.json からなるディレクトリで、
+読み込みは np.load(mmap_mode="r") によるメモリマップ（コピーなし）。
+meta.json の更新時刻を最終アクセス時刻として使い、エントリ数・合計サイズの
+上限を超えた場合は最も古くアクセスされたエントリから削除する (LRU)
+
+使い方:
+    cache = DatasetCache(max_bytes=2 * 1024**3)
+    data = cache.simulate_2d([0, 0, 0], [0.05, 0.05, 0.02], [0.3, 0.3, 0.1], us, dt=0.1, seed=42)
+    truth, zs = data["truth"], data["observations"]
+"""
+
+import contextlib
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from . import __version__, motion_models, robot_2d_simulator, robot_simulator
+from .robot_2d_simulator import Robot2D
+from .robot_simulator import Robot1D
+
+# キャッシュの既定の保存先を指定する環境変数
+CACHE_DIR_ENV = "KF_DATASET_CACHE"
+
+_META = "meta.json"
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """
+    シミュレータのコードのハッシュ
+
+    パッケージのバージョンと、データ生成に使うモジュールのソースから計算する
+    （シミュレータを変更すると既存のエントリは使われなくなる）
+
+    Returns
+    -------
+    version : str
+        16進数のハッシュ
+    """
+    h = hashlib.sha256(__version__.encode())
+    for module in (robot_simulator, robot_2d_simulator, motion_models):
+        h.update(inspect.getsource(module).encode())
+    return h.hexdigest()[:16]
+
+
+def _update_hash(h, value):
+    """設定の値をハッシュに追加（配列はバイト列、辞書はキー順）"""
+    if isinstance(value, dict):
+        h.update(b"{")
+        for key in sorted(value):
+            h.update(repr(key).encode())
+            _update_hash(h, value[key])
+        h.update(b"}")
+    elif isinstance(value, np.ndarray) or (
+        isinstance(value, (list, tuple)) and not any(isinstance(v, (dict, str)) for v in value)
+    ):
+        arr = np.ascontiguousarray(value)
+        h.update(f"array{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.tobytes())
+    else:
+        h.update(repr(value).encode())
+
+
+def config_key(config):
+    """
+    設定のキャッシュキー
+
+    Parameters
+    ----------
+    config : dict
+        シミュレータの設定（スカラー、文字列、配列、入れ子の辞書）
+
+    Returns
+    -------
+    key : str
+        16進数のハッシュ
+    """
+    h = hashlib.sha256()
+    _update_hash(h, config)
+    return h.hexdigest()
+
+
+@contextlib.contextmanager
+def _seeded(seed):
+    """グローバルな乱数の状態を保存してシードを設定し、終了時に元に戻す"""
+    state = np.random.get_state()
+    np.random.seed(seed)
+    try:
+        yield
+    finally:
+        np.random.set_state(state)
+
+
+def simulate_1d(initial_position, process_noise_std, observation_noise_std, controls, seed=42):
+    """
+    Robot1D で系列を生成
+
+    np.random.seed(seed) の後に初期位置の観測、以降は移動と観測を交互に行う
+    （グローバルな乱数の状態は変更しない）
+
+    Parameters
+    ----------
+    initial_position : float
+        初期位置
+    process_noise_std : float
+        プロセスノイズの標準偏差
+    observation_noise_std : float
+        観測ノイズの標準偏差
+    controls : array-like, shape (T,)
+        各ステップの移動量
+    seed : int
+        乱数シード
+
+    Returns
+    -------
+    data : dict
+        "truth" (T + 1,)、"observations" (T + 1,)、"controls" (T,)
+    """
+    controls = np.asarray(controls, dtype=float)
+    T = len(controls)
+    truth = np.empty(T + 1)
+    observations = np.empty(T + 1)
+    with _seeded(seed):
+        robot = Robot1D(initial_position, process_noise_std, observation_noise_std)
+        truth[0] = robot.get_position()
+        observations[0] = robot.observe()
+        for k in range(T):
+            truth[k + 1] = robot.move(controls[k])
+            observations[k + 1] = robot.observe()
+    return {"truth": truth, "observations": observations, "controls": controls}
+
+
+def simulate_2d(
+    initial_state,
+    process_noise_std,
+    observation_noise_std,
+    controls,
+    dt=1.0,
+    seed=42,
+    motion_model="euler",
+):
+    """
+    Robot2D で系列を生成
+
+    np.random.seed(seed) の後に Robot2D を作成して移動させ、状態と観測の
+    履歴を返す（グローバルな乱数の状態は変更しない）
+
+    Parameters
+    ----------
+    initial_state : array-like, shape (3,)
+        初期状態 [x, y, theta]
+    process_noise_std : array-like, shape (3,)
+        プロセスノイズの標準偏差
+    observation_noise_std : array-like, shape (3,)
+        観測ノイズの標準偏差
+    controls : array-like, shape (T, 2)
+        制御入力 [v, omega]
+    dt : float
+        時間ステップ (s)
+    seed : int
+        乱数シード
+    motion_model : str
+        運動モデル（"euler"、"exact"、"rk4"）
+
+    Returns
+    -------
+    data : dict
+        "truth" (T + 1, 3)、"observations" (T + 1, 3)、"controls" (T, 2)
+    """
+    controls = np.asarray(controls, dtype=float).reshape(-1, 2)
+    T = len(controls)
+    with _seeded(seed):
+        robot = Robot2D(
+            initial_state,
+            process_noise_std,
+            observation_noise_std,
+            dt=dt,
+            motion_model=motion_model,
+            history_capacity=T + 1,
+        )
+        for u in controls:
+            robot.move(u)
+    return {
+        "truth": robot.state_history.to_array(),
+        "observations": robot.observation_history.to_array(),
+        "controls": controls,
+    }
+
+
+class DatasetCache:
+    """
+    設定のハッシュをキーとするシミュレーションデータのディスクキャッシュ
+    """
+
+    def __init__(self, directory=None, max_bytes=None, max_entries=None):
+        """
+        Parameters
+        ----------
+        directory : str, optional
+            保存先（省略時は環境変数 KF_DATASET_CACHE、
+            未設定の場合は ~/.cache/kalman-filter-robot-simulation/datasets）
+        max_bytes : int, optional
+            合計サイズの上限（バイト）
+        max_entries : int, optional
+            エントリ数の上限
+        """
+        if directory is None:
+            directory = os.environ.get(CACHE_DIR_ENV) or os.path.join(
+                os.path.expanduser("~"), ".cache", "kalman-filter-robot-simulation", "datasets"
+            )
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.n_hits = 0
+        self.n_misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _entries(self):
+        """(最終アクセス時刻, サイズ, キー) のリスト（完成したエントリのみ）"""
+        entries = []
+        for key in os.listdir(self.directory):
+            if key.startswith("."):
+                # 書き込み中・置き換え中の一時ディレクトリ
+                continue
+            meta = os.path.join(self._path(key), _META)
+            try:
+                mtime = os.stat(meta).st_mtime
+                with open(meta) as f:
+                    nbytes = json.load(f)["nbytes"]
+            except (OSError, ValueError, KeyError):
+                continue
+            entries.append((mtime, nbytes, key))
+        return entries
+
+    def __len__(self):
+        return len(self._entries())
+
+    def __contains__(self, key):
+        return os.path.exists(os.path.join(self._path(key), _META))
+
+    @property
+    def size_bytes(self):
+        """キャッシュの合計サイズ（バイト）"""
+        return sum(nbytes for _, nbytes, _ in self._entries())
+
+    def get(self, key):
+        """
+        エントリをメモリマップで読み込む
+
+        Parameters
+        ----------
+        key : str
+            キャッシュキー
+
+        Returns
+        -------
+        data : dict or None
+            配列名 -> 読み取り専用のメモリマップ配列（エントリがない場合は None）
+        """
+        path = self._path(key)
+        meta = os.path.join(path, _META)
+        try:
+            with open(meta) as f:
+                names = json.load(f)["arrays"]
+            data = {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        # 最終アクセス時刻を更新 (LRU)
+        os.utime(meta)
+        return data
+
+    def put(self, key, arrays, config=None):
+        """
+        配列をエントリとして保存し、上限を超えたエントリを削除
+
+        一時ディレクトリに書き込んでから名前を変更するため、
+        他のプロセスが書き込み途中のエントリを読むことはない。
+        同じキーのエントリがある場合は、古いディレクトリを退避してから
+        新しいディレクトリと入れ替えて置き換える
+
+        Parameters
+        ----------
+        key : str
+            キャッシュキー
+        arrays : dict
+            配列名 -> 配列
+        config : dict, optional
+            meta.json に記録する設定（配列は形状のみ記録する）
+        """
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            nbytes = 0
+            for name, arr in arrays.items():
+                file = os.path.join(tmp, f"{name}.npy")
+                np.save(file, np.ascontiguousarray(arr))
+                nbytes += os.path.getsize(file)
+            meta = {
+                "arrays": list(arrays),
+                "nbytes": nbytes,
+                "created": time.time(),
+                "config": config,
+            }
+            with open(os.path.join(tmp, _META), "w") as f:
+                json.dump(meta, f, default=lambda v: f"array{np.shape(v)}")
+            path = self._path(key)
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                # 既存のエントリを退避してから入れ替える
+                old = tmp + ".old"
+                with contextlib.suppress(OSError):
+                    os.rename(path, old)
+                try:
+                    os.rename(tmp, path)
+                except OSError:
+                    # 入れ替えの間に他のプロセスが同じエントリを保存した
+                    shutil.rmtree(tmp, ignore_errors=True)
+                shutil.rmtree(old, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """
+        エントリ数・合計サイズの上限を超えた分を LRU で削除
+
+        Parameters
+        ----------
+        keep : str, optional
+            削除しないエントリのキー
+
+        Returns
+        -------
+        removed : list of str
+            削除したエントリのキー
+        """
+        entries = sorted(self._entries())
+        total = sum(nbytes for _, nbytes, _ in entries)
+        count = len(entries)
+        removed = []
+        for _, nbytes, key in entries:
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            over_count = self.max_entries is not None and count > self.max_entries
+            if not (over_bytes or over_count):
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._path(key), ignore_errors=True)
+            total -= nbytes
+            count -= 1
+            removed.append(key)
+        return removed
+
+    def clear(self):
+        """すべてのエントリを削除"""
+        for key in os.listdir(self.directory):
+            shutil.rmtree(self._path(key), ignore_errors=True)
+
+    def get_or_create(self, config, generate):
+        """
+        設定に対応するエントリを読み込み、なければ生成して保存
+
+        Parameters
+        ----------
+        config : dict
+            キーの計算に使う設定
+        generate : callable
+            () -> dict（配列名 -> 配列）
+
+        Returns
+        -------
+        data : dict
+            配列名 -> 読み取り専用のメモリマップ配列
+        """
+        key = config_key(config)
+        data = self.get(key)
+        if data is not None:
+            self.n_hits += 1
+            return data
+        self.n_misses += 1
+        self.put(key, generate(), config)
+        data = self.get(key)
+        if data is None:
+            raise RuntimeError(f"dataset {key} was evicted right after being stored")
+        return data
+
+    def simulate_1d(
+        self, initial_position, process_noise_std, observation_noise_std, controls, seed=42
+    ):
+        """
+        キャッシュを使う simulate_1d（引数と戻り値は simulate_1d と同じ）
+        """
+        controls = np.asarray(controls, dtype=float)
+        config = {
+            "simulator": "robot1d",
+            "initial_position": float(initial_position),
+            "process_noise_std": float(process_noise_std),
+            "observation_noise_std": float(observation_noise_std),
+            "controls": controls,
+            "steps": len(controls),
+            "seed": seed,
+            "code_version": code_version(),
+        }
+        return self.get_or_create(
+            config,
+            lambda: simulate_1d(
+                initial_position, process_noise_std, observation_noise_std, controls, seed
+            ),
+        )
+
+    def simulate_2d(
+        self,
+        initial_state,
+        process_noise_std,
+        observation_noise_std,
+        controls,
+        dt=1.0,
+        seed=42,
+        motion_model="euler",
+    ):
+        """
+        キャッシュを使う simulate_2d（引数と戻り値は simulate_2d と同じ）
+        """
+        controls = np.asarray(controls, dtype=float).reshape(-1, 2)
+        config = {
+            "simulator": "robot2d",
+            "initial_state": np.asarray(initial_state, dtype=float),
+            "process_noise_std": np.asarray(process_noise_std, dtype=float),
+            "observation_noise_std": np.asarray(observation_noise_std, dtype=float),
+            "controls": controls,
+            "dt": float(dt),
+            "steps": len(controls),
+            "seed": seed,
+            "motion_model": motion_model,
+            "code_version": code_version(),
+        }
+        return self.get_or_create(
+            config,
+            lambda: simulate_2d(
+                initial_state,
+                process_noise_std,
+                observation_noise_std,
+                controls,
+                dt,
+                seed,
+                motion_model,
+            ),
+        )
@@ -0,0 +1,151 @@
+import math
+
+import numpy as np
+
+from .extended_kf import ExtendedKalmanFilter
+
+
+class DelayedMeasurementEKF(ExtendedKalmanFilter):
+    """
+    遅延・順序逆転した観測を扱う拡張カルマンフィルタ
+
+    直近 horizon 秒分の事後状態・誤差共分散・制御入力・観測を固定長の
+    リングバッファに保持する。遅れて届いた観測はその時刻のスロットで更新し、
+    以降のスロットだけを保存した制御入力と観測で再伝播する
+    """
+
+    def __init__(self, Q, R, x0, P0, dt=1.0, horizon=1.0, **kwargs):
+        """
+        Parameters
+        ----------
+        Q : ndarray, shape (3, 3)
+            プロセスノイズ共分散行列
+        R : ndarray, shape (3, 3)
+            観測ノイズ共分散行列
+        x0 : ndarray, shape (3,)
+            初期状態 [x, y, theta]
+        P0 : ndarray, shape (3, 3)
+            初期誤差共分散行列
+        dt : float
+            時間ステップ (s)
+        horizon : float
+            遅延観測を受け付ける時間幅 (s)
+        **kwargs
+            ExtendedKalmanFilter に渡す追加引数
+        """
+        super().__init__(Q=Q, R=R, x0=x0, P0=P0, dt=dt, **kwargs)
+        self.horizon = horizon
+        self.capacity = int(math.ceil(horizon / dt)) + 1
+        self.t = 0.0
+        self.n_delayed = 0
+        self.n_dropped = 0
+
+        N = self.capacity
+        self._times = np.zeros(N)
+        self._xs = np.zeros((N, 3))
+        self._Ps = np.zeros((N, 3, 3))
+        self._us = np.zeros((N, 2))
+        self._zs: list = [[] for _ in range(N)]
+        self._head = 0  # 最新スロットの添字
+        self._count = 1
+        self._store(0)
+
+    def _store(self, i):
+        """現在の状態をスロット i に保存"""
+        self._xs[i] = self.x
+        self._Ps[i] = self.P
+
+    def _slot(self, steps_back):
+        """最新から steps_back ステップ前のスロットの添字"""
+        return (self._head - steps_back) % self.capacity
+
+    def predict(self, u):
+        """
+        予測ステップを実行し、新しいスロットを追加
+
+        Parameters
+        ----------
+        u : array-like, shape (2,)
+            制御入力 [v, omega]
+        """
+        super().predict(u)
+        self.t += self.dt
+        i = self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self._times[i] = self.t
+        self._us[i] = u
+        self._zs[i] = []
+        self._store(i)
+
+    def update(self, z, t=None):
+        """
+        観測による更新（遅延観測はその時刻で適用して再伝播）
+
+        Parameters
+        ----------
+        z : array-like, shape (3,)
+            観測値 [x_obs, y_obs, theta_obs]（NaN は欠損）
+        t : float, optional
+            観測時刻 (s)（省略時は現在時刻）
+
+        Returns
+        -------
+        K : ndarray, shape (3, 3) or None
+            観測時刻でのカルマンゲイン行列（horizon より古い観測は破棄して None）
+        """
+        z = np.array(z, dtype=float)
+        steps_back = 0 if t is None else int(round((self.t - t) / self.dt))
+        if steps_back < 0:
+            raise ValueError(f"measurement time {t} is ahead of the filter time {self.t}")
+        if steps_back >= self._count:
+            self.n_dropped += 1
+            return None
+
+        i = self._slot(steps_back)
+        if steps_back == 0:
+            K = super().update(z)
+            self._zs[i].append(z)
+            self._store(i)
+            return K
+
+        # 観測時刻のスロットから更新し、以降のスロットのみ再伝播
+        self.n_delayed += 1
+        self.x = self._xs[i].copy()
+        self.P = self._Ps[i].copy()
+        K = super().update(z)
+        self._zs[i].append(z)
+        self._store(i)
+        self._repropagate(steps_back)
+        return K
+
+    def _repropagate(self, steps_back):
+        """steps_back ステップ前のスロット以降を保存した入力と観測で再計算"""
+        # 再計算では統計カウンタとノイズ推定を進めない
+        counters = (self.nis, self.n_updates, self.n_gated, self.n_rejected)
+        estimator, self.noise_estimator = self.noise_estimator, None
+        try:
+            for back in range(steps_back - 1, -1, -1):
+                j = self._slot(back)
+                ExtendedKalmanFilter.predict(self, self._us[j])
+                for z in self._zs[j]:
+                    ExtendedKalmanFilter.update(self, z)
+                self._store(j)
+        finally:
+            self.noise_estimator = estimator
+            self.nis, self.n_updates, self.n_gated, self.n_rejected = counters
+
+    def history(self):
+        """
+        バッファ内の履歴を古い順に取得
+
+        Returns
+        -------
+        times : ndarray, shape (N,)
+            各スロットの時刻 (s)
+        xs : ndarray, shape (N, 3)
+            各スロットの事後状態
+        Ps : ndarray, shape (N, 3, 3)
+            各スロットの事後誤差共分散
+        """
+        order = [self._slot(back) for back in range(self._count - 1, -1, -1)]
+        return self._times[order], self._xs[order], self._Ps[order]
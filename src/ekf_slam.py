@@ -0,0 +1,253 @@
+import numpy as np
+
+
+def range_bearing(pose, landmarks):
+    """
+    ロボット姿勢からランドマークへの距離・方位（ベクトル化）
+
+    Parameters
+    ----------
+    pose : array-like, shape (3,)
+        ロボット姿勢 [x, y, theta]
+    landmarks : array-like, shape (L, 2)
+        ランドマーク位置
+
+    Returns
+    -------
+    z : ndarray, shape (L, 2)
+        観測値 [range, bearing]（bearing は [-pi, pi]）
+    """
+    landmarks = np.atleast_2d(np.asarray(landmarks, dtype=float))
+    d = landmarks - np.asarray(pose[:2], dtype=float)
+    r = np.hypot(d[:, 0], d[:, 1])
+    b = np.arctan2(d[:, 1], d[:, 0]) - pose[2]
+    b = (b + np.pi) % (2 * np.pi) - np.pi
+    return np.column_stack([r, b])
+
+
+class EKFSLAM:
+    """
+    ランドマーク地図を同時推定する EKF-SLAM
+
+    状態: [x, y, theta, m1_x, m1_y, m2_x, m2_y, ...]
+    制御入力: [v, omega]
+    観測: ランドマークまでの [range, bearing]
+
+    状態と共分散は容量を倍々に拡張する事前確保バッファに格納し、
+    予測ではロボットブロックとロボット-地図間の相互共分散のみを更新する (O(n))
+    """
+
+    def __init__(self, Q, R, x0, P0, dt=1.0, initial_capacity=16):
+        """
+        Parameters
+        ----------
+        Q : ndarray, shape (3, 3)
+            ロボット姿勢のプロセスノイズ共分散行列
+        R : ndarray, shape (2, 2)
+            距離・方位観測のノイズ共分散行列
+        x0 : ndarray, shape (3,)
+            初期姿勢 [x, y, theta]
+        P0 : ndarray, shape (3, 3)
+            初期姿勢の誤差共分散行列
+        dt : float
+            時間ステップ (s)
+        initial_capacity : int
+            初期のランドマーク容量
+        """
+        self.Q = np.array(Q, dtype=float)
+        self.R = np.array(R, dtype=float)
+        self.dt = dt
+
+        size = 3 + 2 * max(1, initial_capacity)
+        self._x = np.zeros(size)
+        self._P = np.zeros((size, size))
+        self._x[:3] = x0
+        self._P[:3, :3] = P0
+
+        self.n_landmarks = 0
+        self.landmark_ids = []  # スロット順のランドマークID
+        self._slot = {}  # ランドマークID -> スロット番号
+
+    @property
+    def n(self):
+        """現在の状態次元"""
+        return 3 + 2 * self.n_landmarks
+
+    @property
+    def capacity(self):
+        """確保済みのランドマーク容量"""
+        return (self._x.shape[0] - 3) // 2
+
+    @property
+    def x(self):
+        """状態ベクトル（バッファのビュー）"""
+        return self._x[: self.n]
+
+    @property
+    def P(self):
+        """誤差共分散行列（バッファのビュー）"""
+        n = self.n
+        return self._P[:n, :n]
+
+    def predict(self, u):
+        """
+        予測ステップ（ロボットブロックと相互共分散のみ更新）
+
+        Parameters
+        ----------
+        u : array-like, shape (2,)
+            制御入力 [v, omega]
+        """
+        v, omega = u
+        x, y, theta = self._x[:3]
+
+        # 状態予測（非線形運動モデル）
+        self._x[0] = x + v * np.cos(theta) * self.dt
+        self._x[1] = y + v * np.sin(theta) * self.dt
+        self._x[2] = self._normalize_angle(theta + omega * self.dt)
+
+        # ヤコビアン行列 F（ロボット部分のみ）
+        F = np.array(
+            [[1, 0, -v * np.sin(theta) * self.dt], [0, 1, v * np.cos(theta) * self.dt], [0, 0, 1]]
+        )
+
+        # P_rr = F*P_rr*F^T + Q, P_rm = F*P_rm
+        n = self.n
+        P = self._P
+        P[:3, :3] = F @ P[:3, :3] @ F.T + self.Q
+        if n > 3:
+            P[:3, 3:n] = F @ P[:3, 3:n]
+            P[3:n, :3] = P[:3, 3:n].T
+
+    def update(self, landmark_id, z):
+        """
+        1つのランドマーク観測で更新（未知のランドマークは地図に追加）
+
+        Parameters
+        ----------
+        landmark_id : hashable
+            ランドマークID
+        z : array-like, shape (2,)
+            観測値 [range, bearing]
+
+        Returns
+        -------
+        K : ndarray, shape (n, 2) or None
+            カルマンゲイン行列（新規ランドマークの場合は None）
+        """
+        slot = self._slot.get(landmark_id)
+        if slot is None:
+            self._add_landmark(landmark_id, z)
+            return None
+
+        n = self.n
+        j = 3 + 2 * slot
+        x = self._x
+        P = self._P
+
+        dx = x[j] - x[0]
+        dy = x[j + 1] - x[1]
+        q = dx * dx + dy * dy
+        r = np.sqrt(q)
+
+        # 観測ヤコビアン（ロボット部分 H_r と ランドマーク部分 H_m のみ非ゼロ）
+        H_r = np.array([[-dx / r, -dy / r, 0.0], [dy / q, -dx / q, -1.0]])
+        H_m = np.array([[dx / r, dy / r], [-dy / q, dx / q]])
+
+        # P*H^T は2つの列ブロックのみから計算できる (O(n))
+        PHt = P[:n, :3] @ H_r.T + P[:n, j : j + 2] @ H_m.T
+        S = H_r @ PHt[:3] + H_m @ PHt[j : j + 2] + self.R
+        K = PHt @ np.linalg.inv(S)
+
+        innovation = np.asarray(z, dtype=float) - np.array([r, np.arctan2(dy, dx) - x[2]])
+        innovation[1] = self._normalize_angle(innovation[1])
+
+        # 状態更新: x = x + K*y
+        x[:n] += K @ innovation
+        x[2] = self._normalize_angle(x[2])
+
+        # 誤差共分散更新: P = P - K*H*P = P - K*(P*H^T)^T（ランク2更新）
+        P[:n, :n] -= K @ PHt.T
+
+        return K
+
+    def update_many(self, landmark_ids, zs):
+        """
+        複数のランドマーク観測で逐次更新
+
+        Parameters
+        ----------
+        landmark_ids : sequence
+            ランドマークID
+        zs : array-like, shape (L, 2)
+            観測値 [range, bearing]
+        """
+        for landmark_id, z in zip(landmark_ids, zs):
+            self.update(landmark_id, z)
+
+    def landmarks(self):
+        """
+        Returns
+        -------
+        landmarks : ndarray, shape (L, 2)
+            推定ランドマーク位置（スロット順、バッファのビュー）
+        """
+        return self._x[3 : self.n].reshape(-1, 2)
+
+    def landmark_covariance(self, landmark_id):
+        """
+        Returns
+        -------
+        P_m : ndarray, shape (2, 2)
+            ランドマーク位置の誤差共分散
+        """
+        j = 3 + 2 * self._slot[landmark_id]
+        return self._P[j : j + 2, j : j + 2].copy()
+
+    def _add_landmark(self, landmark_id, z):
+        """観測から新規ランドマークを初期化して状態を拡張"""
+        if self.n_landmarks == self.capacity:
+            self._grow(2 * self.capacity)
+
+        n = self.n
+        x = self._x
+        P = self._P
+        r, bearing = z
+        angle = x[2] + bearing
+        c = np.cos(angle)
+        s = np.sin(angle)
+
+        # 逆観測モデル: m = [x + r*cos(theta + b), y + r*sin(theta + b)]
+        x[n] = x[0] + r * c
+        x[n + 1] = x[1] + r * s
+
+        G_r = np.array([[1.0, 0.0, -r * s], [0.0, 1.0, r * c]])
+        G_z = np.array([[c, -r * s], [s, r * c]])
+
+        P_mx = G_r @ P[:3, :n]
+        P[n : n + 2, :n] = P_mx
+        P[:n, n : n + 2] = P_mx.T
+        P[n : n + 2, n : n + 2] = G_r @ P[:3, :3] @ G_r.T + G_z @ self.R @ G_z.T
+
+        self._slot[landmark_id] = self.n_landmarks
+        self.landmark_ids.append(landmark_id)
+        self.n_landmarks += 1
+
+    def _grow(self, capacity):
+        """バッファの容量を拡張（既存要素をコピー）"""
+        n = self.n
+        size = 3 + 2 * capacity
+        x = np.zeros(size)
+        P = np.zeros((size, size))
+        x[:n] = self._x[:n]
+        P[:n, :n] = self._P[:n, :n]
+        self._x = x
+        self._P = P
+
+    def _normalize_angle(self, angle):
+        """角度を [-pi, pi] に正規化"""
+        while angle > np.pi:
+            angle -= 2 * np.pi
+        while angle < -np.pi:
+            angle += 2 * np.pi
+        return angle
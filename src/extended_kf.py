@@ -1,5 +1,8 @@
 import numpy as np
 
+from . import gating, profiling
+from .motion_models import get_motion_model, is_builtin, unicycle_jacobian
+
 
 class ExtendedKalmanFilter:
     """
@@ -9,7 +12,21 @@ class ExtendedKalmanFilter:
     制御入力: [v, omega]
     """
 
-    def __init__(self, Q, R, x0, P0, dt=1.0):
+    def __init__(
+        self,
+        Q,
+        R,
+        x0,
+        P0,
+        dt=1.0,
+        gate_threshold=None,
+        gate_policy="reject",
+        robust=None,
+        robust_param=None,
+        robust_iterations=5,
+        noise_estimator=None,
+        motion_model="euler",
+    ):
         """
         Parameters
         ----------
@@ -23,12 +40,50 @@ class ExtendedKalmanFilter:
             初期誤差共分散行列
         dt : float
             時間ステップ (s)
+        gate_threshold : float, optional
+            マハラノビス距離の2乗に対するゲート閾値（例: gating.CHI2_99[3]）
+        gate_policy : str
+            閾値超過時の処理。"reject"（棄却）または "inflate"（S を拡大）
+        robust : str, optional
+            ロバスト更新。"huber" または "student_t"
+        robust_param : float, optional
+            Huber の閾値 k または Student-t の自由度 nu
+        robust_iterations : int
+            ロバスト重みの反復回数
+        noise_estimator : AdaptiveNoiseEstimator, optional
+            指定した場合、完全な観測で更新するたびに Q, R を再推定する
+        motion_model : str or callable
+            運動モデル。"euler"、"exact"（円弧の厳密積分）、"rk4"、または
+            (state, u, dt) -> (next_state, F) の関数
         """
+        if gate_policy not in gating.GATE_POLICIES:
+            raise ValueError(f"unknown gate policy: {gate_policy}")
+        if robust is not None and robust not in gating.ROBUST_METHODS:
+            raise ValueError(f"unknown robust method: {robust}")
+
         self.Q = np.array(Q)
         self.R = np.array(R)
         self.x = np.array(x0)
         self.P = np.array(P0)
         self.dt = dt
+        self.motion_model = get_motion_model(motion_model)
+        # 組み込みモデルは状態とヤコビアンを別々に計算できる（プロファイルで段を分けるため）
+        self._split_jacobian = is_builtin(self.motion_model)
+        self._F = np.eye(3)  # 直近の予測で使ったヤコビアン
+
+        self.gate_threshold = gate_threshold
+        self.gate_policy = gate_policy
+        self.robust = robust
+        self.robust_param = robust_param
+        self.robust_iterations = robust_iterations
+
+        # 外れ値の統計
+        self.nis = 0.0  # 直近の正規化イノベーション2乗
+        self.n_updates = 0
+        self.n_gated = 0
+        self.n_rejected = 0
+
+        self.noise_estimator = noise_estimator
 
     def predict(self, u):
         """
@@ -39,32 +94,43 @@ class ExtendedKalmanFilter:
         u : array-like, shape (2,)
             制御入力 [v, omega]
         """
-        v, omega = u
-        x, y, theta = self.x
+        prof = profiling.active()
+        t = prof.begin("ekf.predict") if prof is not None else None
 
         # 状態予測（非線形運動モデル）
-        x_pred = x + v * np.cos(theta) * self.dt
-        y_pred = y + v * np.sin(theta) * self.dt
-        theta_pred = theta + omega * self.dt
+        if self._split_jacobian:
+            x_pred = self.motion_model(self.x, u, self.dt, jacobian=False)
+            F = None
+        else:
+            # 関数で与えたモデルは状態とヤコビアンを一度に返す（ヤコビアンも motion 段に含む）
+            x_pred, F = self.motion_model(self.x, u, self.dt)
 
         # 角度を [-pi, pi] に正規化
-        theta_pred = self._normalize_angle(theta_pred)
-
-        self.x = np.array([x_pred, y_pred, theta_pred])
+        x_pred[2] = self._normalize_angle(x_pred[2])
+        if t is not None:
+            t = prof.lap("ekf.predict.motion", t)
 
-        # ヤコビアン行列 F（状態遷移の線形化）
-        # F = ∂f/∂x
-        F = np.array(
-            [[1, 0, -v * np.sin(theta) * self.dt], [0, 1, v * np.cos(theta) * self.dt], [0, 0, 1]]
-        )
+        # ヤコビアン行列 F = ∂f/∂x
+        if F is None:
+            F = unicycle_jacobian(self.x, x_pred)
+            if t is not None:
+                t = prof.lap("ekf.predict.jacobian", t)
+        self.x = x_pred
+        self._F = F
 
         # 誤差共分散予測: P = F*P*F^T + Q
         self.P = F @ self.P @ F.T + self.Q
+        if t is not None:
+            prof.lap("ekf.predict.covariance", t)
 
     def update(self, z):
         """
         更新ステップ
 
+        観測値の欠損（NaN またはマスク要素）は自動的に扱い、観測された成分
+        のみで部分更新する（すべて欠損の場合は更新を省略し、n_updates にも
+        数えない）
+
         Parameters
         ----------
         z : array-like, shape (3,)
@@ -73,31 +139,87 @@ class ExtendedKalmanFilter:
         Returns
         -------
         K : ndarray, shape (3, 3)
-            カルマンゲイン行列
+            カルマンゲイン行列（欠損成分の列は 0、すべて欠損の場合はゼロ行列）
         """
-        z = np.array(z)
+        prof = profiling.active()
+        t = prof.begin("ekf.update") if prof is not None else None
 
-        # 観測モデル（線形）: h(x) = x
-        # H = ∂h/∂x = I
-        H = np.eye(3)
+        if isinstance(z, np.ma.MaskedArray):
+            z = np.ma.filled(z.astype(float), np.nan)
+        z = np.asarray(z, dtype=float)
 
-        # イノベーション: y = z - h(x)
-        innovation = z - self.x
+        # 観測モデル（線形）: h(x) = x
+        # H = ∂h/∂x = I（欠損成分の行は 0）
+        full = bool(np.isfinite(z).all())
+        if full:
+            # すべて観測された通常の場合は H = I、マスク処理を省く
+            n_observed = 3
+            innovation = z - self.x
+            R = self.R
+        else:
+            observed = ~np.isnan(z)
+            n_observed = int(observed.sum())
+            if n_observed == 0:
+                # すべて欠損: 予測のみと等価なので更新せず、n_updates にも数えない
+                if prof is not None:
+                    prof.count("ekf.update.missing")
+                    prof.lap("ekf.update.missing", t)
+                return np.zeros((3, 3))
+            M = np.diag(observed.astype(float))
+            H = M
+            # イノベーション: y = z - h(x)（欠損成分は 0）
+            innovation = np.where(observed, z - self.x, 0.0)
+            # 欠損成分は R の対角を 1 に置き換え、S を正則に保つ
+            R = M @ self.R @ M + (np.eye(3) - M)
         innovation[2] = self._normalize_angle(innovation[2])
+        if t is not None:
+            t = prof.lap("ekf.update.jacobian", t)
+
+        # イノベーション共分散: S = H*P*H^T + R（P*H^T は H = I なら P）
+        PHt = self.P if full else self.P @ H.T
+        HPHt = PHt if full else H @ PHt
+        S = HPHt + R
+
+        S_inv = np.linalg.inv(S)
 
-        # イノベーション共分散: S = H*P*H^T + R
-        S = H @ self.P @ H.T + self.R
+        # ゲーティング / ロバスト重み（S^(-1) を再利用し、追加の逆行列は不要）
+        self.n_updates += 1
+        w = 1.0
+        if self.gate_threshold is not None or self.robust is not None:
+            self.nis = float(gating.mahalanobis_squared(innovation, S_inv))
+            w, gated = gating.measurement_weight(
+                self.nis,
+                n_observed,
+                self.gate_threshold,
+                self.gate_policy,
+                self.robust,
+                self.robust_param,
+                self.robust_iterations,
+            )
+            self.n_gated += int(gated)
+            self.n_rejected += int(w == 0.0)
+            S_inv = S_inv * w
 
         # カルマンゲイン: K = P*H^T*S^(-1)
-        K = self.P @ H.T @ np.linalg.inv(S)
+        K = PHt @ S_inv
+        if t is not None:
+            t = prof.lap("ekf.update.gain", t)
 
         # 状態更新: x = x + K*y
         self.x = self.x + K @ innovation
         self.x[2] = self._normalize_angle(self.x[2])
+        if t is not None:
+            t = prof.lap("ekf.update.state", t)
 
         # 誤差共分散更新: P = (I - K*H)*P
         I_ = np.eye(3)
-        self.P = (I_ - K @ H) @ self.P
+        self.P = ((I_ - K) if full else (I_ - K @ H)) @ self.P
+        if t is not None:
+            prof.lap("ekf.update.covariance", t)
+
+        # Q, R の適応推定（欠損・棄却のない観測のみ使用し、次のステップから反映）
+        if self.noise_estimator is not None and w > 0.0 and full:
+            self.Q, self.R = self.noise_estimator.step(innovation, HPHt, K, self.Q, self.R)
 
         return K
 
@@ -123,6 +245,40 @@ class ExtendedKalmanFilter:
         K = self.update(z)
         return self.x.copy(), K
 
+    def filter_sequence(self, zs, us):
+        """
+        観測・制御入力の系列をまとめて処理
+
+        欠損観測（NaN）は update 内で扱われる
+
+        Parameters
+        ----------
+        zs : array-like, shape (T, 3)
+            観測値の系列
+        us : array-like, shape (T, 2)
+            制御入力の系列
+
+        Returns
+        -------
+        xs : ndarray, shape (T, 3)
+            状態推定値の系列
+        Ps : ndarray, shape (T, 3, 3)
+            誤差共分散の系列
+        """
+        if isinstance(zs, np.ma.MaskedArray):
+            zs = np.ma.filled(zs.astype(float), np.nan)
+        zs = np.asarray(zs, dtype=float)
+        us = np.asarray(us, dtype=float)
+        T = zs.shape[0]
+        xs = np.empty((T, 3))
+        Ps = np.empty((T, 3, 3))
+        for k in range(T):
+            self.predict(us[k])
+            self.update(zs[k])
+            xs[k] = self.x
+            Ps[k] = self.P
+        return xs, Ps
+
     def _normalize_angle(self, angle):
         """
         角度を [-pi, pi] の範囲に正規化
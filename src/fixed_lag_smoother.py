@@ -0,0 +1,213 @@
+import numpy as np
+
+from .extended_kf import ExtendedKalmanFilter
+
+
+def _wrap(angle):
+    """角度を [-pi, pi) に正規化"""
+    return (angle + np.pi) % (2 * np.pi) - np.pi
+
+
+class FixedLagSmoother(ExtendedKalmanFilter):
+    """
+    オンラインの固定ラグ平滑化器（EKF + 窓内の RTS 平滑化）
+
+    直近 lag + 1 ステップ分の事後・予測モーメントと平滑化ゲイン
+    G_k = P_k F_{k+1}^T P_{k+1|k}^(-1) を固定長のリングバッファに保持する。
+    ゲインは予測時に1回だけ計算するため、各ステップの後ろ向きパスは
+    3×3 の行列積のみの O(lag) で、メモリも lag に比例する
+    """
+
+    def __init__(self, Q, R, x0, P0, dt=1.0, lag=10, **kwargs):
+        """
+        Parameters
+        ----------
+        Q : ndarray, shape (3, 3)
+            プロセスノイズ共分散行列
+        R : ndarray, shape (3, 3)
+            観測ノイズ共分散行列
+        x0 : ndarray, shape (3,)
+            初期状態 [x, y, theta]
+        P0 : ndarray, shape (3, 3)
+            初期誤差共分散行列
+        dt : float
+            時間ステップ (s)
+        lag : int
+            平滑化の遅れ L（ステップ数）
+        **kwargs
+            ExtendedKalmanFilter に渡す追加引数
+        """
+        if lag < 1:
+            raise ValueError("lag must be >= 1")
+        super().__init__(Q=Q, R=R, x0=x0, P0=P0, dt=dt, **kwargs)
+        self.lag = lag
+        self.capacity = lag + 1
+        self.k = 0  # 現在のステップ番号
+
+        N = self.capacity
+        self._xf = np.zeros((N, 3))  # 事後状態 x_{k|k}
+        self._Pf = np.zeros((N, 3, 3))
+        self._xp = np.zeros((N, 3))  # 予測状態 x_{k|k-1}
+        self._Pp = np.zeros((N, 3, 3))
+        self._G = np.zeros((N, 3, 3))  # 平滑化ゲイン G_k（次のスロットへの）
+        self._head = 0
+        self._count = 1
+        self._store(0)
+
+    def _store(self, i):
+        """現在の事後モーメントをスロット i に保存"""
+        self._xf[i] = self.x
+        self._Pf[i] = self.P
+
+    def _slot(self, steps_back):
+        """最新から steps_back ステップ前のスロットの添字"""
+        return (self._head - steps_back) % self.capacity
+
+    def predict(self, u):
+        """
+        予測ステップを実行し、平滑化ゲインと新しいスロットを保存
+
+        Parameters
+        ----------
+        u : array-like, shape (2,)
+            制御入力 [v, omega]
+        """
+        i = self._head
+        P_filtered = self.P
+        super().predict(u)
+
+        # G = P_k F^T P_{k+1|k}^(-1)（P_{k+1|k} は対称、F は直近の予測のヤコビアン）
+        self._G[i] = np.linalg.solve(self.P, self._F @ P_filtered).T
+
+        self.k += 1
+        j = self._head = (i + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self._xp[j] = self.x
+        self._Pp[j] = self.P
+        self._store(j)
+
+    def update(self, z):
+        """
+        更新ステップ（事後モーメントを最新スロットに保存）
+
+        Parameters
+        ----------
+        z : array-like, shape (3,)
+            観測値 [x_obs, y_obs, theta_obs]（NaN は欠損）
+
+        Returns
+        -------
+        K : ndarray, shape (3, 3)
+            カルマンゲイン行列
+        """
+        K = super().update(z)
+        self._store(self._head)
+        return K
+
+    def smoothed_window(self):
+        """
+        バッファ内の全ステップを現在までの観測で平滑化（古い順）
+
+        Returns
+        -------
+        steps : ndarray of int, shape (n,)
+            ステップ番号
+        xs : ndarray, shape (n, 3)
+            平滑化した状態
+        Ps : ndarray, shape (n, 3, 3)
+            平滑化した誤差共分散
+        """
+        n = self._count
+        xs = np.empty((n, 3))
+        Ps = np.empty((n, 3, 3))
+        xs[-1] = self.x
+        Ps[-1] = self.P
+        for back in range(1, n):
+            i = self._slot(back)
+            j = self._slot(back - 1)
+            G = self._G[i]
+            dx = xs[n - back] - self._xp[j]
+            dx[2] = _wrap(dx[2])
+            x = self._xf[i] + G @ dx
+            x[2] = _wrap(x[2])
+            xs[n - back - 1] = x
+            Ps[n - back - 1] = self._Pf[i] + G @ (Ps[n - back] - self._Pp[j]) @ G.T
+        steps = np.arange(self.k - n + 1, self.k + 1)
+        return steps, xs, Ps
+
+    def lagged(self):
+        """
+        lag ステップ前の平滑化推定値
+
+        Returns
+        -------
+        x : ndarray, shape (3,) or None
+            ステップ k - lag の平滑化した状態（lag ステップ未満の場合は None）
+        P : ndarray, shape (3, 3) or None
+            平滑化した誤差共分散
+        """
+        if self._count < self.capacity:
+            return None, None
+        # 後ろ向きパスは最も古いスロットまで進める必要があるため全体を計算
+        _, xs, Ps = self.smoothed_window()
+        return xs[0], Ps[0]
+
+    def step(self, z, u):
+        """
+        予測と更新を実行し、lag ステップ前の平滑化推定値を返す
+
+        Parameters
+        ----------
+        z : array-like, shape (3,)
+            観測値 [x_obs, y_obs, theta_obs]
+        u : array-like, shape (2,)
+            制御入力 [v, omega]
+
+        Returns
+        -------
+        x : ndarray, shape (3,) or None
+            ステップ k - lag の平滑化した状態
+        P : ndarray, shape (3, 3) or None
+            平滑化した誤差共分散
+        """
+        self.predict(u)
+        self.update(z)
+        return self.lagged()
+
+    def smooth_sequence(self, zs, us):
+        """
+        系列をオンラインで処理し、各ステップの固定ラグ平滑化推定値を取得
+
+        ステップ k の推定値はステップ k + lag までの観測を使う
+        （末尾の lag ステップは最後の窓で平滑化する）
+
+        Parameters
+        ----------
+        zs : array-like, shape (T, 3)
+            観測値の系列
+        us : array-like, shape (T, 2)
+            制御入力の系列
+
+        Returns
+        -------
+        xs : ndarray, shape (T, 3)
+            平滑化した状態の系列（ステップ 1..T）
+        Ps : ndarray, shape (T, 3, 3)
+            平滑化した誤差共分散の系列
+        """
+        zs = np.asarray(zs, dtype=float)
+        us = np.asarray(us, dtype=float)
+        T = zs.shape[0]
+        start = self.k + 1
+        xs = np.empty((T, 3))
+        Ps = np.empty((T, 3, 3))
+        for k in range(T):
+            x, P = self.step(zs[k], us[k])
+            if x is not None and self.k - self.lag >= start:
+                xs[self.k - self.lag - start] = x
+                Ps[self.k - self.lag - start] = P
+        steps, x_window, P_window = self.smoothed_window()
+        tail = steps >= max(start, self.k - self.lag + 1)
+        xs[steps[tail] - start] = x_window[tail]
+        Ps[steps[tail] - start] = P_window[tail]
+        return xs, Ps
@@ -0,0 +1,350 @@
+"""
+スレッドプールで並列化したロボット群 (フリート) の EKF トラッカ
+
+ロボットをシャードに分割し、各シャードは状態・誤差共分散を積み重ねた配列
+(n, 3) / (n, 3, 3) として保持する。シャードの処理は GIL を解放する NumPy の
+バッチ演算 (backends.ekf_fleet_step) で行い、排他制御はシャードごとのロックで行う。
+
+step には全ロボット（または一部）の ID と、それに対応する入力を渡す。
+各ワーカが担当シャードの両端キューを持ち、自分のキューが空になると
+残りの作業量（ロボット数）が最も多いワーカのキューの末尾からシャードを奪う
+（ワークスティーリング）
+"""
+
+import collections
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .backends import ekf_fleet_step
+
+
+class _Shard:
+    """ロボットの部分集合の積み重ねた状態"""
+
+    def __init__(self, capacity=16):
+        self.lock = threading.Lock()
+        self.n = 0
+        self.ids = np.empty(capacity, dtype=np.intp)
+        self.x = np.empty((capacity, 3))
+        self.P = np.empty((capacity, 3, 3))
+
+    def append(self, robot_id, x0, P0):
+        """ロボットを末尾に追加し、その行を返す"""
+        if self.n == len(self.ids):
+            self._grow(2 * len(self.ids))
+        row = self.n
+        self.ids[row] = robot_id
+        self.x[row] = x0
+        self.P[row] = P0
+        self.n += 1
+        return row
+
+    def remove(self, row):
+        """行を削除（末尾の行で埋める）し、移動したロボット ID を返す"""
+        last = self.n - 1
+        moved = None
+        if row != last:
+            self.ids[row] = self.ids[last]
+            self.x[row] = self.x[last]
+            self.P[row] = self.P[last]
+            moved = int(self.ids[row])
+        self.n = last
+        return moved
+
+    def _grow(self, capacity):
+        """バッファの容量を拡張（既存要素をコピー）"""
+        n = self.n
+        ids = np.empty(capacity, dtype=np.intp)
+        x = np.empty((capacity, 3))
+        P = np.empty((capacity, 3, 3))
+        ids[:n] = self.ids[:n]
+        x[:n] = self.x[:n]
+        P[:n] = self.P[:n]
+        self.ids, self.x, self.P = ids, x, P
+
+
+class FleetTracker:
+    """
+    シャード化したロボット群の EKF トラッカ
+
+    各ロボットは ExtendedKalmanFilter の既定設定（オイラー積分の運動モデル、
+    [x, y, theta] の観測、NaN は欠損）と同じモデルで推定する
+    """
+
+    def __init__(self, Q, R, dt=1.0, n_shards=None, n_workers=None):
+        """
+        Parameters
+        ----------
+        Q : ndarray, shape (3, 3)
+            プロセスノイズ共分散行列（全ロボット共通）
+        R : ndarray, shape (3, 3)
+            観測ノイズ共分散行列（全ロボット共通）
+        dt : float
+            時間ステップ (s)
+        n_shards : int, optional
+            シャード数（省略時はワーカ数の4倍）
+        n_workers : int, optional
+            ワーカスレッド数（省略時は CPU 数）
+        """
+        self.Q = np.array(Q, dtype=float)
+        self.R = np.array(R, dtype=float)
+        self.dt = dt
+        self.n_workers = n_workers or os.cpu_count() or 1
+        n_shards = n_shards or 4 * self.n_workers
+        self.shards = [_Shard() for _ in range(n_shards)]
+        self._location = {}  # robot_id -> [shard, row]
+        self._next_id = 0
+        self._registry_lock = threading.Lock()
+        self._steal_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(self.n_workers) if self.n_workers > 1 else None
+        self.n_steals = 0
+
+    def __len__(self):
+        return len(self._location)
+
+    def close(self):
+        """ワーカスレッドを終了"""
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_robot(self, x0, P0):
+        """
+        ロボットを追加（最もロボット数の少ないシャードに割り当てる）
+
+        Parameters
+        ----------
+        x0 : array-like, shape (3,)
+            初期状態
+        P0 : array-like, shape (3, 3)
+            初期誤差共分散行列
+
+        Returns
+        -------
+        robot_id : int
+            ロボット ID
+        """
+        with self._registry_lock:
+            robot_id = self._next_id
+            self._next_id += 1
+            index = min(range(len(self.shards)), key=lambda i: self.shards[i].n)
+            shard = self.shards[index]
+            with shard.lock:
+                row = shard.append(robot_id, x0, P0)
+            self._location[robot_id] = [index, row]
+        return robot_id
+
+    def add_robots(self, x0, P0):
+        """
+        複数のロボットを追加
+
+        Parameters
+        ----------
+        x0 : array-like, shape (N, 3)
+            初期状態
+        P0 : array-like, shape (3, 3) or (N, 3, 3)
+            初期誤差共分散行列
+
+        Returns
+        -------
+        robot_ids : ndarray, shape (N,)
+            ロボット ID
+        """
+        x0 = np.asarray(x0, dtype=float)
+        P0 = np.broadcast_to(np.asarray(P0, dtype=float), (len(x0), 3, 3))
+        return np.array([self.add_robot(x, P) for x, P in zip(x0, P0)], dtype=np.intp)
+
+    def remove_robot(self, robot_id):
+        """
+        ロボットを削除
+
+        Parameters
+        ----------
+        robot_id : int
+            ロボット ID
+        """
+        with self._registry_lock:
+            index, row = self._location.pop(robot_id)
+            shard = self.shards[index]
+            with shard.lock:
+                moved = shard.remove(row)
+                if moved is not None:
+                    self._location[moved][1] = row
+
+    def state(self, robot_id):
+        """
+        Returns
+        -------
+        x : ndarray, shape (3,)
+            状態推定値
+        P : ndarray, shape (3, 3)
+            誤差共分散行列
+        """
+        index, row = self._location[robot_id]
+        shard = self.shards[index]
+        with shard.lock:
+            return shard.x[row].copy(), shard.P[row].copy()
+
+    def states(self):
+        """
+        全ロボットの状態をロボット ID 順に取得
+
+        Returns
+        -------
+        robot_ids : ndarray, shape (N,)
+            ロボット ID（昇順）
+        x : ndarray, shape (N, 3)
+            状態推定値
+        P : ndarray, shape (N, 3, 3)
+            誤差共分散行列
+        """
+        ids, xs, Ps = [], [], []
+        for shard in self.shards:
+            with shard.lock:
+                ids.append(shard.ids[: shard.n].copy())
+                xs.append(shard.x[: shard.n].copy())
+                Ps.append(shard.P[: shard.n].copy())
+        robot_ids = np.concatenate(ids)
+        order = np.argsort(robot_ids)
+        return robot_ids[order], np.concatenate(xs)[order], np.concatenate(Ps)[order]
+
+    def _process(self, shard, ids_sorted, order, us, zs):
+        """
+        シャード1つ分の予測と更新
+
+        行のロボット ID を入力のロボット ID（昇順に並べた ids_sorted）から探し、
+        入力のあるロボットのみを処理する。行の解決はシャードのロック内で行う
+        ため、並行する remove_robot による行の移動の影響を受けない
+
+        Returns
+        -------
+        n : int
+            処理したロボット数
+        """
+        with shard.lock:
+            n = shard.n
+            if n == 0 or len(ids_sorted) == 0:
+                return 0
+            ids = shard.ids[:n]
+            pos = np.minimum(np.searchsorted(ids_sorted, ids), len(ids_sorted) - 1)
+            found = ids_sorted[pos] == ids
+            k = order[pos[found]]
+            if found.all():
+                # シャード全体をその場で更新
+                ekf_fleet_step(shard.x[:n], shard.P[:n], zs[k], us[k], self.Q, self.R, self.dt)
+                return n
+            rows = np.flatnonzero(found)
+            if len(rows) == 0:
+                return 0
+            x = shard.x[rows]
+            P = shard.P[rows]
+            ekf_fleet_step(x, P, zs[k], us[k], self.Q, self.R, self.dt)
+            shard.x[rows] = x
+            shard.P[rows] = P
+            return len(rows)
+
+    def _worker(self, queues, me, ids_sorted, order, us, zs):
+        """
+        自分のキューを処理し、空になれば他のワーカからシャードを奪う
+
+        Returns
+        -------
+        n : int
+            処理したロボット数
+        """
+        own = queues[me]
+        count = 0
+        while True:
+            try:
+                shard = own.popleft()
+            except IndexError:
+                # 残りのロボット数が最も多いキューの末尾から奪う
+                victim = max(queues, key=lambda q: sum(s.n for s in list(q)))
+                try:
+                    shard = victim.pop()
+                except IndexError:
+                    return count
+                with self._steal_lock:
+                    self.n_steals += 1
+            count += self._process(shard, ids_sorted, order, us, zs)
+
+    @staticmethod
+    def _sort_inputs(robot_ids, us, zs):
+        """入力を配列に変換し、ロボット ID の昇順の並びを求める"""
+        robot_ids = np.asarray(robot_ids, dtype=np.intp).ravel()
+        order = np.argsort(robot_ids, kind="stable")
+        return robot_ids[order], order, np.asarray(us, dtype=float), np.asarray(zs, dtype=float)
+
+    def step(self, robot_ids, us, zs):
+        """
+        指定したロボットの予測と更新をシャードごとに並列に実行
+
+        Parameters
+        ----------
+        robot_ids : array-like of int, shape (K,)
+            ロボット ID（登録されていない ID と削除済みの ID の入力は無視する）
+        us : array-like, shape (K, 2)
+            robot_ids に対応する制御入力 [v, omega]
+        zs : array-like, shape (K, 3)
+            robot_ids に対応する観測値（NaN は欠損）
+
+        Returns
+        -------
+        n : int
+            処理したロボット数
+        """
+        ids_sorted, order, us, zs = self._sort_inputs(robot_ids, us, zs)
+
+        if self._executor is None:
+            return sum(self._process(shard, ids_sorted, order, us, zs) for shard in self.shards)
+
+        # シャードをロボット数の多い順にワーカへ割り当てる
+        queues: list = [collections.deque() for _ in range(self.n_workers)]
+        shards = sorted(self.shards, key=lambda s: s.n, reverse=True)
+        for i, shard in enumerate(shards):
+            queues[i % self.n_workers].append(shard)
+        futures = [
+            self._executor.submit(self._worker, queues, me, ids_sorted, order, us, zs)
+            for me in range(self.n_workers)
+        ]
+        return sum(future.result() for future in futures)
+
+    def update(self, robot_ids, us, zs):
+        """
+        一部のロボットだけを予測・更新（他スレッドからの非同期な観測の取り込み）
+
+        対象ロボットのシャードのロックのみを取得する。ロボットのシャードは
+        登録ロックの下で引き、シャード内の行はシャードのロックの下で
+        シャードのロボット ID から引くため、並行する remove_robot で行が
+        移動しても別のロボットに観測を適用することはない
+
+        Parameters
+        ----------
+        robot_ids : array-like of int, shape (K,)
+            ロボット ID（登録されていない ID と削除済みの ID の入力は無視する）
+        us : array-like, shape (K, 2)
+            制御入力
+        zs : array-like, shape (K, 3)
+            観測値（NaN は欠損）
+
+        Returns
+        -------
+        n : int
+            処理したロボット数
+        """
+        ids_sorted, order, us, zs = self._sort_inputs(robot_ids, us, zs)
+        with self._registry_lock:
+            locations = [self._location.get(int(robot_id)) for robot_id in ids_sorted]
+        indices = {location[0] for location in locations if location is not None}
+        return sum(
+            self._process(self.shards[index], ids_sorted, order, us, zs)
+            for index in sorted(indices)
+        )
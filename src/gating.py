@@ -0,0 +1,122 @@
+import numpy as np
+
+# カイ二乗分布の 99% 点（自由度 1〜3）。ゲート閾値の目安
+CHI2_99 = {1: 6.635, 2: 9.210, 3: 11.345}
+
+GATE_POLICIES = ("reject", "inflate")
+ROBUST_METHODS = ("huber", "student_t")
+
+
+def mahalanobis_squared(innovation, S_inv):
+    """
+    イノベーションのマハラノビス距離の2乗 (NIS)
+
+    Parameters
+    ----------
+    innovation : ndarray, shape (..., m)
+        イノベーション
+    S_inv : ndarray, shape (..., m, m)
+        イノベーション共分散の逆行列
+
+    Returns
+    -------
+    d2 : ndarray, shape (...)
+        y^T S^(-1) y
+    """
+    return np.einsum("...i,...ij,...j->...", innovation, S_inv, innovation)
+
+
+def robust_weight(d2, dof, method="huber", param=None, iterations=5):
+    """
+    ロバスト更新の重み（反復再重み付け）
+
+    イノベーション共分散を S / w に置き換えると距離は w * d2 になるため、
+    重みの固定点反復はスカラー演算のみで行える（追加の逆行列計算は不要）。
+    振動を避けるため、反復は新旧の重みの幾何平均で減衰させる
+
+    Parameters
+    ----------
+    d2 : float or ndarray
+        マハラノビス距離の2乗
+    dof : int or ndarray
+        観測の自由度（Student-t で使用）
+    method : str
+        "huber" または "student_t"
+    param : float, optional
+        Huber の閾値 k（距離単位、既定 3.0）または Student-t の自由度 nu（既定 4.0）
+    iterations : int
+        固定点反復の回数
+
+    Returns
+    -------
+    w : float or ndarray
+        重み (0 < w <= 1)
+    """
+    d2 = np.asarray(d2, dtype=float)
+    w = np.ones_like(d2)
+    if method == "huber":
+        k = 3.0 if param is None else param
+        for _ in range(iterations):
+            w = np.sqrt(w * np.minimum(1.0, k / np.sqrt(np.maximum(w * d2, 1e-300))))
+    elif method == "student_t":
+        nu = 4.0 if param is None else param
+        for _ in range(iterations):
+            w = np.sqrt(w * np.minimum(1.0, (nu + dof) / (nu + w * d2)))
+    else:
+        raise ValueError(f"unknown robust method: {method}")
+    return w
+
+
+def measurement_weight(
+    d2,
+    dof,
+    gate_threshold=None,
+    gate_policy="reject",
+    robust=None,
+    robust_param=None,
+    robust_iterations=5,
+):
+    """
+    ゲーティングとロバスト重みを合成した観測の重み
+
+    更新では S^(-1) を w 倍（K を w 倍）する。w = 0 は棄却を意味する
+
+    Parameters
+    ----------
+    d2 : float or ndarray
+        マハラノビス距離の2乗
+    dof : int or ndarray
+        観測の自由度
+    gate_threshold : float, optional
+        ゲート閾値（d2 に対する値。None の場合はゲートしない）
+    gate_policy : str
+        "reject"（棄却）または "inflate"（d2 が閾値になるまで S を拡大）
+    robust : str, optional
+        "huber" または "student_t"
+    robust_param : float, optional
+        ロバスト関数のパラメータ
+    robust_iterations : int
+        ロバスト重みの反復回数
+
+    Returns
+    -------
+    w : ndarray
+        観測の重み
+    gated : ndarray of bool
+        ゲート閾値を超えたかどうか
+    """
+    d2 = np.asarray(d2, dtype=float)
+    w = np.ones_like(d2)
+    if gate_threshold is None:
+        gated = np.zeros(d2.shape, dtype=bool)
+    else:
+        gated = d2 > gate_threshold
+        if gate_policy == "reject":
+            w = np.where(gated, 0.0, w)
+        elif gate_policy == "inflate":
+            w = np.where(gated, gate_threshold / np.maximum(d2, 1e-300), w)
+        else:
+            raise ValueError(f"unknown gate policy: {gate_policy}")
+    if robust is not None:
+        w = w * robust_weight(d2, dof, robust, robust_param, robust_iterations)
+    return w, gated
@@ -0,0 +1,197 @@
+import numpy as np
+
+# 運動モードごとの [速度の保持率, 角速度の保持率]
+#   cv: 等速直進（角速度を 0 とみなす）
+#   ct: 協調旋回（速度・角速度を保持）
+#   stationary: 停止（速度・角速度を 0 とみなす）
+MOTION_MODES = {
+    "cv": (1.0, 0.0),
+    "ct": (1.0, 1.0),
+    "stationary": (0.0, 0.0),
+}
+
+
+def _wrap(d):
+    """状態差分の方位角成分を [-pi, pi) に正規化（最後の軸が状態）"""
+    d = np.array(d, dtype=float)
+    d[..., 2] = (d[..., 2] + np.pi) % (2 * np.pi) - np.pi
+    return d
+
+
+class IMMFilter:
+    """
+    複数の運動モデルを切り替える IMM (Interacting Multiple Model) 推定器
+
+    状態: [x, y, theta, v, omega]
+    観測: [x, y, theta]
+
+    全モデルのフィルタを shape (M, 5) / (M, 5, 5) の配列に積み重ね、
+    混合・予測・更新をモデル数に対してベクトル化して1回ずつ計算する
+    """
+
+    def __init__(
+        self, Q, R, x0, P0, transition, modes=("cv", "ct", "stationary"), mu0=None, dt=1.0
+    ):
+        """
+        Parameters
+        ----------
+        Q : ndarray, shape (5, 5) or (M, 5, 5)
+            モデルごとのプロセスノイズ共分散行列
+        R : ndarray, shape (3, 3)
+            観測ノイズ共分散行列
+        x0 : ndarray, shape (5,)
+            初期状態 [x, y, theta, v, omega]
+        P0 : ndarray, shape (5, 5)
+            初期誤差共分散行列
+        transition : ndarray, shape (M, M)
+            モード遷移確率行列（transition[i, j] = P(モード j | モード i)）
+        modes : sequence of str
+            運動モード名（MOTION_MODES のキー）
+        mu0 : ndarray, shape (M,), optional
+            初期モード確率（省略時は一様）
+        dt : float
+            時間ステップ (s)
+        """
+        self.modes = tuple(modes)
+        M = len(self.modes)
+        retention = np.array([MOTION_MODES[m] for m in self.modes])
+        self._a_v = retention[:, 0]
+        self._a_w = retention[:, 1]
+
+        self.Q = np.array(np.broadcast_to(Q, (M, 5, 5)), dtype=float)
+        self.R = np.array(R, dtype=float)
+        self.transition = np.array(transition, dtype=float)
+        if self.transition.shape != (M, M):
+            raise ValueError("transition must have shape (M, M)")
+        self.dt = dt
+
+        self.xs = np.tile(np.asarray(x0, dtype=float), (M, 1))
+        self.Ps = np.tile(np.asarray(P0, dtype=float), (M, 1, 1))
+        self.mu = np.full(M, 1.0 / M) if mu0 is None else np.array(mu0, dtype=float)
+        self.log_likelihood = np.zeros(M)
+
+    @property
+    def mode_probabilities(self):
+        """モード確率 (M,)"""
+        return self.mu.copy()
+
+    @property
+    def x(self):
+        """モード確率で重み付けした状態推定値 (5,)"""
+        ref = self.xs[np.argmax(self.mu)]
+        return _wrap(ref + self.mu @ _wrap(self.xs - ref))
+
+    @property
+    def P(self):
+        """モード確率で重み付けした誤差共分散行列 (5, 5)"""
+        d = _wrap(self.xs - self.x)
+        spread = self.Ps + d[:, :, None] * d[:, None, :]
+        return np.einsum("m,mij->ij", self.mu, spread)
+
+    def predict(self):
+        """混合と各モデルの予測ステップ"""
+        # 混合確率: mu_{i|j} = T_ij mu_i / c_j
+        c = self.mu @ self.transition
+        mix = self.transition * self.mu[:, None] / np.maximum(c, 1e-300)
+
+        # 混合後の初期値（方位角は差分で平均）
+        d = _wrap(self.xs[:, None, :] - self.xs[None, :, :])  # d[i, j] = x_i - x_j
+        x_mix = _wrap(self.xs + np.einsum("ij,ijk->jk", mix, d))
+        e = _wrap(self.xs[:, None, :] - x_mix[None, :, :])
+        P_mix = np.einsum("ij,ijkl->jkl", mix, self.Ps[:, None] + e[..., :, None] * e[..., None, :])
+        self.mu = c
+
+        # 全モデルの予測を一括計算
+        dt = self.dt
+        theta = x_mix[:, 2]
+        v = x_mix[:, 3]
+        omega = x_mix[:, 4]
+        cos_t = np.cos(theta)
+        sin_t = np.sin(theta)
+        a_v = self._a_v
+        a_w = self._a_w
+
+        xs = np.empty_like(x_mix)
+        xs[:, 0] = x_mix[:, 0] + a_v * v * cos_t * dt
+        xs[:, 1] = x_mix[:, 1] + a_v * v * sin_t * dt
+        xs[:, 2] = theta + a_w * omega * dt
+        xs[:, 3] = a_v * v
+        xs[:, 4] = a_w * omega
+        self.xs = _wrap(xs)
+
+        # ヤコビアン行列 F (M, 5, 5)
+        M = len(self.modes)
+        F = np.zeros((M, 5, 5))
+        F[:, 0, 0] = 1.0
+        F[:, 1, 1] = 1.0
+        F[:, 2, 2] = 1.0
+        F[:, 0, 2] = -a_v * v * sin_t * dt
+        F[:, 0, 3] = a_v * cos_t * dt
+        F[:, 1, 2] = a_v * v * cos_t * dt
+        F[:, 1, 3] = a_v * sin_t * dt
+        F[:, 2, 4] = a_w * dt
+        F[:, 3, 3] = a_v
+        F[:, 4, 4] = a_w
+
+        # 誤差共分散予測: P = F*P*F^T + Q
+        self.Ps = F @ P_mix @ F.transpose(0, 2, 1) + self.Q
+
+    def update(self, z):
+        """
+        全モデルの更新とモード確率の更新
+
+        Parameters
+        ----------
+        z : array-like, shape (3,)
+            観測値 [x_obs, y_obs, theta_obs]
+
+        Returns
+        -------
+        mu : ndarray, shape (M,)
+            更新後のモード確率
+        """
+        z = np.asarray(z, dtype=float)
+
+        # イノベーション: y = z - H*x (M, 3)
+        y = z - self.xs[:, :3]
+        y[:, 2] = (y[:, 2] + np.pi) % (2 * np.pi) - np.pi
+
+        # イノベーション共分散とカルマンゲイン（H の構造から部分行列で計算）
+        S = self.Ps[:, :3, :3] + self.R
+        S_inv = np.linalg.inv(S)
+        PHt = self.Ps[:, :, :3]
+        K = PHt @ S_inv
+
+        self.xs = _wrap(self.xs + np.einsum("mij,mj->mi", K, y))
+        self.Ps = self.Ps - K @ PHt.transpose(0, 2, 1)
+
+        # 尤度 N(y; 0, S) とモード確率（対数領域で正規化）
+        _, logdet = np.linalg.slogdet(S)
+        d2 = np.einsum("mi,mij,mj->m", y, S_inv, y)
+        self.log_likelihood = -0.5 * (d2 + logdet + 3 * np.log(2 * np.pi))
+        log_mu = np.log(np.maximum(self.mu, 1e-300)) + self.log_likelihood
+        log_mu -= log_mu.max()
+        mu = np.exp(log_mu)
+        self.mu = mu / mu.sum()
+
+        return self.mu.copy()
+
+    def filter_step(self, z):
+        """
+        予測と更新を実行
+
+        Parameters
+        ----------
+        z : array-like, shape (3,)
+            観測値 [x_obs, y_obs, theta_obs]
+
+        Returns
+        -------
+        x : ndarray, shape (5,)
+            統合した状態推定値
+        mu : ndarray, shape (M,)
+            モード確率
+        """
+        self.predict()
+        mu = self.update(z)
+        return self.x, mu
@@ -0,0 +1,220 @@
+import numpy as np
+
+
+def _normalize_angles(angles):
+    """角度の配列を [-pi, pi) に正規化"""
+    return (angles + np.pi) % (2 * np.pi) - np.pi
+
+
+def information_contribution(z, x_lin, R, H=None):
+    """
+    観測の情報行列・情報ベクトルへの寄与（ベクトル化）
+
+    独立な観測の寄与は単純な和で合成できるため、観測の束を分割して
+    スレッド・プロセスで並列に計算し、結果を足し合わせることができる
+
+    Parameters
+    ----------
+    z : array-like, shape (N, m)
+        観測値
+    x_lin : array-like, shape (3,)
+        線形化点（予測状態の平均）
+    R : array-like, shape (m, m) or (N, m, m)
+        観測ノイズ共分散行列
+    H : array-like, shape (m, 3) or (N, m, 3), optional
+        観測行列。省略時は姿勢の直接観測 h(x) = x（m = 3、方位角を正規化）
+
+    Returns
+    -------
+    dY : ndarray, shape (3, 3)
+        情報行列への寄与 sum H^T R^(-1) H
+    dy : ndarray, shape (3,)
+        情報ベクトルへの寄与 sum H^T R^(-1) (z - h(x_lin) + H x_lin)
+    """
+    z = np.atleast_2d(np.asarray(z, dtype=float))
+    x_lin = np.asarray(x_lin, dtype=float)
+    R_inv = np.linalg.inv(np.asarray(R, dtype=float))
+
+    if H is None:
+        # h(x) = x: イノベーションの方位角を正規化してから線形化点を足し戻す
+        innovation = z - x_lin
+        innovation[:, 2] = _normalize_angles(innovation[:, 2])
+        z_lin = innovation + x_lin
+        if R_inv.ndim == 2:
+            return len(z) * R_inv, R_inv @ z_lin.sum(axis=0)
+        return R_inv.sum(axis=0), np.einsum("nij,nj->i", R_inv, z_lin)
+
+    H = np.asarray(H, dtype=float)
+    if H.ndim == 2:
+        H = np.broadcast_to(H, (len(z),) + H.shape)
+    if R_inv.ndim == 2:
+        R_inv = np.broadcast_to(R_inv, (len(z),) + R_inv.shape)
+    HtRinv = np.einsum("nji,njk->nik", H, R_inv)
+    return np.einsum("nij,njk->ik", HtRinv, H), np.einsum("nij,nj->i", HtRinv, z)
+
+
+def _contribution_task(args):
+    """プロセスプールから呼び出すための引数展開"""
+    return information_contribution(*args)
+
+
+class ExtendedInformationFilter:
+    """
+    2Dロボット用の拡張情報フィルタ
+
+    状態: [x, y, theta]
+    制御入力: [v, omega]
+
+    情報行列 Y = P^(-1) と情報ベクトル y = P^(-1) x を保持し、
+    独立な観測は Y, y への加算のみで融合する。
+    平均・共分散への変換は参照時にのみ行う
+    """
+
+    def __init__(self, Q, x0, P0, dt=1.0):
+        """
+        Parameters
+        ----------
+        Q : ndarray, shape (3, 3)
+            プロセスノイズ共分散行列
+        x0 : ndarray, shape (3,)
+            初期状態 [x, y, theta]
+        P0 : ndarray, shape (3, 3)
+            初期誤差共分散行列
+        dt : float
+            時間ステップ (s)
+        """
+        self.Q = np.array(Q, dtype=float)
+        self.dt = dt
+        self.Y = np.linalg.inv(np.array(P0, dtype=float))
+        self.y = self.Y @ np.array(x0, dtype=float)
+        self._x = None
+        self._P = None
+
+    @property
+    def x(self):
+        """状態の平均（必要時に Y x = y を解いてキャッシュ）"""
+        if self._x is None:
+            x = np.linalg.solve(self.Y, self.y)
+            theta = _normalize_angles(x[2])
+            if theta != x[2]:
+                # 方位角を折り返した場合は y も合わせ、次の更新の線形化点と y を一致させる
+                x[2] = theta
+                self.y = self.Y @ x
+            self._x = x
+        return self._x
+
+    @property
+    def P(self):
+        """誤差共分散行列（必要時に Y を逆行列化してキャッシュ）"""
+        if self._P is None:
+            self._P = np.linalg.inv(self.Y)
+        return self._P
+
+    def predict(self, u):
+        """
+        予測ステップ
+
+        Parameters
+        ----------
+        u : array-like, shape (2,)
+            制御入力 [v, omega]
+        """
+        v, omega = u
+        x, y, theta = self.x
+
+        # 状態予測（非線形運動モデル）
+        theta_pred = _normalize_angles(theta + omega * self.dt)
+        x_pred = np.array(
+            [x + v * np.cos(theta) * self.dt, y + v * np.sin(theta) * self.dt, theta_pred]
+        )
+
+        # ヤコビアン行列 F
+        F = np.array(
+            [[1, 0, -v * np.sin(theta) * self.dt], [0, 1, v * np.cos(theta) * self.dt], [0, 0, 1]]
+        )
+
+        # P = F*P*F^T + Q を情報形式に戻す
+        P_pred = F @ self.P @ F.T + self.Q
+        self.Y = np.linalg.inv(P_pred)
+        self.y = self.Y @ x_pred
+        self._x = x_pred
+        self._P = P_pred
+
+    def fuse(self, dY, dy):
+        """
+        計算済みの情報寄与を加算
+
+        Parameters
+        ----------
+        dY : ndarray, shape (3, 3)
+            情報行列への寄与
+        dy : ndarray, shape (3,)
+            情報ベクトルへの寄与
+        """
+        self.Y = self.Y + dY
+        self.y = self.y + dy
+        self._x = None
+        self._P = None
+
+    def update(self, z, R, H=None):
+        """
+        更新ステップ（1つまたは複数の独立な観測）
+
+        Parameters
+        ----------
+        z : array-like, shape (m,) or (N, m)
+            観測値
+        R : array-like, shape (m, m) or (N, m, m)
+            観測ノイズ共分散行列
+        H : array-like, shape (m, 3) or (N, m, 3), optional
+            観測行列（省略時は姿勢の直接観測）
+        """
+        self.fuse(*information_contribution(z, self.x, R, H))
+
+    def update_parallel(self, z, R, H=None, executor=None, n_chunks=None):
+        """
+        観測の束を分割して並列に情報寄与を計算し、和を融合
+
+        Parameters
+        ----------
+        z : array-like, shape (N, m)
+            観測値
+        R : array-like, shape (m, m) or (N, m, m)
+            観測ノイズ共分散行列
+        H : array-like, shape (m, 3) or (N, m, 3), optional
+            観測行列（省略時は姿勢の直接観測）
+        executor : concurrent.futures.Executor, optional
+            ThreadPoolExecutor または ProcessPoolExecutor（省略時は逐次計算）
+        n_chunks : int, optional
+            分割数（省略時は executor のワーカ数、なければ 1）
+        """
+        z = np.atleast_2d(np.asarray(z, dtype=float))
+        R = np.asarray(R, dtype=float)
+        H = None if H is None else np.asarray(H, dtype=float)
+        if n_chunks is None:
+            n_chunks = getattr(executor, "_max_workers", 1)
+        n_chunks = max(1, min(n_chunks, len(z)))
+
+        x_lin = self.x.copy()
+        bounds = np.linspace(0, len(z), n_chunks + 1).astype(int)
+        tasks = [
+            (
+                z[a:b],
+                x_lin,
+                R[a:b] if R.ndim == 3 else R,
+                H[a:b] if H is not None and H.ndim == 3 else H,
+            )
+            for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+        results = (
+            map(_contribution_task, tasks)
+            if executor is None
+            else executor.map(_contribution_task, tasks)
+        )
+
+        dY = np.zeros((3, 3))
+        dy = np.zeros(3)
+        for dY_i, dy_i in results:
+            dY += dY_i
+            dy += dy_i
+        self.fuse(dY, dy)
@@ -0,0 +1,390 @@
+"""
+2D LiDAR のシミュレーション（ビームのレイキャスト）
+
+障害物地図は線分の集合 (SegmentMap) または占有格子 (OccupancyGrid) で表し、
+全ビームの交差判定を配列演算でまとめて計算する。
+
+一様格子の走査 (_traverse) は、各ビームが横切る縦・横の格子線の交点の
+パラメータ t を並べてソートし、隣り合う交点の中点が含まれるセルを
+ビームが通過するセルとして列挙する（DDA と同じセル列をベクトル化して得る）。
+SegmentMap はこの走査で得たセルに登録された線分のみと交差判定する
+
+使い方:
+    world = SegmentMap(segments)
+    lidar = Lidar2D(world, n_beams=360, max_range=20.0, noise_std=0.01)
+    ranges = lidar.scan(robot.get_state())
+"""
+
+import math
+
+import numpy as np
+
+# 全組み合わせ（ビーム×線分）で判定する線分数の上限
+_BRUTE_FORCE_SEGMENTS = 64
+# 1回の配列演算で扱う要素数の目安（メモリ使用量を抑える）
+_CHUNK_ELEMENTS = 1 << 22
+# SegmentMap の走査で一度に処理する通過セル数
+_BAND = 8
+
+
+def _cross(ax, ay, bx, by):
+    """2次元ベクトルの外積（z 成分）"""
+    return ax * by - ay * bx
+
+
+def _intersect(ox, oy, dx, dy, segments, max_range):
+    """
+    レイ o + t*d と線分の交点までの距離 t（交差しない場合は inf）
+
+    引数は互いにブロードキャスト可能な配列
+    """
+    ex = segments[..., 2] - segments[..., 0]
+    ey = segments[..., 3] - segments[..., 1]
+    wx = segments[..., 0] - ox
+    wy = segments[..., 1] - oy
+    denom = _cross(dx, dy, ex, ey)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = _cross(wx, wy, ex, ey) / denom
+        s = _cross(wx, wy, dx, dy) / denom
+    hit = (denom != 0.0) & (t >= 0.0) & (t <= max_range) & (s >= 0.0) & (s <= 1.0)
+    return np.where(hit, t, np.inf)
+
+
+def _traverse(ox, oy, dx, dy, max_range, origin, cell_size, shape):
+    """
+    一様格子上で各ビームが通過するセルを列挙
+
+    Parameters
+    ----------
+    ox, oy : ndarray, shape (B,)
+        ビームの始点
+    dx, dy : ndarray, shape (B,)
+        ビームの単位方向ベクトル
+    max_range : float
+        最大距離
+    origin : tuple of float
+        格子の原点（セル (0, 0) の左下の座標）
+    cell_size : float
+        セルの一辺の長さ
+    shape : tuple of int
+        格子のセル数 (ny, nx)
+
+    Returns
+    -------
+    t_entry : ndarray, shape (B, K)
+        各セルに入る距離（ビームに沿った順）
+    ix, iy : ndarray of int, shape (B, K)
+        セルの添字
+    valid : ndarray of bool, shape (B, K)
+        格子内かつ max_range 以内のセル
+    """
+    ny, nx = shape
+    n = int(math.ceil(max_range / cell_size)) + 1
+    k = np.arange(1, n + 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossings = []
+        for o, d, o0 in ((ox, dx, origin[0]), (oy, dy, origin[1])):
+            base = np.floor((o - o0) / cell_size)[:, None]
+            # 正の向きは次の格子線から、負の向きは現在のセルの下端から
+            lines = o0 + np.where(d[:, None] > 0, base + k, base - k + 1) * cell_size
+            t = (lines - o[:, None]) / d[:, None]
+            crossings.append(np.where(np.isfinite(t) & (t >= 0.0), t, np.inf))
+    T = np.concatenate([np.zeros((len(ox), 1)), *crossings], axis=1)
+    T.sort(axis=1)
+    np.minimum(T, max_range, out=T)
+
+    t_entry = T[:, :-1]
+    mid = 0.5 * (t_entry + T[:, 1:])
+    ix = np.floor((ox[:, None] + mid * dx[:, None] - origin[0]) / cell_size).astype(np.intp)
+    iy = np.floor((oy[:, None] + mid * dy[:, None] - origin[1]) / cell_size).astype(np.intp)
+    valid = (T[:, 1:] > t_entry) & (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+    return t_entry, ix, iy, valid
+
+
+def _chunks(n, per_item):
+    """要素数を抑えるための区間 [start, stop) の列"""
+    step = max(1, _CHUNK_ELEMENTS // max(per_item, 1))
+    for start in range(0, n, step):
+        yield start, min(start + step, n)
+
+
+class SegmentMap:
+    """
+    線分の集合で表した障害物地図
+
+    線分の外接矩形が重なるセルに線分を登録した一様格子（CSR 形式）を
+    加速構造として持つ
+    """
+
+    def __init__(self, segments, cell_size=None):
+        """
+        Parameters
+        ----------
+        segments : array-like, shape (S, 4)
+            線分の端点 [x1, y1, x2, y2]
+        cell_size : float, optional
+            格子のセルの一辺の長さ（省略時はセルあたり1本程度になるよう決める）
+        """
+        self.segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        points = self.segments.reshape(-1, 2)
+        lo = points.min(axis=0) if len(points) else np.zeros(2)
+        hi = points.max(axis=0) if len(points) else np.ones(2)
+        extent = np.maximum(hi - lo, 1e-9)
+        if cell_size is None:
+            cell_size = float(extent.max()) / max(1.0, math.ceil(math.sqrt(len(self.segments))))
+        self.cell_size = cell_size
+        self.origin = (float(lo[0]), float(lo[1]))
+        nx = int(extent[0] // cell_size) + 1
+        ny = int(extent[1] // cell_size) + 1
+        self.shape = (ny, nx)
+        self._build_grid()
+
+    def _build_grid(self):
+        """各線分の外接矩形が重なるセルに線分を登録"""
+        ny, nx = self.shape
+        seg = self.segments
+        i0, i1 = (
+            np.floor((np.sort(seg[:, [0, 2]], axis=1) - self.origin[0]) / self.cell_size)
+            .astype(np.intp)
+            .clip(0, nx - 1)
+            .T
+        )
+        j0, j1 = (
+            np.floor((np.sort(seg[:, [1, 3]], axis=1) - self.origin[1]) / self.cell_size)
+            .astype(np.intp)
+            .clip(0, ny - 1)
+            .T
+        )
+        width = i1 - i0 + 1
+        counts = width * (j1 - j0 + 1)
+        seg_ids = np.repeat(np.arange(len(seg)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        w = width[seg_ids]
+        cells = (j0[seg_ids] + local // w) * nx + i0[seg_ids] + local % w
+
+        order = np.argsort(cells, kind="stable")
+        self._cell_segments = seg_ids[order]
+        self._cell_start = np.zeros(nx * ny + 1, dtype=np.intp)
+        np.cumsum(np.bincount(cells, minlength=nx * ny), out=self._cell_start[1:])
+
+    def raycast(self, origins, angles, max_range):
+        """
+        ビームと最も近い線分との交点までの距離
+
+        Parameters
+        ----------
+        origins : array-like, shape (B, 2) or (2,)
+            ビームの始点
+        angles : array-like, shape (B,)
+            ビームの方向（ワールド座標系, rad）
+        max_range : float
+            最大距離
+
+        Returns
+        -------
+        ranges : ndarray, shape (B,)
+            距離（max_range 以内に交差がない場合は inf）
+        """
+        angles = np.asarray(angles, dtype=float).ravel()
+        origins = np.broadcast_to(np.asarray(origins, dtype=float), (len(angles), 2))
+        ranges = np.full(len(angles), np.inf)
+        if len(self.segments) == 0:
+            return ranges
+        if len(self.segments) <= _BRUTE_FORCE_SEGMENTS:
+            for start, stop in _chunks(len(angles), len(self.segments)):
+                a = angles[start:stop, None]
+                t = _intersect(
+                    origins[start:stop, 0:1],
+                    origins[start:stop, 1:2],
+                    np.cos(a),
+                    np.sin(a),
+                    self.segments,
+                    max_range,
+                )
+                ranges[start:stop] = t.min(axis=1)
+            return ranges
+
+        n_cells = 2 * int(math.ceil(max_range / self.cell_size)) + 3
+        for start, stop in _chunks(len(angles), 4 * n_cells):
+            ranges[start:stop] = self._raycast_grid(
+                origins[start:stop], angles[start:stop], max_range
+            )
+        return ranges
+
+    def _raycast_grid(self, origins, angles, max_range):
+        """
+        格子の走査で候補を絞った交差判定
+
+        通過セルを近い順に _BAND 個ずつ処理し、次の区間の入口より手前で
+        交差したビームは以降の区間を処理しない
+        """
+        ox, oy = origins[:, 0], origins[:, 1]
+        dx, dy = np.cos(angles), np.sin(angles)
+        t_entry, ix, iy, valid = _traverse(
+            ox, oy, dx, dy, max_range, self.origin, self.cell_size, self.shape
+        )
+        ranges = np.full(len(angles), np.inf)
+        active = np.arange(len(angles))
+        K = valid.shape[1]
+        for start in range(0, K, _BAND):
+            stop = min(start + _BAND, K)
+            # (ビーム, セル) の組を (ビーム, 線分) の候補の組に展開
+            b, k = np.nonzero(valid[active, start:stop])
+            beam = active[b]
+            k += start
+            cells = iy[beam, k] * self.shape[1] + ix[beam, k]
+            first = self._cell_start[cells]
+            counts = self._cell_start[cells + 1] - first
+            beam = np.repeat(beam, counts)
+            offsets = np.repeat(first - (np.cumsum(counts) - counts), counts)
+            seg_ids = self._cell_segments[offsets + np.arange(len(offsets))]
+
+            t = _intersect(
+                ox[beam], oy[beam], dx[beam], dy[beam], self.segments[seg_ids], max_range
+            )
+            # beam は昇順に並んでいるため、ビームごとの最小値は区間ごとの reduce で求める
+            if len(t):
+                heads = np.flatnonzero(np.r_[True, beam[1:] != beam[:-1]])
+                hit = beam[heads]
+                ranges[hit] = np.minimum(ranges[hit], np.minimum.reduceat(t, heads))
+            if stop < K:
+                active = active[ranges[active] > t_entry[active, stop]]
+                if len(active) == 0:
+                    break
+        return ranges
+
+
+class OccupancyGrid:
+    """
+    占有格子で表した障害物地図
+
+    occupied[iy, ix] がセル (ix, iy) の占有を表す
+    """
+
+    def __init__(self, occupied, resolution=1.0, origin=(0.0, 0.0)):
+        """
+        Parameters
+        ----------
+        occupied : array-like of bool, shape (ny, nx)
+            占有セル
+        resolution : float
+            セルの一辺の長さ
+        origin : tuple of float
+            セル (0, 0) の左下の座標
+        """
+        self.occupied = np.asarray(occupied, dtype=bool)
+        self.resolution = resolution
+        self.origin = (float(origin[0]), float(origin[1]))
+
+    def raycast(self, origins, angles, max_range):
+        """
+        ビームが最初に入る占有セルまでの距離
+
+        Parameters
+        ----------
+        origins : array-like, shape (B, 2) or (2,)
+            ビームの始点
+        angles : array-like, shape (B,)
+            ビームの方向（ワールド座標系, rad）
+        max_range : float
+            最大距離
+
+        Returns
+        -------
+        ranges : ndarray, shape (B,)
+            距離（max_range 以内に占有セルがない場合は inf）
+        """
+        angles = np.asarray(angles, dtype=float).ravel()
+        origins = np.broadcast_to(np.asarray(origins, dtype=float), (len(angles), 2))
+        ranges = np.empty(len(angles))
+        n_cells = 2 * int(math.ceil(max_range / self.resolution)) + 3
+        for start, stop in _chunks(len(angles), 4 * n_cells):
+            o = origins[start:stop]
+            a = angles[start:stop]
+            t_entry, ix, iy, valid = _traverse(
+                o[:, 0],
+                o[:, 1],
+                np.cos(a),
+                np.sin(a),
+                max_range,
+                self.origin,
+                self.resolution,
+                self.occupied.shape,
+            )
+            hit = valid & self.occupied[np.where(valid, iy, 0), np.where(valid, ix, 0)]
+            first = hit.argmax(axis=1)
+            rows = np.arange(len(a))
+            ranges[start:stop] = np.where(hit[rows, first], t_entry[rows, first], np.inf)
+        return ranges
+
+
+class Lidar2D:
+    """
+    ロボットに搭載した 2D LiDAR
+
+    ビームはロボットの向きを基準に fov の範囲に等間隔に並ぶ
+    """
+
+    def __init__(self, world, n_beams=360, fov=2 * np.pi, max_range=30.0, noise_std=0.0):
+        """
+        Parameters
+        ----------
+        world : SegmentMap or OccupancyGrid
+            障害物地図（raycast(origins, angles, max_range) を持つオブジェクト）
+        n_beams : int
+            ビーム数
+        fov : float
+            視野角 (rad)
+        max_range : float
+            最大距離（交差がないビームはこの値を返す）
+        noise_std : float
+            距離の観測ノイズの標準偏差
+        """
+        self.world = world
+        self.n_beams = n_beams
+        self.fov = fov
+        self.max_range = max_range
+        self.noise_std = noise_std
+        if np.isclose(fov, 2 * np.pi):
+            self.angles = np.linspace(-np.pi, np.pi, n_beams, endpoint=False)
+        else:
+            self.angles = np.linspace(-fov / 2, fov / 2, n_beams)
+
+    def scan(self, pose):
+        """
+        1つの姿勢からのスキャン
+
+        Parameters
+        ----------
+        pose : array-like, shape (3,)
+            ロボット姿勢 [x, y, theta]
+
+        Returns
+        -------
+        ranges : ndarray, shape (n_beams,)
+            各ビームの距離
+        """
+        return self.scan_batch(np.asarray(pose, dtype=float)[None])[0]
+
+    def scan_batch(self, poses):
+        """
+        複数の姿勢からのスキャンをまとめて計算
+
+        Parameters
+        ----------
+        poses : array-like, shape (N, 3)
+            ロボット姿勢 [x, y, theta]
+
+        Returns
+        -------
+        ranges : ndarray, shape (N, n_beams)
+            各ビームの距離
+        """
+        poses = np.asarray(poses, dtype=float).reshape(-1, 3)
+        origins = np.repeat(poses[:, :2], self.n_beams, axis=0)
+        angles = (poses[:, 2:3] + self.angles).ravel()
+        ranges = self.world.raycast(origins, angles, self.max_range).reshape(-1, self.n_beams)
+        hit = np.isfinite(ranges)
+        if self.noise_std > 0:
+            ranges = ranges + np.random.randn(*ranges.shape) * self.noise_std
+        return np.where(hit, np.clip(ranges, 0.0, self.max_range), self.max_range)
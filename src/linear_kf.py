@@ -1,3 +1,8 @@
+import numpy as np
+
+from . import profiling
+
+
 class LinearKalmanFilter:
     """
     1次元線形カルマンフィルタ
@@ -6,7 +11,7 @@ class LinearKalmanFilter:
     観測方程式: z_k = x_k + v_k  (v_k ~ N(0, R))
     """
 
-    def __init__(self, Q, R, x0=0.0, P0=1.0):
+    def __init__(self, Q, R, x0=0.0, P0=1.0, noise_estimator=None):
         """
         Parameters
         ----------
@@ -18,11 +23,14 @@ class LinearKalmanFilter:
             初期状態推定値
         P0 : float
             初期誤差共分散
+        noise_estimator : AdaptiveNoiseEstimator, optional
+            指定した場合、更新ごとにイノベーションから Q, R を再推定する
         """
         self.Q = Q
         self.R = R
         self.x = x0  # 現在の推定値
         self.P = P0  # 現在の誤差共分散
+        self.noise_estimator = noise_estimator
 
     def predict(self, u=0):
         """
@@ -33,11 +41,16 @@ class LinearKalmanFilter:
         u : float
             制御入力（移動量）
         """
+        prof = profiling.active()
+        t = prof.begin("linear_kf.predict") if prof is not None else None
+
         # 状態予測: x = x + u
         self.x = self.x + u
 
         # 誤差共分散予測: P = P + Q
         self.P = self.P + self.Q
+        if t is not None:
+            prof.lap("linear_kf.predict", t)
 
     def update(self, z):
         """
@@ -46,21 +59,43 @@ class LinearKalmanFilter:
         Parameters
         ----------
         z : float
-            観測値
+            観測値（NaN またはマスク値の場合は更新を省略）
 
         Returns
         -------
         K : float
-            カルマンゲイン
+            カルマンゲイン（更新を省略した場合は 0）
         """
+        prof = profiling.active()
+        t = prof.begin("linear_kf.update") if prof is not None else None
+
+        if z is np.ma.masked or z != z:
+            # 欠損観測は更新を省略するが、呼び出しとしては計測・計数する
+            if prof is not None:
+                prof.count("linear_kf.update.missing")
+                prof.lap("linear_kf.update.missing", t)
+            return 0.0
+
         # カルマンゲイン: K = P / (P + R)
         K = self.P / (self.P + self.R)
+        if t is not None:
+            t = prof.lap("linear_kf.update.gain", t)
 
         # 状態更新: x = x + K * (z - x)
-        self.x = self.x + K * (z - self.x)
+        innovation = z - self.x
+        self.x = self.x + K * innovation
+        if t is not None:
+            t = prof.lap("linear_kf.update.state", t)
 
         # 誤差共分散更新: P = (1 - K) * P
+        P_prior = self.P
         self.P = (1 - K) * self.P
+        if t is not None:
+            prof.lap("linear_kf.update.covariance", t)
+
+        # Q, R の適応推定（次のステップから使用）
+        if self.noise_estimator is not None:
+            self.Q, self.R = self.noise_estimator.step(innovation, P_prior, K, self.Q, self.R)
 
         return K
 
@@ -85,3 +120,158 @@ class LinearKalmanFilter:
         self.predict(u)
         K = self.update(z)
         return self.x, K
+
+
+class BatchLinearKalmanFilter:
+    """
+    独立な多数の1次元線形カルマンフィルタを一括で処理するフィルタ
+
+    各チャネル c について LinearKalmanFilter と同じモデルを持ち、
+    x, P, Q, R は shape (C,) の配列として保持する
+
+    状態方程式: x_k[c] = x_{k-1}[c] + u_k[c] + w_k[c]  (w_k[c] ~ N(0, Q[c]))
+    観測方程式: z_k[c] = x_k[c] + v_k[c]  (v_k[c] ~ N(0, R[c]))
+    """
+
+    def __init__(self, Q, R, x0=0.0, P0=1.0, n_channels=None):
+        """
+        Parameters
+        ----------
+        Q : float or ndarray, shape (C,)
+            プロセスノイズの共分散
+        R : float or ndarray, shape (C,)
+            観測ノイズの共分散
+        x0 : float or ndarray, shape (C,)
+            初期状態推定値
+        P0 : float or ndarray, shape (C,)
+            初期誤差共分散
+        n_channels : int, optional
+            チャネル数（すべてスカラーで与える場合に指定）
+        """
+        shape = np.broadcast_shapes(*(np.shape(a) for a in (Q, R, x0, P0)))
+        if n_channels is not None:
+            shape = np.broadcast_shapes(shape, (n_channels,))
+        if len(shape) != 1:
+            raise ValueError("parameters must be scalars or 1-D arrays of length C")
+
+        self.Q = np.array(np.broadcast_to(Q, shape), dtype=float)
+        self.R = np.array(np.broadcast_to(R, shape), dtype=float)
+        self.x = np.array(np.broadcast_to(x0, shape), dtype=float)
+        self.P = np.array(np.broadcast_to(P0, shape), dtype=float)
+
+    @property
+    def n_channels(self):
+        """チャネル数"""
+        return self.x.shape[0]
+
+    def predict(self, u=0):
+        """
+        予測ステップ
+
+        Parameters
+        ----------
+        u : float or ndarray, shape (C,)
+            制御入力（移動量）
+        """
+        # 状態予測: x = x + u
+        self.x += u
+
+        # 誤差共分散予測: P = P + Q
+        self.P += self.Q
+
+    def update(self, z, mask=None):
+        """
+        更新ステップ
+
+        Parameters
+        ----------
+        z : ndarray, shape (C,)
+            観測値（NaN またはマスク要素のチャネルは予測のみ）
+        mask : ndarray of bool, shape (C,), optional
+            True のチャネルのみ更新する（False のチャネルは予測のみ）
+
+        Returns
+        -------
+        K : ndarray, shape (C,)
+            カルマンゲイン（更新しないチャネルは 0）
+        """
+        if isinstance(z, np.ma.MaskedArray):
+            z = np.ma.filled(z.astype(float), np.nan)
+        z = np.asarray(z, dtype=float)
+        observed = ~np.isnan(z)
+        if mask is not None:
+            observed &= mask
+
+        # カルマンゲイン: K = P / (P + R)
+        K = self.P / (self.P + self.R)
+        K *= observed
+        innovation = np.where(observed, z - self.x, 0.0)
+
+        # 状態更新: x = x + K * (z - x)
+        self.x += K * innovation
+
+        # 誤差共分散更新: P = (1 - K) * P
+        self.P *= 1.0 - K
+
+        return K
+
+    def filter_step(self, z, u=0, mask=None):
+        """
+        予測と更新を実行
+
+        Parameters
+        ----------
+        z : ndarray, shape (C,)
+            観測値
+        u : float or ndarray, shape (C,)
+            制御入力
+        mask : ndarray of bool, shape (C,), optional
+            更新するチャネル
+
+        Returns
+        -------
+        x : ndarray, shape (C,)
+            推定値
+        K : ndarray, shape (C,)
+            カルマンゲイン
+        """
+        self.predict(u)
+        K = self.update(z, mask)
+        return self.x.copy(), K
+
+    def filter_sequence(self, zs, us=0, mask=None):
+        """
+        (T, C) の観測ブロックをまとめて処理
+
+        Parameters
+        ----------
+        zs : ndarray, shape (T, C)
+            観測値の系列
+        us : float or ndarray, broadcastable to (T, C)
+            制御入力の系列
+        mask : ndarray of bool, broadcastable to (T, C), optional
+            更新するチャネル
+
+        Returns
+        -------
+        xs : ndarray, shape (T, C)
+            推定値の系列
+        Ks : ndarray, shape (T, C)
+            カルマンゲインの系列
+        """
+        if isinstance(zs, np.ma.MaskedArray):
+            zs = np.ma.filled(zs.astype(float), np.nan)
+        zs = np.asarray(zs, dtype=float)
+        T = zs.shape[0]
+        shape = (T, self.n_channels)
+        us = np.broadcast_to(us, shape)
+        if mask is not None:
+            mask = np.broadcast_to(mask, shape)
+
+        xs = np.empty(shape)
+        Ks = np.empty(shape)
+        for k in range(T):
+            self.predict(us[k])
+            Ks[k] = self.update(zs[k], None if mask is None else mask[k])
+            xs[k] = self.x
+        return xs, Ks
@@ -0,0 +1,241 @@
+import numpy as np
+
+
+def solve_dare(F, H, Q, R, tol=1e-12, max_iter=100):
+    """
+    フィルタ形式の離散時間リカッチ方程式 (DARE) を解く
+
+    P = F P F^T - F P H^T (H P H^T + R)^(-1) H P F^T + Q
+
+    構造保存倍加法 (SDA) により反復回数 O(log) で収束する
+
+    Parameters
+    ----------
+    F : ndarray, shape (n, n)
+        状態遷移行列
+    H : ndarray, shape (m, n)
+        観測行列
+    Q : ndarray, shape (n, n)
+        プロセスノイズ共分散行列
+    R : ndarray, shape (m, m)
+        観測ノイズ共分散行列
+    tol : float
+        収束判定の相対許容誤差
+    max_iter : int
+        最大反復回数
+
+    Returns
+    -------
+    P : ndarray, shape (n, n)
+        定常状態の予測誤差共分散（事前共分散）
+    """
+    F = np.atleast_2d(np.asarray(F, dtype=float))
+    H = np.atleast_2d(np.asarray(H, dtype=float))
+    Q = np.atleast_2d(np.asarray(Q, dtype=float))
+    R = np.atleast_2d(np.asarray(R, dtype=float))
+    n = F.shape[0]
+    I_ = np.eye(n)
+
+    # X = Q + A^T X (I + G X)^(-1) A  (A = F^T, G = H^T R^(-1) H)
+    A = F.T.copy()
+    G = H.T @ np.linalg.solve(R, H)
+    X = Q.copy()
+    for _ in range(max_iter):
+        W = I_ + G @ X
+        W_inv_A = np.linalg.solve(W, A)
+        W_inv_G = np.linalg.solve(W, G)
+        X_next = X + A.T @ X @ W_inv_A
+        G = G + A @ W_inv_G @ A.T
+        A = A @ W_inv_A
+        if np.linalg.norm(X_next - X) <= tol * max(1.0, np.linalg.norm(X_next)):
+            X = X_next
+            break
+        X = X_next
+    else:
+        raise np.linalg.LinAlgError("DARE did not converge")
+
+    return 0.5 * (X + X.T)
+
+
+class MatrixKalmanFilter:
+    """
+    n次元線形カルマンフィルタ
+
+    状態方程式: x_k = F x_{k-1} + B u_k + w_k  (w_k ~ N(0, Q))
+    観測方程式: z_k = H x_k + v_k  (v_k ~ N(0, R))
+
+    時不変システムを前提に F^T, H^T などを事前計算し、行列積・加減算は
+    作業バッファに書き込む。ただし通常のゲイン計算では np.linalg.solve が
+    毎ステップ結果の配列を確保し、out を省略した filter_step は推定値を
+    コピーして返す。steady_state=True かつ out を指定した場合のみ、
+    各ステップでメモリ確保は発生しない
+    """
+
+    def __init__(self, F, H, Q, R, x0, P0, B=None, steady_state=False):
+        """
+        Parameters
+        ----------
+        F : ndarray, shape (n, n)
+            状態遷移行列
+        H : ndarray, shape (m, n)
+            観測行列
+        Q : ndarray, shape (n, n)
+            プロセスノイズ共分散行列
+        R : ndarray, shape (m, m)
+            観測ノイズ共分散行列
+        x0 : ndarray, shape (n,)
+            初期状態推定値
+        P0 : ndarray, shape (n, n)
+            初期誤差共分散行列
+        B : ndarray, shape (n, k), optional
+            制御入力行列
+        steady_state : bool
+            True の場合 DARE を解いて得た定常カルマンゲインを使用し、
+            共分散の時間更新を省略する
+        """
+        self.F = np.atleast_2d(np.array(F, dtype=float))
+        self.H = np.atleast_2d(np.array(H, dtype=float))
+        self.Q = np.atleast_2d(np.array(Q, dtype=float))
+        self.R = np.atleast_2d(np.array(R, dtype=float))
+        self.B = None if B is None else np.atleast_2d(np.array(B, dtype=float))
+
+        n = self.F.shape[0]
+        m = self.H.shape[0]
+        if self.F.shape != (n, n) or self.Q.shape != (n, n):
+            raise ValueError("F and Q must have shape (n, n)")
+        if self.H.shape != (m, n) or self.R.shape != (m, m):
+            raise ValueError("H must have shape (m, n) and R shape (m, m)")
+        if self.B is not None and self.B.shape[0] != n:
+            raise ValueError("B must have shape (n, k)")
+
+        self.x = np.array(x0, dtype=float).reshape(n)
+        self.P = np.array(P0, dtype=float).reshape(n, n)
+        self.n = n
+        self.m = m
+
+        # 事前計算（連続メモリの転置）
+        self.F_T = np.ascontiguousarray(self.F.T)
+        self.H_T = np.ascontiguousarray(self.H.T)
+
+        # 作業バッファ
+        self.K = np.zeros((n, m))
+        self._n = np.empty(n)
+        self._m = np.empty(m)
+        self._nn = np.empty((n, n))
+        self._nm = np.empty((n, m))
+        self._mn = np.empty((m, n))
+        self._mm = np.empty((m, m))
+
+        self.steady_state = steady_state
+        if steady_state:
+            self._P_prior = solve_dare(self.F, self.H, self.Q, self.R)
+            S = self.H @ self._P_prior @ self.H_T + self.R
+            self.K[...] = np.linalg.solve(S, self.H @ self._P_prior).T
+            self._P_post = (np.eye(n) - self.K @ self.H) @ self._P_prior
+
+    def predict(self, u=None, out=None):
+        """
+        予測ステップ
+
+        Parameters
+        ----------
+        u : ndarray, shape (k,), optional
+            制御入力（B を指定していない場合は ValueError）
+        out : ndarray, shape (n,), optional
+            予測状態の書き込み先
+
+        Returns
+        -------
+        x : ndarray, shape (n,)
+            予測状態（out を指定しない場合は内部状態への参照）
+        """
+        if u is not None and self.B is None:
+            raise ValueError("control input u was given but the filter has no B matrix")
+
+        # 状態予測: x = F*x + B*u
+        np.matmul(self.F, self.x, out=self._n)
+        self.x[...] = self._n
+        if u is not None and self.B is not None:
+            np.matmul(self.B, u, out=self._n)
+            self.x += self._n
+
+        # 誤差共分散予測: P = F*P*F^T + Q
+        if self.steady_state:
+            self.P[...] = self._P_prior
+        else:
+            np.matmul(self.F, self.P, out=self._nn)
+            np.matmul(self._nn, self.F_T, out=self.P)
+            self.P += self.Q
+
+        if out is not None:
+            out[...] = self.x
+            return out
+        return self.x
+
+    def update(self, z, out=None):
+        """
+        更新ステップ
+
+        Parameters
+        ----------
+        z : ndarray, shape (m,)
+            観測値
+        out : ndarray, shape (n,), optional
+            更新後の状態の書き込み先
+
+        Returns
+        -------
+        K : ndarray, shape (n, m)
+            カルマンゲイン行列（内部バッファへの参照）
+        """
+        # イノベーション: y = z - H*x
+        np.matmul(self.H, self.x, out=self._m)
+        np.subtract(z, self._m, out=self._m)
+
+        if self.steady_state:
+            self.P[...] = self._P_post
+        else:
+            # イノベーション共分散: S = H*P*H^T + R
+            np.matmul(self.P, self.H_T, out=self._nm)
+            np.matmul(self.H, self._nm, out=self._mm)
+            self._mm += self.R
+
+            # カルマンゲイン: K = P*H^T*S^(-1)  (S は対称なので S*K^T = H*P を解く)
+            np.matmul(self.H, self.P, out=self._mn)
+            self.K[...] = np.linalg.solve(self._mm, self._mn).T
+
+            # 誤差共分散更新: P = P - K*H*P
+            np.matmul(self.K, self._mn, out=self._nn)
+            self.P -= self._nn
+
+        # 状態更新: x = x + K*y
+        np.matmul(self.K, self._m, out=self._n)
+        self.x += self._n
+
+        if out is not None:
+            out[...] = self.x
+        return self.K
+
+    def filter_step(self, z, u=None, out=None):
+        """
+        予測と更新を実行
+
+        Parameters
+        ----------
+        z : ndarray, shape (m,)
+            観測値
+        u : ndarray, shape (k,), optional
+            制御入力
+        out : ndarray, shape (n,), optional
+            推定値の書き込み先
+
+        Returns
+        -------
+        x : ndarray, shape (n,)
+            推定値（out を指定しない場合はコピー）
+        K : ndarray, shape (n, m)
+            カルマンゲイン行列
+        """
+        self.predict(u)
+        K = self.update(z, out=out)
+        return (self.x.copy() if out is None else out), K
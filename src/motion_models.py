@@ -0,0 +1,190 @@
+"""
+2Dロボット（ユニサイクル）の運動モデル
+
+状態: [x, y, theta]
+制御入力: [v, omega]（1ステップの間は一定）
+
+各モデルは (次の状態, ヤコビアン F = ∂f/∂x) を返す（jacobian=False の場合は
+次の状態のみ）。方位角の正規化は呼び出し側で行う
+"""
+
+import numpy as np
+
+
+def unicycle_jacobian(state, next_state):
+    """
+    ヤコビアン F = ∂f/∂x
+
+    制御入力が一定のユニサイクルモデルでは、変位 (dx, dy) を theta で微分すると
+    変位を90度回転したもの (-dy, dx) になるため、どの積分法でも F は
+    1ステップの変位だけで決まる
+
+    Parameters
+    ----------
+    state : array-like, shape (3,)
+        現在の状態 [x, y, theta]
+    next_state : array-like, shape (3,)
+        運動モデルで求めた次の状態
+
+    Returns
+    -------
+    F : ndarray, shape (3, 3)
+        ヤコビアン行列
+    """
+    dx = next_state[0] - state[0]
+    dy = next_state[1] - state[1]
+    return np.array([[1.0, 0.0, -dy], [0.0, 1.0, dx], [0.0, 0.0, 1.0]])
+
+
+def euler(state, u, dt, jacobian=True):
+    """
+    1次オイラー積分
+
+    Parameters
+    ----------
+    state : array-like, shape (3,)
+        状態 [x, y, theta]
+    u : array-like, shape (2,)
+        制御入力 [v, omega]
+    dt : float
+        時間ステップ (s)
+    jacobian : bool
+        False の場合はヤコビアンを計算せず次の状態のみ返す
+
+    Returns
+    -------
+    next_state : ndarray, shape (3,)
+        次の状態
+    F : ndarray, shape (3, 3)
+        ヤコビアン行列（jacobian=True の場合のみ）
+    """
+    v, omega = u
+    x, y, theta = state
+    next_state = np.array(
+        [x + v * np.cos(theta) * dt, y + v * np.sin(theta) * dt, theta + omega * dt]
+    )
+    if not jacobian:
+        return next_state
+    return next_state, unicycle_jacobian(state, next_state)
+
+
+def exact_arc(state, u, dt, jacobian=True):
+    """
+    円弧に沿った厳密積分
+
+    x' = x + v*dt*sinc(omega*dt/2)*cos(theta + omega*dt/2) の形で計算するため、
+    omega -> 0 の極限（直進）でも数値的に安定
+
+    Parameters
+    ----------
+    state : array-like, shape (3,)
+        状態 [x, y, theta]
+    u : array-like, shape (2,)
+        制御入力 [v, omega]
+    dt : float
+        時間ステップ (s)
+    jacobian : bool
+        False の場合はヤコビアンを計算せず次の状態のみ返す
+
+    Returns
+    -------
+    next_state : ndarray, shape (3,)
+        次の状態
+    F : ndarray, shape (3, 3)
+        ヤコビアン行列（jacobian=True の場合のみ）
+    """
+    v, omega = u
+    x, y, theta = state
+    half = 0.5 * omega * dt
+    mid = theta + half
+    # np.sinc(t) = sin(pi*t) / (pi*t)
+    chord = v * dt * np.sinc(half / np.pi)
+    c = chord * np.cos(mid)
+    s = chord * np.sin(mid)
+    next_state = np.array([x + c, y + s, theta + omega * dt])
+    if not jacobian:
+        return next_state
+    return next_state, unicycle_jacobian(state, next_state)
+
+
+def rk4(state, u, dt, jacobian=True):
+    """
+    4次ルンゲ・クッタ積分
+
+    制御入力が一定のため、中間段の方位角は解析的に求まる
+
+    Parameters
+    ----------
+    state : array-like, shape (3,)
+        状態 [x, y, theta]
+    u : array-like, shape (2,)
+        制御入力 [v, omega]
+    dt : float
+        時間ステップ (s)
+    jacobian : bool
+        False の場合はヤコビアンを計算せず次の状態のみ返す
+
+    Returns
+    -------
+    next_state : ndarray, shape (3,)
+        次の状態
+    F : ndarray, shape (3, 3)
+        ヤコビアン行列（jacobian=True の場合のみ）
+    """
+    v, omega = u
+    x, y, theta = state
+    mid = theta + 0.5 * omega * dt
+    end = theta + omega * dt
+    k = v * dt / 6.0
+    c = k * (np.cos(theta) + 4.0 * np.cos(mid) + np.cos(end))
+    s = k * (np.sin(theta) + 4.0 * np.sin(mid) + np.sin(end))
+    next_state = np.array([x + c, y + s, end])
+    if not jacobian:
+        return next_state
+    return next_state, unicycle_jacobian(state, next_state)
+
+
+MOTION_MODELS = {
+    "euler": euler,
+    "exact": exact_arc,
+    "rk4": rk4,
+}
+
+
+def get_motion_model(model):
+    """
+    運動モデルを取得
+
+    Parameters
+    ----------
+    model : str or callable
+        MOTION_MODELS のキー、または (state, u, dt) -> (next_state, F) の関数
+
+    Returns
+    -------
+    f : callable
+        運動モデル関数
+    """
+    if callable(model):
+        return model
+    try:
+        return MOTION_MODELS[model]
+    except KeyError:
+        raise ValueError(f"unknown motion model: {model}") from None
+
+
+def is_builtin(model):
+    """
+    組み込みの運動モデルか（jacobian=False で次の状態のみを計算できるか）
+
+    Parameters
+    ----------
+    model : callable
+        運動モデル関数
+
+    Returns
+    -------
+    builtin : bool
+        MOTION_MODELS に含まれる関数であれば True
+    """
+    return any(model is f for f in MOTION_MODELS.values())
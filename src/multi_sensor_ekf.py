@@ -0,0 +1,243 @@
+import numpy as np
+
+from .extended_kf import ExtendedKalmanFilter
+
+
+class Sensor:
+    """
+    EKF に登録するセンサ（観測モデル・観測ノイズ・周期）
+
+    線形センサは観測行列 H、非線形センサは観測関数 h とヤコビアンを与える
+    """
+
+    def __init__(self, name, R, H=None, h=None, jacobian=None, rate=None, angle_indices=()):
+        """
+        Parameters
+        ----------
+        name : str
+            センサ名
+        R : array-like, shape (m, m)
+            観測ノイズ共分散行列
+        H : array-like, shape (m, 3), optional
+            線形観測行列（h(x) = H x）
+        h : callable, optional
+            非線形観測関数 h(x) -> shape (m,)
+        jacobian : callable, optional
+            観測ヤコビアン jacobian(x) -> shape (m, 3)
+        rate : float, optional
+            観測周期 (Hz)
+        angle_indices : sequence of int
+            イノベーションを [-pi, pi] に正規化する観測成分
+        """
+        if (H is None) == (h is None):
+            raise ValueError("specify exactly one of H or h")
+        if h is not None and jacobian is None:
+            raise ValueError("a nonlinear sensor requires a jacobian")
+        self.name = name
+        self.R = np.atleast_2d(np.array(R, dtype=float))
+        self.H = None if H is None else np.atleast_2d(np.array(H, dtype=float))
+        self.h = h
+        self.jacobian = jacobian
+        self.rate = rate
+        self.angle_indices = tuple(angle_indices)
+        self.dim = self.R.shape[0]
+
+    @property
+    def is_linear(self):
+        """線形センサかどうか"""
+        return self.H is not None
+
+    def is_due(self, t, tol=1e-9):
+        """
+        時刻 t が観測周期に一致するかどうか
+
+        Parameters
+        ----------
+        t : float
+            時刻 (s)
+        tol : float
+            許容誤差（周期に対する比）
+
+        Returns
+        -------
+        due : bool
+            rate が未指定の場合は常に True
+        """
+        if self.rate is None:
+            return True
+        n = t * self.rate
+        return abs(n - round(n)) < tol
+
+
+def _stack_noise(sensors):
+    """センサの R をブロック対角に積み重ね、角度成分の添字を返す"""
+    m = sum(s.dim for s in sensors)
+    R = np.zeros((m, m))
+    angles: list = []
+    offset = 0
+    for s in sensors:
+        R[offset : offset + s.dim, offset : offset + s.dim] = s.R
+        angles.extend(offset + i for i in s.angle_indices)
+        offset += s.dim
+    return R, np.array(angles, dtype=np.intp)
+
+
+def gnss_sensor(R, rate=10.0, name="gnss"):
+    """位置 [x, y] を観測するセンサ"""
+    return Sensor(name, R, H=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], rate=rate)
+
+
+def heading_sensor(R, rate=100.0, name="imu"):
+    """方位角 theta を観測するセンサ"""
+    return Sensor(name, R, H=[[0.0, 0.0, 1.0]], rate=rate, angle_indices=(0,))
+
+
+def pose_sensor(R, rate=None, name="pose"):
+    """姿勢 [x, y, theta] を直接観測するセンサ"""
+    return Sensor(name, R, H=np.eye(3), rate=rate, angle_indices=(2,))
+
+
+class MultiSensorEKF(ExtendedKalmanFilter):
+    """
+    複数センサを周期の異なる観測で融合する拡張カルマンフィルタ
+
+    各ティックでデータのあったセンサのみを適用し、同時に届いた観測は
+    1回の積み重ねた更新で融合する。線形センサの組み合わせごとに
+    観測行列・R・インデックスをキャッシュする。
+    ホイールオドメトリは制御入力 [v, omega] として predict に与える
+    """
+
+    def __init__(self, Q, x0, P0, dt=1.0, sensors=(), **kwargs):
+        """
+        Parameters
+        ----------
+        Q : ndarray, shape (3, 3)
+            プロセスノイズ共分散行列
+        x0 : ndarray, shape (3,)
+            初期状態 [x, y, theta]
+        P0 : ndarray, shape (3, 3)
+            初期誤差共分散行列
+        dt : float
+            時間ステップ (s)
+        sensors : sequence of Sensor
+            登録するセンサ
+        **kwargs
+            ExtendedKalmanFilter に渡す追加引数（motion_model など）
+        """
+        kwargs.setdefault("R", np.eye(3))
+        super().__init__(Q=Q, x0=x0, P0=P0, dt=dt, **kwargs)
+        self.sensors = {}
+        self._stack_cache = {}
+        for sensor in sensors:
+            self.register_sensor(sensor)
+
+    def register_sensor(self, sensor):
+        """
+        センサを登録
+
+        Parameters
+        ----------
+        sensor : Sensor
+            登録するセンサ（同名のセンサは置き換える）
+        """
+        self.sensors[sensor.name] = sensor
+        self._stack_cache.clear()
+
+    def sensors_due(self, t):
+        """
+        Returns
+        -------
+        names : list of str
+            時刻 t に観測予定のセンサ名
+        """
+        return [name for name, sensor in self.sensors.items() if sensor.is_due(t)]
+
+    def _linear_stack(self, names):
+        """線形センサの組み合わせに対する積み重ね行列（キャッシュ）"""
+        stack = self._stack_cache.get(names)
+        if stack is None:
+            sensors = [self.sensors[n] for n in names]
+            H = np.vstack([s.H for s in sensors])
+            R, angles = _stack_noise(sensors)
+            # H の各行が単位ベクトルであれば行列積の代わりに添字参照を使う
+            is_unit = np.all(np.isin(H, (0.0, 1.0))) and np.all(H.sum(axis=1) == 1.0)
+            index = np.argmax(H, axis=1) if is_unit else None
+            stack = (H, H.T.copy(), R, angles, index)
+            self._stack_cache[names] = stack
+        return stack
+
+    def update_sensors(self, measurements):
+        """
+        そのティックで得られたセンサ観測をまとめて融合
+
+        Parameters
+        ----------
+        measurements : dict
+            センサ名 -> 観測値（None のセンサは無視）
+
+        Returns
+        -------
+        K : ndarray, shape (3, m) or None
+            カルマンゲイン行列（観測がない場合は None）
+        """
+        names = tuple(sorted(n for n, z in measurements.items() if z is not None))
+        if not names:
+            return None
+        z = np.concatenate([np.atleast_1d(np.asarray(measurements[n], dtype=float)) for n in names])
+
+        if all(self.sensors[n].is_linear for n in names):
+            H, H_T, R, angles, index = self._linear_stack(names)
+            if index is not None:
+                z_pred = self.x[index]
+                PHt = self.P[:, index]
+                S = PHt[index] + R
+            else:
+                z_pred = H @ self.x
+                PHt = self.P @ H_T
+                S = H @ PHt + R
+        else:
+            sensors = [self.sensors[n] for n in names]
+            z_pred = np.concatenate(
+                [s.H @ self.x if s.is_linear else np.atleast_1d(s.h(self.x)) for s in sensors]
+            )
+            H = np.vstack(
+                [s.H if s.is_linear else np.atleast_2d(s.jacobian(self.x)) for s in sensors]
+            )
+            R, angles = _stack_noise(sensors)
+            PHt = self.P @ H.T
+            S = H @ PHt + R
+
+        # イノベーション（角度成分は正規化）
+        innovation = z - z_pred
+        if len(angles):
+            innovation[angles] = (innovation[angles] + np.pi) % (2 * np.pi) - np.pi
+
+        # カルマンゲイン: K = P*H^T*S^(-1)
+        K = PHt @ np.linalg.inv(S)
+
+        # 状態更新と誤差共分散更新: P = P - K*(P*H^T)^T
+        self.x = self.x + K @ innovation
+        self.x[2] = self._normalize_angle(self.x[2])
+        self.P = self.P - K @ PHt.T
+
+        return K
+
+    def step(self, u, measurements):
+        """
+        予測と、届いたセンサ観測による更新を実行
+
+        Parameters
+        ----------
+        u : array-like, shape (2,)
+            制御入力 [v, omega]
+        measurements : dict
+            センサ名 -> 観測値
+
+        Returns
+        -------
+        x : ndarray, shape (3,)
+            更新後の状態推定値
+        """
+        self.predict(u)
+        self.update_sensors(measurements)
+        return self.x.copy()
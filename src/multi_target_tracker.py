@@ -0,0 +1,345 @@
+"""
+ラベルなし観測に対する多目標追跡
+
+1つの外部センサが複数の Robot2D を観測し、どの観測がどのロボットのものかが
+わからない場合の追跡層。各トラックは協調旋回モデル
+[x, y, theta, v, omega]（観測は [x, y, theta]）の EKF で推定し、全トラックを
+積み重ねた配列としてまとめて予測・更新する。
+
+    コスト行列: 全トラック×全観測のマハラノビス距離をベクトル化して計算し、
+               ゲート外の組を除外する
+    GNN: ハンガリアン法による大域最近傍割り当て
+    JPDA: 近似 JPDA（cheap JPDA）の関連確率による確率的データ結合
+
+割り当てられなかった観測から仮トラックを生成し、連続して観測された
+仮トラックを確定、連続して観測されなかったトラックを削除する
+"""
+
+import numpy as np
+
+from .gating import CHI2_99, mahalanobis_squared
+
+ASSOCIATIONS = ("gnn", "jpda")
+
+
+def hungarian(cost):
+    """
+    線形割り当て問題（最小コストの完全マッチング）をハンガリアン法で解く
+
+    ポテンシャル付きの最短増加路法で、各反復の列方向の更新をベクトル化する。
+    長方形の行列では小さい方の次元の要素がすべて割り当てられる
+
+    Parameters
+    ----------
+    cost : array-like, shape (n, m)
+        コスト行列（inf は割り当て不可）
+
+    Returns
+    -------
+    rows : ndarray of int, shape (k,)
+        割り当てた行
+    cols : ndarray of int, shape (k,)
+        割り当てた列（cost[rows, cols] は有限）
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty.copy()
+
+    # 割り当て不可の組は十分大きな有限コストに置き換え、最後に除外する
+    finite = np.isfinite(cost)
+    big = (np.abs(cost[finite]).max() if finite.any() else 0.0) * (n + 1) + 1.0
+    C = np.where(finite, cost, big)
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.intp)  # p[j]: 列 j に割り当てた行（1始まり、0 は未割り当て）
+    way = np.zeros(m + 1, dtype=np.intp)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = C[i0 - 1] - u[i0] - v[1:]
+            improve = free & (reduced < minv[1:])
+            minv[1:][improve] = reduced[improve]
+            way[1:][improve] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        # 増加路に沿って割り当てを更新
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    keep = finite[rows, cols]
+    rows, cols = rows[keep], cols[keep]
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def _wrap(a):
+    """角度を [-pi, pi) に正規化"""
+    return (a + np.pi) % (2 * np.pi) - np.pi
+
+
+class MultiTargetTracker:
+    """
+    GNN / JPDA によるデータ結合とトラック管理を行う多目標トラッカ
+
+    トラックの状態: [x, y, theta, v, omega]（協調旋回モデル）
+    観測: [x, y, theta]
+    """
+
+    def __init__(
+        self,
+        Q,
+        R,
+        dt=1.0,
+        P0=None,
+        association="gnn",
+        gate_threshold=CHI2_99[3],
+        confirm_hits=3,
+        max_misses=3,
+        detection_probability=0.9,
+        clutter_density=1e-3,
+    ):
+        """
+        Parameters
+        ----------
+        Q : ndarray, shape (5, 5)
+            プロセスノイズ共分散行列
+        R : ndarray, shape (3, 3)
+            観測ノイズ共分散行列
+        dt : float
+            時間ステップ (s)
+        P0 : ndarray, shape (5, 5), optional
+            新規トラックの初期誤差共分散（省略時は位置・姿勢に R、速度・角速度に 1）
+        association : str
+            "gnn"（ハンガリアン法）または "jpda"（近似 JPDA）
+        gate_threshold : float
+            ゲート閾値（マハラノビス距離の2乗）
+        confirm_hits : int
+            仮トラックを確定するまでの連続観測数
+        max_misses : int
+            確定トラックを削除するまでの連続未観測数（仮トラックは1回で削除）
+        detection_probability : float
+            検出確率（JPDA）
+        clutter_density : float
+            クラッタの空間密度（JPDA）
+        """
+        if association not in ASSOCIATIONS:
+            raise ValueError(f"unknown association: {association}")
+        self.Q = np.array(Q, dtype=float)
+        self.R = np.array(R, dtype=float)
+        self.dt = dt
+        if P0 is None:
+            P0 = np.zeros((5, 5))
+            P0[:3, :3] = self.R
+            P0[3, 3] = P0[4, 4] = 1.0
+        self.P0 = np.array(P0, dtype=float)
+        self.association = association
+        self.gate_threshold = gate_threshold
+        self.confirm_hits = confirm_hits
+        self.max_misses = max_misses
+        self.detection_probability = detection_probability
+        self.clutter_density = clutter_density
+
+        self.ids = np.empty(0, dtype=np.intp)
+        self.x = np.empty((0, 5))
+        self.P = np.empty((0, 5, 5))
+        self.hits = np.empty(0, dtype=np.intp)
+        self.misses = np.empty(0, dtype=np.intp)
+        self.confirmed = np.empty(0, dtype=bool)
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def predict(self):
+        """全トラックの予測ステップ（協調旋回モデル）"""
+        dt = self.dt
+        x = self.x
+        theta = x[:, 2]
+        v = x[:, 3]
+        omega = x[:, 4]
+        c = np.cos(theta)
+        s = np.sin(theta)
+
+        F = np.broadcast_to(np.eye(5), (len(x), 5, 5)).copy()
+        F[:, 0, 2] = -v * s * dt
+        F[:, 0, 3] = c * dt
+        F[:, 1, 2] = v * c * dt
+        F[:, 1, 3] = s * dt
+        F[:, 2, 4] = dt
+
+        x[:, 0] += v * c * dt
+        x[:, 1] += v * s * dt
+        x[:, 2] = _wrap(theta + omega * dt)
+        self.P = F @ self.P @ F.transpose(0, 2, 1) + self.Q
+
+    def _innovations(self, zs):
+        """全トラック×全観測のイノベーション (T, M, 3) とイノベーション共分散 (T, 3, 3)"""
+        y = zs[None, :, :] - self.x[:, None, :3]
+        y[..., 2] = _wrap(y[..., 2])
+        S = self.P[:, :3, :3] + self.R
+        return y, S
+
+    def cost_matrix(self, zs):
+        """
+        全トラック×全観測のマハラノビス距離の2乗（ゲート外は inf）
+
+        Parameters
+        ----------
+        zs : array-like, shape (M, 3)
+            観測値
+
+        Returns
+        -------
+        d2 : ndarray, shape (T, M)
+            コスト行列
+        """
+        zs = np.asarray(zs, dtype=float).reshape(-1, 3)
+        y, S = self._innovations(zs)
+        d2 = mahalanobis_squared(y, np.linalg.inv(S)[:, None])
+        return np.where(d2 <= self.gate_threshold, d2, np.inf)
+
+    def step(self, zs):
+        """
+        予測・データ結合・更新・トラック管理を1フレーム分実行
+
+        Parameters
+        ----------
+        zs : array-like, shape (M, 3)
+            ラベルなしの観測値
+
+        Returns
+        -------
+        ids : ndarray, shape (K,)
+            確定トラックの ID
+        x : ndarray, shape (K, 5)
+            確定トラックの状態推定値
+        """
+        zs = np.asarray(zs, dtype=float).reshape(-1, 3)
+        self.predict()
+
+        if len(self.ids) and len(zs):
+            y, S = self._innovations(zs)
+            S_inv = np.linalg.inv(S)
+            d2 = mahalanobis_squared(y, S_inv[:, None])
+            gated = d2 <= self.gate_threshold
+            K = self.P[:, :, :3] @ S_inv
+            if self.association == "gnn":
+                detected, used = self._update_gnn(zs, y, d2, gated, K)
+            else:
+                detected, used = self._update_jpda(y, S, d2, gated, K)
+        else:
+            detected = np.zeros(len(self.ids), dtype=bool)
+            used = np.zeros(len(zs), dtype=bool)
+
+        self._manage(detected, zs[~used])
+        return self.tracks()
+
+    def _update_gnn(self, zs, y, d2, gated, K):
+        """ハンガリアン法による割り当てと、割り当てた観測での更新"""
+        rows, cols = hungarian(np.where(gated, d2, np.inf))
+        innov = y[rows, cols]
+        Kr = K[rows]
+        self.x[rows] += np.einsum("tij,tj->ti", Kr, innov)
+        self.x[rows, 2] = _wrap(self.x[rows, 2])
+        self.P[rows] -= Kr @ self.P[rows][:, :3, :]
+
+        detected = np.zeros(len(self.ids), dtype=bool)
+        detected[rows] = True
+        used = np.zeros(len(zs), dtype=bool)
+        used[cols] = True
+        return detected, used
+
+    def _update_jpda(self, y, S, d2, gated, K):
+        """近似 JPDA の関連確率による確率的データ結合と更新"""
+        # 尤度 G_tm = Pd * N(y; 0, S)（ゲート外は 0）
+        _, logdet = np.linalg.slogdet(S)
+        G = np.where(
+            gated,
+            self.detection_probability
+            * np.exp(-0.5 * (d2 + logdet[:, None] + 3 * np.log(2 * np.pi))),
+            0.0,
+        )
+        # cheap JPDA: beta_tm = G_tm / (sum_m G_tm + sum_t G_tm - G_tm + B)
+        B = self.clutter_density * (1.0 - self.detection_probability)
+        denom = G.sum(axis=1, keepdims=True) + G.sum(axis=0, keepdims=True) - G + B
+        beta = G / denom
+        beta_sum = beta.sum(axis=1)
+        scale = np.maximum(beta_sum, 1.0)
+        beta /= scale[:, None]
+        beta0 = 1.0 - beta.sum(axis=1)  # どの観測も該当しない確率
+
+        # 合成イノベーションと、観測の不確かさによる共分散の拡大
+        y_c = np.einsum("tm,tmi->ti", beta, y)
+        spread = np.einsum("tm,tmi,tmj->tij", beta, y, y) - y_c[:, :, None] * y_c[:, None, :]
+        P_c = self.P - K @ self.P[:, :3, :]
+        self.x += np.einsum("tij,tj->ti", K, y_c)
+        self.x[:, 2] = _wrap(self.x[:, 2])
+        self.P = (
+            beta0[:, None, None] * self.P
+            + (1.0 - beta0)[:, None, None] * P_c
+            + K @ spread @ K.transpose(0, 2, 1)
+        )
+
+        detected = gated.any(axis=1)
+        used = gated.any(axis=0)
+        return detected, used
+
+    def _manage(self, detected, new_zs):
+        """トラックの確定・削除と、未使用の観測からの仮トラック生成"""
+        self.hits = np.where(detected, self.hits + 1, 0)
+        self.misses = np.where(detected, 0, self.misses + 1)
+        self.confirmed |= self.hits >= self.confirm_hits
+        keep = np.where(self.confirmed, self.misses < self.max_misses, self.misses == 0)
+
+        n_new = len(new_zs)
+        x_new = np.zeros((n_new, 5))
+        x_new[:, :3] = new_zs
+        ids_new = np.arange(self._next_id, self._next_id + n_new, dtype=np.intp)
+        self._next_id += n_new
+
+        self.ids = np.concatenate([self.ids[keep], ids_new])
+        self.x = np.concatenate([self.x[keep], x_new])
+        self.P = np.concatenate([self.P[keep], np.broadcast_to(self.P0, (n_new, 5, 5))])
+        self.hits = np.concatenate([self.hits[keep], np.ones(n_new, dtype=np.intp)])
+        self.misses = np.concatenate([self.misses[keep], np.zeros(n_new, dtype=np.intp)])
+        self.confirmed = np.concatenate(
+            [self.confirmed[keep], np.full(n_new, self.confirm_hits <= 1)]
+        )
+
+    def tracks(self):
+        """
+        確定トラックを取得
+
+        Returns
+        -------
+        ids : ndarray, shape (K,)
+            トラック ID
+        x : ndarray, shape (K, 5)
+            状態推定値 [x, y, theta, v, omega]
+        """
+        return self.ids[self.confirmed].copy(), self.x[self.confirmed].copy()
@@ -0,0 +1,320 @@
+import contextlib
+import cProfile
+import json
+import pstats
+import time
+
+# 現在有効なプロファイラ（無効時は None）
+_active = None
+
+
+class Histogram:
+    """
+    処理時間のヒストグラム（ナノ秒、2のべき乗バケット）
+
+    バケット i の上限は 2**(min_exp + i) ns で、最後のバケットは +Inf
+    """
+
+    def __init__(self, min_exp=6, max_exp=30):
+        """
+        Parameters
+        ----------
+        min_exp : int
+            最小バケット上限の指数（2**min_exp ns）
+        max_exp : int
+            最大バケット上限の指数（2**max_exp ns）
+        """
+        self.min_exp = min_exp
+        self.max_exp = max_exp
+        self.counts = [0] * (max_exp - min_exp + 2)
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def record(self, ns):
+        """
+        1サンプルを記録
+
+        Parameters
+        ----------
+        ns : int
+            処理時間 (ns)
+        """
+        # バケット i は (2**(min_exp + i - 1), 2**(min_exp + i)] の範囲（上限を含む）
+        idx = (ns - 1).bit_length() - self.min_exp
+        if idx < 0:
+            idx = 0
+        elif idx > self.max_exp - self.min_exp + 1:
+            idx = self.max_exp - self.min_exp + 1
+        self.counts[idx] += 1
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def bounds_ns(self):
+        """
+        Returns
+        -------
+        bounds : list of int
+            各バケットの上限 (ns)（+Inf バケットを除く）
+        """
+        return [1 << k for k in range(self.min_exp, self.max_exp + 1)]
+
+    def quantile(self, q):
+        """
+        バケット上限による分位点の推定
+
+        Parameters
+        ----------
+        q : float
+            分位 (0 <= q <= 1)
+
+        Returns
+        -------
+        value : float
+            分位点の推定値 (ns)、バケットが +Inf の場合は最大値
+        """
+        if self.count == 0:
+            return float("nan")
+        target = q * self.count
+        bounds = self.bounds_ns()
+        cumulative = 0
+        for i, c in enumerate(self.counts):
+            cumulative += c
+            if cumulative >= target and c > 0:
+                return float(bounds[i]) if i < len(bounds) else float(self.max_ns)
+        return float(self.max_ns)
+
+    def to_dict(self):
+        """辞書形式に変換"""
+        return {
+            "count": self.count,
+            "sum_ns": self.total_ns,
+            "min_ns": self.min_ns,
+            "max_ns": self.max_ns,
+            "mean_ns": self.total_ns / self.count if self.count else None,
+            "bounds_ns": self.bounds_ns(),
+            "counts": list(self.counts),
+        }
+
+
+class Profiler:
+    """
+    ステージ別の呼び出しカウンタと処理時間ヒストグラム
+
+    フィルタ・シミュレータは ``active()`` が None でない場合のみ計測する
+    """
+
+    def __init__(self, sample_every=1):
+        """
+        Parameters
+        ----------
+        sample_every : int
+            N回に1回だけ時間を計測する（カウンタは毎回更新）
+        """
+        if sample_every < 1:
+            raise ValueError("sample_every must be >= 1")
+        self.sample_every = sample_every
+        self.counters = {}
+        self.histograms = {}
+        self.cprofile_stats = None
+
+    def begin(self, name):
+        """
+        呼び出しを数え、計測対象であれば開始時刻を返す
+
+        Parameters
+        ----------
+        name : str
+            カウンタ名
+
+        Returns
+        -------
+        t0 : int or None
+            開始時刻 (ns)、計測しない場合は None
+        """
+        n = self.counters.get(name, 0) + 1
+        self.counters[name] = n
+        if n % self.sample_every:
+            return None
+        return time.perf_counter_ns()
+
+    def lap(self, stage, t0):
+        """
+        ステージの処理時間を記録
+
+        Parameters
+        ----------
+        stage : str
+            ステージ名
+        t0 : int or None
+            ステージ開始時刻 (ns)
+
+        Returns
+        -------
+        t1 : int or None
+            現在時刻 (ns)（次のステージの開始時刻）
+        """
+        if t0 is None:
+            return None
+        t1 = time.perf_counter_ns()
+        hist = self.histograms.get(stage)
+        if hist is None:
+            hist = self.histograms[stage] = Histogram()
+        hist.record(t1 - t0)
+        return t1
+
+    def count(self, name, n=1):
+        """カウンタを n だけ増やす"""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        """全カウンタとヒストグラムを破棄"""
+        self.counters.clear()
+        self.histograms.clear()
+        self.cprofile_stats = None
+
+    def to_dict(self):
+        """辞書形式に変換"""
+        return {
+            "counters": dict(self.counters),
+            "stages": {k: h.to_dict() for k, h in sorted(self.histograms.items())},
+        }
+
+    def to_json(self, path=None):
+        """
+        JSON 形式で出力
+
+        Parameters
+        ----------
+        path : str, optional
+            保存先のパス
+
+        Returns
+        -------
+        text : str
+            JSON 文字列
+        """
+        text = json.dumps(self.to_dict(), indent=2)
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self, path=None, prefix="kalman"):
+        """
+        Prometheus テキスト形式で出力
+
+        Parameters
+        ----------
+        path : str, optional
+            保存先のパス
+        prefix : str
+            メトリクス名の接頭辞
+
+        Returns
+        -------
+        text : str
+            Prometheus テキスト
+        """
+        lines = [
+            f"# HELP {prefix}_calls_total Number of calls per instrumented method.",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        for name, n in sorted(self.counters.items()):
+            lines.append(f'{prefix}_calls_total{{name="{name}"}} {n}')
+
+        metric = f"{prefix}_stage_duration_seconds"
+        lines.append(f"# HELP {metric} Wall-clock duration per stage.")
+        lines.append(f"# TYPE {metric} histogram")
+        for stage, hist in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, c in zip(hist.bounds_ns(), hist.counts):
+                cumulative += c
+                lines.append(
+                    f'{metric}_bucket{{stage="{stage}",le="{bound * 1e-9:.9g}"}} {cumulative}'
+                )
+            lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {hist.total_ns * 1e-9:.9g}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {hist.count}')
+
+        text = "\n".join(lines) + "\n"
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+
+def active():
+    """
+    Returns
+    -------
+    profiler : Profiler or None
+        現在有効なプロファイラ
+    """
+    return _active
+
+
+def enable(profiler=None):
+    """
+    プロファイラを有効化
+
+    Parameters
+    ----------
+    profiler : Profiler, optional
+        使用するプロファイラ（省略時は新規作成）
+
+    Returns
+    -------
+    profiler : Profiler
+        有効化されたプロファイラ
+    """
+    global _active
+    _active = profiler if profiler is not None else Profiler()
+    return _active
+
+
+def disable():
+    """プロファイラを無効化"""
+    global _active
+    _active = None
+
+
+@contextlib.contextmanager
+def profile(sample_every=1, use_cprofile=False, profiler=None):
+    """
+    ブロック内の計測を有効化するコンテキストマネージャ
+
+    Parameters
+    ----------
+    sample_every : int
+        N回に1回だけ時間を計測する
+    use_cprofile : bool
+        True の場合 cProfile も同時に実行し、終了時に
+        ``profiler.cprofile_stats`` に pstats.Stats を格納する
+    profiler : Profiler, optional
+        既存のプロファイラに集計する
+
+    Yields
+    ------
+    profiler : Profiler
+        計測結果を保持するプロファイラ
+    """
+    global _active
+    prof = profiler if profiler is not None else Profiler(sample_every=sample_every)
+    previous = _active
+    _active = prof
+    cp = cProfile.Profile() if use_cprofile else None
+    if cp is not None:
+        cp.enable()
+    try:
+        yield prof
+    finally:
+        if cp is not None:
+            cp.disable()
+            prof.cprofile_stats = pstats.Stats(cp)
+        _active = previous
@@ -0,0 +1,231 @@
+"""
+固定周期の実時間ループ
+
+フィルタの predict / update を目標の周期で呼び出し、締め切り超過と
+タイミングのばらつきを計測する（ハードウェアインザループ試験向け）。
+
+各ティックの締め切りは開始時刻 + k * 周期の絶対時刻 (perf_counter_ns) で
+決めるため、time.sleep の誤差が累積してずれることはない。待機は締め切りの
+spin 前まで time.sleep し、残りはビジーウェイトする。
+
+記録するヒストグラム（profiling.Histogram、ナノ秒）:
+    latency: 締め切りから処理開始までの遅れ
+    execution: コールバックの処理時間
+    jitter: 連続するティックの開始間隔と周期の差の絶対値
+
+ヒストグラムのバケットは2のべき乗で分位点が最大2倍ずれるため、summary() の
+分位点は直近 sample_capacity 回分の生のサンプルを保持する固定容量の
+リングバッファから計算する（メモリは実行時間によらず一定）。
+平均・最大値はヒストグラムから求めた全期間の値
+
+使い方:
+    runner = RealTimeRunner(lambda k, n: ekf.filter_step(zs[k], us[k]), rate_hz=500)
+    runner.run(n_ticks=len(zs))
+    print(runner.summary())
+"""
+
+import time
+
+import numpy as np
+
+from . import profiling
+from .ring_buffer import RingBuffer
+
+OVERRUN_POLICIES = ("catch_up", "skip", "coalesce")
+
+
+class RealTimeRunner:
+    """
+    コールバックを固定周期で実行するループ
+
+    コールバックは step(k, n) の形で呼び出す。k はティック番号、n は
+    この呼び出しが表すティック数（"coalesce" で遅れたティックをまとめた場合に
+    2以上、それ以外は 1）
+    """
+
+    def __init__(
+        self,
+        step,
+        rate_hz,
+        overrun_policy="catch_up",
+        budget=None,
+        spin=100e-6,
+        clock=time.perf_counter_ns,
+        sleep=time.sleep,
+        sample_capacity=65536,
+    ):
+        """
+        Parameters
+        ----------
+        step : callable
+            (k, n) -> None のコールバック
+        rate_hz : float
+            目標の周波数 (Hz)
+        overrun_policy : str
+            1周期以上遅れた場合の処理。
+            "catch_up"（遅れたティックをすべて順に実行）、
+            "skip"（遅れたティックを捨てて最新のティックを実行）、
+            "coalesce"（遅れたティックを1回の呼び出しにまとめる）
+        budget : float, optional
+            締め切りから処理完了までの許容時間 (s)（省略時は1周期）
+        spin : float
+            締め切り前にビジーウェイトする時間 (s)
+        clock : callable
+            単調増加する時刻 (ns) を返す関数
+        sleep : callable
+            秒単位の待機関数
+        sample_capacity : int
+            分位点の計算用に保持する直近のサンプル数（各計測値につき 8 バイト/サンプル）
+        """
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive")
+        if overrun_policy not in OVERRUN_POLICIES:
+            raise ValueError(f"unknown overrun policy: {overrun_policy}")
+        self.step = step
+        self.rate_hz = rate_hz
+        self.period_ns = int(round(1e9 / rate_hz))
+        self.overrun_policy = overrun_policy
+        self.budget_ns = self.period_ns if budget is None else int(round(budget * 1e9))
+        self.spin_ns = int(spin * 1e9)
+        self.clock = clock
+        self.sleep = sleep
+        self.sample_capacity = sample_capacity
+        self.reset()
+
+    def reset(self):
+        """統計を破棄"""
+        self.latency = profiling.Histogram()
+        self.execution = profiling.Histogram()
+        self.jitter = profiling.Histogram()
+        # 分位点の計算用に直近の生のサンプル (ns) も保存する
+        self.samples = {
+            name: RingBuffer(self.sample_capacity, dtype=np.int64)
+            for name in ("latency", "execution", "jitter")
+        }
+        self.n_ticks = 0
+        self.n_calls = 0
+        self.n_overruns = 0
+        self.n_skipped = 0
+        self.n_coalesced = 0
+
+    def _wait_until(self, deadline):
+        """締め切りまで待機（直前はビジーウェイト）"""
+        remaining = deadline - self.clock()
+        if remaining > self.spin_ns:
+            self.sleep((remaining - self.spin_ns) * 1e-9)
+        while self.clock() < deadline:
+            pass
+
+    def run(self, n_ticks=None, duration=None):
+        """
+        ループを実行
+
+        Parameters
+        ----------
+        n_ticks : int, optional
+            実行するティック数
+        duration : float, optional
+            実行時間 (s)（n_ticks と両方指定した場合は先に達した方で終了）
+
+        Returns
+        -------
+        n_calls : int
+            コールバックを呼び出した回数
+        """
+        if n_ticks is None and duration is None:
+            raise ValueError("either n_ticks or duration is required")
+        period = self.period_ns
+        if duration is not None:
+            limit = int(duration * 1e9 // period)
+            n_ticks = limit if n_ticks is None else min(n_ticks, limit)
+
+        prof = profiling.active()
+        start = self.clock()
+        calls = 0
+        k = 0
+        prev_start = None
+        prev_k = 0
+        latency_ns = self.samples["latency"]
+        execution_ns = self.samples["execution"]
+        jitter_ns = self.samples["jitter"]
+        while k < n_ticks:
+            deadline = start + k * period
+            self._wait_until(deadline)
+            t_start = self.clock()
+
+            # 1周期以上遅れたティックの処理
+            n = 1
+            behind = min((t_start - deadline) // period, n_ticks - 1 - k)
+            if behind > 0 and self.overrun_policy != "catch_up":
+                k += behind
+                deadline += behind * period
+                if self.overrun_policy == "skip":
+                    self.n_skipped += behind
+                else:
+                    n += behind
+                    self.n_coalesced += behind
+
+            self.step(k, n)
+            t_end = self.clock()
+            calls += 1
+
+            latency = max(t_start - deadline, 0)
+            self.latency.record(latency)
+            latency_ns.append(latency)
+            self.execution.record(t_end - t_start)
+            execution_ns.append(t_end - t_start)
+            if prev_start is not None:
+                jitter = abs(t_start - prev_start - (k - prev_k) * period)
+                self.jitter.record(jitter)
+                jitter_ns.append(jitter)
+            prev_start, prev_k = t_start, k
+            if t_end - deadline > self.budget_ns:
+                self.n_overruns += 1
+                if prof is not None:
+                    prof.count("realtime.overrun")
+            k += 1
+
+        self.n_ticks += n_ticks
+        self.n_calls += calls
+        return calls
+
+    def summary(self):
+        """
+        計測結果の要約
+
+        Returns
+        -------
+        summary : dict
+            周期、カウンタ、予算超過の割合（overrun_fraction）、各計測値の
+            平均・p50・p99・最大値 (ns)。分位点は直近 sample_capacity 回分の
+            生のサンプル、平均・最大値は全期間の値。サンプルがない場合
+            （1回だけ呼び出した場合のジッタなど）は None
+        """
+        stats: dict = {}
+        for name, hist in (
+            ("latency", self.latency),
+            ("execution", self.execution),
+            ("jitter", self.jitter),
+        ):
+            if hist.count:
+                p50, p99 = np.percentile(self.samples[name].to_array(), [50, 99])
+                stats[name] = {
+                    "mean_ns": hist.total_ns / hist.count,
+                    "p50_ns": float(p50),
+                    "p99_ns": float(p99),
+                    "max_ns": hist.max_ns,
+                }
+            else:
+                stats[name] = {"mean_ns": None, "p50_ns": None, "p99_ns": None, "max_ns": None}
+        return {
+            "rate_hz": self.rate_hz,
+            "period_ns": self.period_ns,
+            "budget_ns": self.budget_ns,
+            "ticks": self.n_ticks,
+            "calls": self.n_calls,
+            "overruns": self.n_overruns,
+            "overrun_fraction": self.n_overruns / self.n_calls if self.n_calls else 0.0,
+            "skipped": self.n_skipped,
+            "coalesced": self.n_coalesced,
+            **stats,
+        }
@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    固定容量の NumPy リングバッファ
+
+    容量を超えて追加すると最も古い要素を上書きする。要素は事前確保した
+    shape (capacity, *item_shape) の配列にコピーされるため、追加時の
+    メモリ確保は発生しない。添字は古い順（0 が最古、-1 が最新）
+    """
+
+    def __init__(self, capacity, item_shape=(), dtype=float):
+        """
+        Parameters
+        ----------
+        capacity : int
+            保持する要素数の上限
+        item_shape : tuple of int
+            各要素の shape
+        dtype : data-type
+            要素の型
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = int(capacity)
+        self._data = np.zeros((self.capacity,) + tuple(item_shape), dtype=dtype)
+        self.total = 0  # これまでに追加した要素数
+        self._size = 0  # 保持している要素数
+
+    def __len__(self):
+        return self._size
+
+    def append(self, item):
+        """要素を追加（満杯の場合は最古の要素を上書き）"""
+        self._data[self.total % self.capacity] = item
+        self.total += 1
+        self._size = min(self._size + 1, self.capacity)
+
+    def clear(self):
+        """すべての要素を破棄"""
+        self.total = 0
+        self._size = 0
+
+    def truncate(self, total):
+        """
+        追加数が total になるまで新しい要素から破棄
+
+        Parameters
+        ----------
+        total : int
+            破棄後の追加数（保持していない範囲まで戻す場合は空になる）
+        """
+        total = int(total)
+        if total < self.total - self._size:
+            self.total = max(total, 0)
+            self._size = 0
+        elif total < self.total:
+            self._size -= self.total - total
+            self.total = total
+
+    def _indices(self):
+        """古い順の格納位置"""
+        n = len(self)
+        return np.arange(self.total - n, self.total) % self.capacity
+
+    def to_array(self):
+        """
+        Returns
+        -------
+        data : ndarray, shape (len, *item_shape)
+            古い順に並べた要素のコピー
+        """
+        if self.total == self._size:
+            return self._data[: self.total].copy()
+        return self._data[self._indices()]
+
+    def __array__(self, dtype=None, copy=None):
+        data = self.to_array()
+        return data if dtype is None else data.astype(dtype, copy=False)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_array()[index]
+        n = len(self)
+        if not -n <= index < n:
+            raise IndexError("ring buffer index out of range")
+        if index < 0:
+            index += n
+        return self._data[(self.total - n + index) % self.capacity]
+
+    def __iter__(self):
+        for i in self._indices():
+            yield self._data[i]
@@ -1,5 +1,18 @@
 import numpy as np
 
+from . import profiling
+from .motion_models import get_motion_model, is_builtin
+from .ring_buffer import RingBuffer
+
+
+def _make_history(capacity):
+    """履歴の格納先（None: リスト、正の整数: リングバッファ、0: 記録しない）"""
+    if capacity is None:
+        return []
+    if capacity > 0:
+        return RingBuffer(capacity, (3,))
+    return None
+
 
 class Robot2D:
     """2D平面上を移動するロボット
@@ -7,35 +20,71 @@ class Robot2D:
     制御入力: [v, omega]
     """
 
-    def __init__(self, initial_state, process_noise_std, observation_noise_std, dt=1.0):
+    def __init__(
+        self,
+        initial_state,
+        process_noise_std,
+        observation_noise_std,
+        dt=1.0,
+        motion_model="euler",
+        history_capacity=None,
+        record_observations=True,
+    ):
         self.state = np.array(initial_state, dtype=float)
         self.process_noise_std = np.array(process_noise_std, dtype=float)
         self.observation_noise_std = np.array(observation_noise_std, dtype=float)
         self.dt = dt
+        # 運動モデル（"euler"、"exact"、"rk4" または関数。motion_models を参照）
+        self.motion_model = get_motion_model(motion_model)
+        # シミュレーションにヤコビアンは不要（組み込みモデルでは計算を省く）
+        self._state_only = is_builtin(self.motion_model)
 
-        self.state_history = [self.state.copy()]
-        self.observation_history = [self.observe()]
+        # 履歴: None は無制限のリスト、正の整数は固定容量のリングバッファ、0 は記録しない
+        # record_observations=False の場合、move は観測を生成しない（observe を別途呼ぶ）
+        self.record_observations = record_observations
+        self.state_history = _make_history(history_capacity)
+        self.observation_history = _make_history(history_capacity)
+        self._record_history()
 
     def move(self, control_input):
         """制御入力 [v, omega] で移動"""
-        v, omega = control_input
-        x, y, theta = self.state
+        prof = profiling.active()
+        t = prof.begin("robot2d.move") if prof is not None else None
 
         # 運動モデル
-        x_new = x + v * np.cos(theta) * self.dt
-        y_new = y + v * np.sin(theta) * self.dt
-        theta_new = theta + omega * self.dt
+        if self._state_only:
+            state_new = self.motion_model(self.state, control_input, self.dt, jacobian=False)
+        else:
+            state_new, _ = self.motion_model(self.state, control_input, self.dt)
+        if t is not None:
+            t = prof.lap("robot2d.move.motion", t)
 
         # プロセスノイズ
         process_noise = np.random.randn(3) * self.process_noise_std
-        self.state = np.array([x_new, y_new, theta_new]) + process_noise
+        if t is not None:
+            t = prof.lap("robot2d.move.noise", t)
+        state_new += process_noise
+        self.state = state_new
         self.state[2] = self._normalize_angle(self.state[2])
 
-        self.state_history.append(self.state.copy())
-        self.observation_history.append(self.observe())
+        self._record_history()
+        if t is not None:
+            prof.lap("robot2d.move.history", t)
 
         return self.state.copy()
 
+    def _record_history(self):
+        """現在の状態（と観測）を履歴に追加"""
+        if self.state_history is None:
+            return
+        if isinstance(self.state_history, list):
+            self.state_history.append(self.state.copy())
+        else:
+            # リングバッファは事前確保した領域にコピーする
+            self.state_history.append(self.state)
+        if self.record_observations:
+            self.observation_history.append(self.observe())
+
     def observe(self):
         """観測値を取得"""
         observation_noise = np.random.randn(3) * self.observation_noise_std
@@ -0,0 +1,231 @@
+"""
+共有メモリ上のフリート状態（複数プロセスの読み書き）
+
+トラッカ（書き込み側）が multiprocessing.shared_memory に (N, 3) の状態、
+(N, 3, 3) の誤差共分散、(N,) のタイムスタンプを公開し、プランナやロガーなどの
+読み出し側プロセスはピクルを介さずに参照する。
+
+書き込みは n_buffers 個のスロットを順に使い、シーケンスカウンタ（seqlock）で
+公開する。カウンタは書き込み中は奇数、公開後は偶数で、公開済みの版は
+seq // 2、書き込み中の版は (seq + 1) // 2 になる。版 v はスロット v % n_buffers に
+あり、書き込み側が版 v + n_buffers を書き始めるまで変更されない。
+読み出し側はロックを取らず、読み終えた後にカウンタを確認して一貫性を検証する
+（書き込み側が待たされることはない）
+
+レイアウト（リトルエンディアン）:
+    ヘッダ int64[4]: magic, n_robots, n_buffers, seq
+    スロット float64[n_buffers, N * 13]: x (N*3), P (N*9), t (N)
+"""
+
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+_MAGIC = 0x4B46534853544154  # "KFSHSTAT"
+_HEADER_SIZE = 4
+_SEQ = 3
+_RECORD = 13  # x (3) + P (9) + t (1)
+
+
+class FleetSnapshot:
+    """
+    共有メモリ上の1つの版を参照するスナップショット（コピーなし）
+
+    Attributes
+    ----------
+    version : int
+        版番号
+    x : ndarray, shape (N, 3)
+        状態推定値（共有メモリのビュー）
+    P : ndarray, shape (N, 3, 3)
+        誤差共分散（共有メモリのビュー）
+    t : ndarray, shape (N,)
+        タイムスタンプ（共有メモリのビュー）
+    """
+
+    def __init__(self, state, version, x, P, t):
+        self._state = state
+        self.version = version
+        self.x = x
+        self.P = P
+        self.t = t
+
+    def valid(self):
+        """
+        ビューの内容がまだ上書きされていないかどうか
+
+        ビューを使い終えた後に確認し、False の場合は読み直す
+        """
+        return self._state._writing_version() < self.version + self._state.n_buffers
+
+
+class SharedFleetState:
+    """
+    共有メモリに公開するフリートの状態
+
+    書き込み側は create で作成し、読み出し側は attach で名前から接続する
+    """
+
+    def __init__(self, shm, owner):
+        self._shm = shm
+        self._owner = owner
+        header = np.ndarray((_HEADER_SIZE,), dtype="<i8", buffer=shm.buf)
+        if header[0] != _MAGIC:
+            raise ValueError(f"shared memory {shm.name!r} is not a fleet state")
+        self.n_robots = int(header[1])
+        self.n_buffers = int(header[2])
+        self._header = header
+        N = self.n_robots
+        self._slots = np.ndarray(
+            (self.n_buffers, N * _RECORD), dtype="<f8", buffer=shm.buf, offset=8 * _HEADER_SIZE
+        )
+        self._x = self._slots[:, : 3 * N].reshape(self.n_buffers, N, 3)
+        self._P = self._slots[:, 3 * N : 12 * N].reshape(self.n_buffers, N, 3, 3)
+        self._t = self._slots[:, 12 * N :]
+
+    @classmethod
+    def create(cls, n_robots, name=None, n_buffers=2):
+        """
+        共有メモリを確保して書き込み側として作成
+
+        Parameters
+        ----------
+        n_robots : int
+            ロボット数 N
+        name : str, optional
+            共有メモリの名前（省略時は自動で決める）
+        n_buffers : int
+            スロット数（2以上。多いほど読み出し側が長くビューを保持できる）
+
+        Returns
+        -------
+        state : SharedFleetState
+            書き込み側のフリート状態
+        """
+        if n_buffers < 2:
+            raise ValueError("n_buffers must be >= 2")
+        size = 8 * (_HEADER_SIZE + n_buffers * n_robots * _RECORD)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((_HEADER_SIZE,), dtype="<i8", buffer=shm.buf)
+        header[:] = (_MAGIC, n_robots, n_buffers, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        既存の共有メモリに読み出し側として接続
+
+        Parameters
+        ----------
+        name : str
+            共有メモリの名前
+
+        Returns
+        -------
+        state : SharedFleetState
+            読み出し側のフリート状態
+        """
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            # 読み出し側の終了時に共有メモリが削除されないよう追跡を外す
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+        return cls(shm, owner=False)
+
+    @property
+    def name(self):
+        """共有メモリの名前"""
+        return self._shm.name
+
+    @property
+    def version(self):
+        """公開済みの最新の版"""
+        return int(self._header[_SEQ]) // 2
+
+    def _writing_version(self):
+        """書き込み中（または公開済み）の最新の版"""
+        return (int(self._header[_SEQ]) + 1) // 2
+
+    def publish(self, x, P, t):
+        """
+        新しい版として状態を公開（書き込み側）
+
+        Parameters
+        ----------
+        x : array-like, shape (N, 3)
+            状態推定値
+        P : array-like, shape (N, 3, 3)
+            誤差共分散
+        t : float or array-like, shape (N,)
+            タイムスタンプ
+
+        Returns
+        -------
+        version : int
+            公開した版
+        """
+        seq = int(self._header[_SEQ])
+        version = seq // 2 + 1
+        slot = version % self.n_buffers
+        self._header[_SEQ] = seq + 1  # 書き込み中（奇数）
+        self._x[slot] = x
+        self._P[slot] = P
+        self._t[slot] = t
+        self._header[_SEQ] = seq + 2  # 公開（偶数）
+        return version
+
+    def snapshot(self):
+        """
+        最新の版をコピーせずに参照
+
+        Returns
+        -------
+        snapshot : FleetSnapshot
+            共有メモリのビュー（使用後に valid() で検証する）
+        """
+        version = self.version
+        slot = version % self.n_buffers
+        return FleetSnapshot(self, version, self._x[slot], self._P[slot], self._t[slot])
+
+    def read(self, max_retries=100):
+        """
+        最新の版の一貫したコピーを取得
+
+        Parameters
+        ----------
+        max_retries : int
+            上書きされた場合に読み直す最大回数
+
+        Returns
+        -------
+        version : int
+            版
+        x : ndarray, shape (N, 3)
+            状態推定値
+        P : ndarray, shape (N, 3, 3)
+            誤差共分散
+        t : ndarray, shape (N,)
+            タイムスタンプ
+        """
+        for _ in range(max_retries):
+            snap = self.snapshot()
+            x, P, t = snap.x.copy(), snap.P.copy(), snap.t.copy()
+            if snap.valid():
+                return snap.version, x, P, t
+        raise RuntimeError("could not read a consistent fleet state")
+
+    def close(self):
+        """共有メモリへの接続を閉じる（作成側は共有メモリも削除する）"""
+        # ビューを解放してから閉じる（スナップショットが残っている場合は BufferError）
+        del self._header, self._slots, self._x, self._P, self._t
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,308 @@
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .extended_kf import ExtendedKalmanFilter
+from .linear_kf import LinearKalmanFilter
+
+# ワーカプロセスで共有する評価データ（initializer で設定）
+_worker_data: dict = {}
+
+
+def evaluate_parameters(params, truth, zs, us, x0=None, bases=None, dt=1.0):
+    """
+    1組の Q, R, P0 でフィルタを実行し、真値に対する RMSE を返す
+
+    1次元データ（truth の shape が (T,)）は LinearKalmanFilter、
+    2次元データ（shape (T, 3)）は ExtendedKalmanFilter で評価する
+
+    Parameters
+    ----------
+    params : dict
+        {"Q": float, "R": float, "P0": float}（各基底行列に掛けるスケール）
+    truth : ndarray, shape (T,) or (T, 3)
+        真の状態
+    zs : ndarray, shape (T,) or (T, 3)
+        観測値
+    us : ndarray, shape (T,) or (T, 2)
+        制御入力
+    x0 : float or ndarray, optional
+        初期推定値（省略時は zs[0]）
+    bases : dict, optional
+        "Q", "R", "P0" の基底行列（2次元の場合、省略時は単位行列）
+    dt : float
+        時間ステップ (s)（2次元の場合）
+
+    Returns
+    -------
+    rmse : float
+        位置推定の RMSE
+    """
+    truth = np.asarray(truth, dtype=float)
+    zs = np.asarray(zs, dtype=float)
+    us = np.asarray(us, dtype=float)
+    q = params.get("Q", 1.0)
+    r = params.get("R", 1.0)
+    p = params.get("P0", 1.0)
+
+    if truth.ndim == 1:
+        kf = LinearKalmanFilter(Q=q, R=r, x0=zs[0] if x0 is None else x0, P0=p)
+        estimates = np.empty(len(zs))
+        for k in range(len(zs)):
+            estimates[k] = kf.filter_step(z=zs[k], u=us[k])[0]
+        err = estimates - truth
+        return float(np.sqrt(np.mean(err * err)))
+
+    bases = {} if bases is None else bases
+    ekf = ExtendedKalmanFilter(
+        Q=q * np.asarray(bases.get("Q", np.eye(3))),
+        R=r * np.asarray(bases.get("R", np.eye(3))),
+        x0=zs[0] if x0 is None else x0,
+        P0=p * np.asarray(bases.get("P0", np.eye(3))),
+        dt=dt,
+    )
+    xs, _ = ekf.filter_sequence(zs, us)
+    err = xs[:, :2] - truth[:, :2]
+    return float(np.sqrt(np.mean(np.sum(err * err, axis=1))))
+
+
+def _init_worker(data):
+    """ワーカプロセスに評価データを設定"""
+    global _worker_data
+    _worker_data = data
+
+
+def _evaluate_task(params):
+    """ワーカプロセスでの評価"""
+    return evaluate_parameters(params, **_worker_data)
+
+
+def _data_digest(data):
+    """評価データのハッシュ"""
+    h = hashlib.sha256()
+    for key in sorted(data):
+        value = data[key]
+        if isinstance(value, dict):
+            value = [np.asarray(value[k]) for k in sorted(value)]
+        for arr in value if isinstance(value, list) else [value]:
+            arr = np.ascontiguousarray(arr if arr is not None else np.nan, dtype=float)
+            h.update(key.encode())
+            h.update(str(arr.shape).encode())
+            h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def _config_key(digest, params):
+    """データと設定の組のキャッシュキー"""
+    text = json.dumps({k: float(f"{v:.12g}") for k, v in sorted(params.items())})
+    return hashlib.sha256((digest + text).encode()).hexdigest()
+
+
+class TuningResult:
+    """
+    ハイパーパラメータ探索の結果
+
+    Attributes
+    ----------
+    best_params : dict
+        最良の {"Q", "R", "P0"}
+    best_score : float
+        最良の RMSE
+    table : list of dict
+        評価したすべての設定とスコア（スコア昇順）
+    n_cached : int
+        キャッシュから取得した評価数
+    """
+
+    def __init__(self, table, n_cached):
+        self.table = sorted(table, key=lambda row: row["score"])
+        self.best_params = {k: v for k, v in self.table[0].items() if k != "score"}
+        self.best_score = self.table[0]["score"]
+        self.n_cached = n_cached
+
+
+class _Evaluator:
+    """キャッシュ付きの並列評価"""
+
+    def __init__(self, data, n_workers, cache_path):
+        self.data = data
+        self.digest = _data_digest(data)
+        self.cache_path = cache_path
+        self.cache = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                self.cache = json.load(f)
+        self.executor = (
+            ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(data,))
+            if n_workers > 1
+            else None
+        )
+        self.rows = {}
+        self.n_cached = 0
+
+    def __call__(self, candidates):
+        """候補の設定をまとめて評価し、スコアのリストを返す"""
+        keys = [_config_key(self.digest, c) for c in candidates]
+        pending = {}
+        for key, params in zip(keys, candidates):
+            if key in self.cache:
+                if key not in self.rows:
+                    self.n_cached += 1
+            else:
+                pending[key] = params
+
+        if pending:
+            todo = list(pending.values())
+            if self.executor is None:
+                scores = [evaluate_parameters(p, **self.data) for p in todo]
+            else:
+                scores = list(self.executor.map(_evaluate_task, todo))
+            for key, score in zip(pending, scores):
+                self.cache[key] = score
+            if self.cache_path:
+                with open(self.cache_path, "w") as f:
+                    json.dump(self.cache, f)
+
+        for key, params in zip(keys, candidates):
+            self.rows[key] = dict(params, score=self.cache[key])
+        return [self.cache[key] for key in keys]
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+
+def tune_noise_parameters(
+    truth,
+    zs,
+    us,
+    space=None,
+    method="grid",
+    n_grid=5,
+    n_samples=30,
+    max_iter=40,
+    n_workers=1,
+    cache_path=None,
+    seed=0,
+    x0=None,
+    bases=None,
+    dt=1.0,
+):
+    """
+    真値付きの系列に対して Q, R, P0 を探索する
+
+    各パラメータは対数空間で探索し、設定はデータのハッシュと合わせて
+    キャッシュするため、同じ探索を繰り返す場合は評価済みの設定を省略する
+
+    Parameters
+    ----------
+    truth : ndarray, shape (T,) or (T, 3)
+        真の状態
+    zs : ndarray, shape (T,) or (T, 3)
+        観測値
+    us : ndarray, shape (T,) or (T, 2)
+        制御入力
+    space : dict, optional
+        {"Q": (low, high), "R": (low, high), "P0": (low, high)} の探索範囲
+    method : str
+        "grid"、"random" または "nelder-mead"
+    n_grid : int
+        グリッド探索の各軸の点数
+    n_samples : int
+        ランダム探索の評価数
+    max_iter : int
+        Nelder-Mead の最大反復回数
+    n_workers : int
+        評価に使うワーカプロセス数（1 の場合は逐次）
+    cache_path : str, optional
+        評価結果キャッシュ (JSON) のパス
+    seed : int
+        乱数シード
+    x0 : float or ndarray, optional
+        初期推定値（省略時は zs[0]）
+    bases : dict, optional
+        2次元の場合の "Q", "R", "P0" 基底行列
+    dt : float
+        時間ステップ (s)
+
+    Returns
+    -------
+    result : TuningResult
+        最良のパラメータと全評価のスコア表
+    """
+    if space is None:
+        space = {"Q": (1e-4, 1.0), "R": (1e-3, 10.0)}
+    names = sorted(space)
+    lo = np.log10([space[n][0] for n in names])
+    hi = np.log10([space[n][1] for n in names])
+
+    def to_params(log_point):
+        return {n: float(10.0**v) for n, v in zip(names, log_point)}
+
+    data = {"truth": truth, "zs": zs, "us": us, "x0": x0, "bases": bases, "dt": dt}
+    evaluator = _Evaluator(data, n_workers, cache_path)
+    try:
+        if method == "grid":
+            axes = [np.linspace(a, b, n_grid) for a, b in zip(lo, hi)]
+            evaluator([to_params(p) for p in itertools.product(*axes)])
+        elif method == "random":
+            rng = np.random.default_rng(seed)
+            points = rng.uniform(lo, hi, size=(n_samples, len(names)))
+            evaluator([to_params(p) for p in points])
+        elif method == "nelder-mead":
+            _nelder_mead(evaluator, to_params, lo, hi, max_iter)
+        else:
+            raise ValueError(f"unknown method: {method}")
+    finally:
+        evaluator.close()
+
+    return TuningResult(list(evaluator.rows.values()), evaluator.n_cached)
+
+
+def _nelder_mead(evaluator, to_params, lo, hi, max_iter):
+    """
+    対数空間での Nelder-Mead 法
+
+    反射・拡大・収縮の候補点を1回の並列評価にまとめる
+    """
+    dim = len(lo)
+    center = 0.5 * (lo + hi)
+    simplex = np.vstack([center] + [center + 0.25 * (hi - lo) * e for e in np.eye(dim)])
+    scores = np.array(evaluator([to_params(p) for p in simplex]))
+
+    for _ in range(max_iter):
+        order = np.argsort(scores)
+        simplex, scores = simplex[order], scores[order]
+        if np.max(np.abs(simplex[1:] - simplex[0])) < 1e-3:
+            break
+
+        centroid = simplex[:-1].mean(axis=0)
+        worst = simplex[-1]
+        candidates = np.clip(
+            [
+                centroid + (centroid - worst),  # 反射
+                centroid + 2.0 * (centroid - worst),  # 拡大
+                centroid + 0.5 * (centroid - worst),  # 外側収縮
+                centroid - 0.5 * (centroid - worst),  # 内側収縮
+            ],
+            lo,
+            hi,
+        )
+        f_r, f_e, f_oc, f_ic = evaluator([to_params(p) for p in candidates])
+
+        if f_r < scores[0]:
+            simplex[-1], scores[-1] = (candidates[1], f_e) if f_e < f_r else (candidates[0], f_r)
+        elif f_r < scores[-2]:
+            simplex[-1], scores[-1] = candidates[0], f_r
+        elif min(f_oc, f_ic) < scores[-1]:
+            simplex[-1], scores[-1] = (
+                (candidates[2], f_oc) if f_oc < f_ic else (candidates[3], f_ic)
+            )
+        else:
+            # 縮小
+            simplex[1:] = simplex[0] + 0.5 * (simplex[1:] - simplex[0])
+            scores[1:] = evaluator([to_params(p) for p in simplex[1:]])
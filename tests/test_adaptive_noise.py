@@ -0,0 +1,75 @@
+"""Tests for adaptive noise estimation"""
+import numpy as np
+
+from src.adaptive_noise import AdaptiveNoiseEstimator, fit_noise_em
+from src.extended_kf import ExtendedKalmanFilter
+from src.linear_kf import LinearKalmanFilter
+
+
+def test_window_running_sums_match_rescan():
+    """Test that windowed running sums equal a re-scan of the window"""
+    np.random.seed(0)
+    est = AdaptiveNoiseEstimator(window=5, adapt_Q=False)
+    ys = np.random.randn(12, 2)
+    hs = np.random.rand(12, 2, 2)
+
+    for k in range(12):
+        est.step(ys[k], hs[k], np.eye(2), np.eye(2), np.eye(2))
+
+    C_ref = np.mean([np.outer(y, y) for y in ys[-5:]], axis=0)
+    assert np.allclose(est.C, C_ref)
+    assert np.allclose(est.HPHt, hs[-5:].mean(axis=0))
+
+
+def test_linear_filter_adapts_R():
+    """Test that a badly tuned R converges towards the true value"""
+    np.random.seed(1)
+    est = AdaptiveNoiseEstimator(alpha=0.01, adapt_Q=False)
+    kf = LinearKalmanFilter(Q=0.01, R=4.0, x0=0.0, P0=1.0, noise_estimator=est)
+
+    position = 0.0
+    for _ in range(3000):
+        position += 1.0 + np.random.randn() * 0.1
+        kf.filter_step(z=position + np.random.randn() * 0.5, u=1.0)
+
+    assert isinstance(kf.R, float)
+    assert abs(kf.R - 0.25) < 0.1
+    assert kf.Q == 0.01
+
+
+def test_ekf_with_estimator():
+    """Test that the EKF keeps a valid adapted R"""
+    np.random.seed(2)
+    est = AdaptiveNoiseEstimator(window=50)
+    Q = np.diag([0.01, 0.01, 0.001])
+    ekf = ExtendedKalmanFilter(
+        Q=Q, R=np.eye(3), x0=np.zeros(3), P0=np.eye(3), dt=1.0, noise_estimator=est
+    )
+
+    for _ in range(100):
+        ekf.filter_step(np.random.randn(3) * 0.1, [0.0, 0.0])
+
+    assert est.n == 100
+    assert ekf.R.shape == (3, 3)
+    assert np.all(np.linalg.eigvalsh(ekf.R) > 0)
+    assert np.all(np.diag(ekf.R) < 1.0)
+
+
+def test_fit_noise_em_recovers_parameters():
+    """Test batch EM fitting over several channels with dropouts"""
+    np.random.seed(3)
+    T, C = 1000, 3
+    Q_true = np.array([0.01, 0.1, 0.05])
+    R_true = np.array([0.25, 0.5, 1.0])
+    x = np.cumsum(1.0 + np.random.randn(T, C) * np.sqrt(Q_true), axis=0)
+    zs = x + np.random.randn(T, C) * np.sqrt(R_true)
+    zs[np.random.rand(T, C) < 0.1] = np.nan
+
+    Q, R, lls = fit_noise_em(zs, us=1.0, Q0=0.1, R0=0.5, n_iter=40, tol=1e-4)
+
+    assert np.all(np.diff(lls) > -1e-6)
+    assert np.allclose(Q, Q_true, rtol=0.5)
+    assert np.allclose(R, R_true, rtol=0.2)
+
+    Q1, R1, _ = fit_noise_em(zs[:, 0], us=1.0, n_iter=5)
+    assert isinstance(Q1, float) and isinstance(R1, float)
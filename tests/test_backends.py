@@ -0,0 +1,76 @@
+"""Tests for the sequence and fleet filtering backends"""
+import numpy as np
+import pytest
+
+from src import backends
+from src.extended_kf import ExtendedKalmanFilter
+
+Q = np.diag([0.01, 0.01, 0.002])
+R = np.diag([0.2, 0.2, 0.05])
+
+
+def _ekf_data(T=60, N=4, seed=0):
+    rng = np.random.default_rng(seed)
+    us = np.stack([np.full((T, N), 1.0), rng.normal(0.2, 0.05, (T, N))], axis=-1)
+    zs = rng.normal(size=(T, N, 3)) * [0.5, 0.5, 0.2]
+    zs[:, :, :2] += np.linspace(0, 5, T)[:, None, None]
+    zs[rng.random((T, N, 3)) < 0.1] = np.nan
+    x0 = rng.normal(size=(N, 3)) * 0.1
+    return zs, us, x0
+
+
+def test_loop_kernels_match_numpy():
+    """Test the loop kernels (compiled by Numba when available) against NumPy"""
+    zs, us, x0 = _ekf_data()
+    P0 = np.eye(3)
+
+    xs_np, Ps_np = backends.BACKENDS["numpy"].ekf_sequence(zs[:, 0], us[:, 0], Q, R, x0[0], P0, 0.1)
+    xs_loop, Ps_loop = backends._loop_ekf_sequence(
+        zs[:, 0].copy(), us[:, 0].copy(), Q, R, x0[0], P0, 0.1
+    )
+    assert np.allclose(xs_loop, xs_np)
+    assert np.allclose(Ps_loop, Ps_np)
+
+    xs_np, P_np = backends.ekf_fleet(zs, us, Q, R, x0, P0, dt=0.1, backend="numpy")
+    xs_loop, P_loop = backends._loop_ekf_fleet(
+        zs, us, Q, R, x0, np.array(np.broadcast_to(P0, (4, 3, 3))), 0.1
+    )
+    assert np.allclose(xs_loop, xs_np)
+    assert np.allclose(P_loop, P_np)
+
+    lin_zs = np.cumsum(np.ones((50, 3)), axis=0) + np.random.default_rng(1).normal(size=(50, 3))
+    lin_zs[::7, 1] = np.nan
+    params = [np.full(3, 0.1), np.full(3, 0.5), np.zeros(3), np.ones(3)]
+    xs_np, Ks_np = backends.linear_sequence(lin_zs, 1.0, *params, backend="numpy")
+    xs_loop, Ks_loop = backends._loop_linear_sequence(lin_zs, np.ones((50, 3)), *params)
+    assert np.allclose(xs_loop, xs_np)
+    assert np.allclose(Ks_loop, Ks_np)
+
+
+def test_numpy_sequence_matches_filter():
+    """Test that the numpy backend reproduces ExtendedKalmanFilter.filter_sequence"""
+    zs, us, x0 = _ekf_data(N=1)
+    ekf = ExtendedKalmanFilter(Q=Q, R=R, x0=x0[0], P0=np.eye(3), dt=0.1)
+    xs_ref, _ = ekf.filter_sequence(zs[:, 0], us[:, 0])
+    xs, _ = backends.ekf_sequence(zs[:, 0], us[:, 0], Q, R, x0[0], np.eye(3), 0.1, "numpy")
+    assert np.allclose(xs, xs_ref)
+
+
+def test_backend_registry():
+    """Test backend selection and fallback"""
+    default = backends.get_backend()
+    expected = "numba" if backends.numba is not None else "numpy"
+    assert default.name == expected
+    assert backends.get_backend("auto") is default
+    with pytest.raises(ValueError):
+        backends.get_backend("does-not-exist")
+
+
+def test_numba_backend_matches_numpy():
+    """Test the compiled backend for numeric equivalence"""
+    pytest.importorskip("numba")
+    zs, us, x0 = _ekf_data()
+    xs_np, P_np = backends.ekf_fleet(zs, us, Q, R, x0, np.eye(3), dt=0.1, backend="numpy")
+    xs_nb, P_nb = backends.ekf_fleet(zs, us, Q, R, x0, np.eye(3), dt=0.1, backend="numba")
+    assert np.allclose(xs_nb, xs_np)
+    assert np.allclose(P_nb, P_np)
@@ -0,0 +1,124 @@
+"""Tests for filter and simulator checkpoints"""
+import numpy as np
+import pytest
+
+from src import checkpoint
+from src.delayed_ekf import DelayedMeasurementEKF
+from src.extended_kf import ExtendedKalmanFilter
+from src.fixed_lag_smoother import FixedLagSmoother
+from src.linear_kf import LinearKalmanFilter
+from src.robot_2d_simulator import Robot2D
+from src.robot_simulator import Robot1D
+
+
+def _make_ekf(seed=0):
+    rng = np.random.default_rng(seed)
+    ekf = ExtendedKalmanFilter(
+        Q=np.eye(3) * 0.01, R=np.eye(3) * 0.1, x0=rng.normal(size=3), P0=np.eye(3), dt=0.1
+    )
+    ekf.predict([1.0, 0.1])
+    ekf.update(rng.normal(size=3))
+    return ekf
+
+
+def test_ekf_roundtrip_in_place():
+    """Test that restore writes into the existing arrays of the target filter"""
+    ekf = _make_ekf()
+    data = checkpoint.snapshot(ekf)
+
+    target = ExtendedKalmanFilter(Q=np.eye(3), R=np.eye(3), x0=np.zeros(3), P0=np.eye(3))
+    P_buffer = target.P
+    checkpoint.restore(data, target)
+
+    assert target.P is P_buffer
+    assert np.allclose(target.x, ekf.x)
+    assert np.allclose(target.P, ekf.P)
+    assert np.allclose(target.Q, ekf.Q)
+    assert target.dt == ekf.dt
+
+    loaded = checkpoint.load(data)
+    assert np.allclose(loaded.P, ekf.P)
+
+
+def test_linear_kf_roundtrip():
+    """Test snapshot and load of the scalar linear filter"""
+    kf = LinearKalmanFilter(Q=0.2, R=0.5, x0=1.5, P0=2.0)
+    kf.filter_step(z=2.0, u=0.5)
+    restored = checkpoint.load(checkpoint.snapshot(kf))
+    assert (restored.x, restored.P, restored.Q, restored.R) == (kf.x, kf.P, kf.Q, kf.R)
+
+
+def test_robot_restore_replays_identically():
+    """Test that restoring a simulator (and its RNG state) reproduces the same run"""
+    np.random.seed(1)
+    robot = Robot2D([0.0, 0.0, 0.0], [0.1, 0.1, 0.01], [0.5, 0.5, 0.05], dt=0.1)
+    robot.move([1.0, 0.1])
+    data = checkpoint.snapshot(robot)
+
+    first = [robot.move([1.0, 0.1]) for _ in range(5)]
+    checkpoint.restore(data, robot)
+    assert len(robot.state_history) == 2
+    second = [robot.move([1.0, 0.1]) for _ in range(5)]
+    assert np.allclose(first, second)
+
+    robot_1d = Robot1D(0.0, 0.5, 1.0)
+    data = checkpoint.snapshot(robot_1d)
+    a = [robot_1d.move(1.0) for _ in range(3)]
+    b = [checkpoint.load(data).move(1.0)]
+    assert a[0] == b[0]
+
+
+def test_robot_ring_history_cursor():
+    """Test that restore rewinds a ring-buffer history to the snapshot cursor"""
+    robot = Robot2D([0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], history_capacity=8)
+    for _ in range(3):
+        robot.move([1.0, 0.0])
+    data = checkpoint.snapshot(robot)
+    for _ in range(2):
+        robot.move([1.0, 0.0])
+
+    checkpoint.restore(data, robot)
+    assert robot.state_history.total == 4
+    assert np.allclose(np.asarray(robot.state_history)[:, 0], [0.0, 1.0, 2.0, 3.0])
+    assert len(robot.observation_history) == 4
+
+
+def test_fleet_roundtrip():
+    """Test batched snapshots of several filters"""
+    fleet = [_make_ekf(seed) for seed in range(4)]
+    data = checkpoint.snapshot_fleet(fleet)
+    loaded = checkpoint.load_fleet(data)
+    assert len(loaded) == 4
+    for a, b in zip(fleet, loaded):
+        assert np.allclose(a.x, b.x)
+        assert np.allclose(a.P, b.P)
+
+    targets = checkpoint.restore_fleet(data, [_make_ekf(10) for _ in range(4)])
+    assert np.allclose(targets[3].x, fleet[3].x)
+    with pytest.raises(ValueError):
+        checkpoint.restore_fleet(data, fleet[:2])
+
+
+def test_invalid_buffers_are_rejected():
+    """Test magic, version and type checks"""
+    data = bytearray(checkpoint.snapshot(_make_ekf()))
+    with pytest.raises(TypeError):
+        checkpoint.restore(bytes(data), LinearKalmanFilter(Q=1.0, R=1.0))
+    data[4] = 99
+    with pytest.raises(ValueError):
+        checkpoint.load(bytes(data))
+    with pytest.raises(ValueError):
+        checkpoint.load(b"XXXX" + bytes(data[4:]))
+
+
+def test_subclasses_are_rejected():
+    """Test that EKF subclasses with extra buffers are not saved with the plain EKF layout"""
+    kwargs = dict(Q=np.eye(3) * 0.01, R=np.eye(3) * 0.1, x0=np.zeros(3), P0=np.eye(3))
+    for obj in [DelayedMeasurementEKF(**kwargs), FixedLagSmoother(lag=3, **kwargs)]:
+        with pytest.raises(TypeError):
+            checkpoint.snapshot(obj)
+        with pytest.raises(TypeError):
+            checkpoint.snapshot_fleet([obj])
+    data = checkpoint.snapshot(ExtendedKalmanFilter(**kwargs))
+    with pytest.raises(TypeError):
+        checkpoint.restore(data, FixedLagSmoother(lag=3, **kwargs))
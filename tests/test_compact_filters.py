@@ -0,0 +1,47 @@
+"""Tests for the NumPy-free compact filters"""
+import math
+
+import numpy as np
+
+from src.compact_filters import CompactEKF, CompactLinearKalmanFilter
+from src.extended_kf import ExtendedKalmanFilter
+from src.linear_kf import LinearKalmanFilter
+
+
+def test_compact_linear_matches_reference():
+    """Test the compact 1-D filter against LinearKalmanFilter"""
+    rng = np.random.default_rng(0)
+    kf = LinearKalmanFilter(Q=0.01, R=0.25, x0=0.0, P0=1.0)
+    compact = CompactLinearKalmanFilter(Q=0.01, R=0.25, x0=0.0, P0=1.0)
+
+    for z in np.cumsum(np.ones(50)) + rng.normal(size=50) * 0.5:
+        x_ref, K_ref = kf.filter_step(z=z, u=1.0)
+        x, K = compact.filter_step(z=float(z), u=1.0)
+        assert math.isclose(x, x_ref, rel_tol=1e-12)
+        assert math.isclose(K, K_ref, rel_tol=1e-12)
+
+    assert compact.update(float("nan")) == 0.0
+    assert not hasattr(compact, "__dict__")
+
+
+def test_compact_ekf_matches_reference():
+    """Test the unrolled EKF against ExtendedKalmanFilter over a long run"""
+    rng = np.random.default_rng(1)
+    Q = np.array([[0.01, 0.001, 0.0], [0.001, 0.02, 0.002], [0.0, 0.002, 0.005]])
+    R = np.array([[0.1, 0.01, 0.0], [0.01, 0.2, 0.0], [0.0, 0.0, 0.05]])
+    P0 = np.diag([1.0, 2.0, 0.5])
+    x0 = np.array([0.5, -0.5, 3.0])
+    ekf = ExtendedKalmanFilter(Q=Q, R=R, x0=x0, P0=P0, dt=0.1)
+    compact = CompactEKF(Q=Q, R=R, x0=x0, P0=P0, dt=0.1)
+
+    for _ in range(500):
+        u = (1.0 + rng.normal() * 0.1, 0.5 + rng.normal() * 0.1)
+        z = ekf.x + rng.normal(size=3) * [0.3, 0.3, 0.2]
+        x_ref, K_ref = ekf.filter_step(z, u)
+        x, K = compact.filter_step(tuple(z), u)
+
+        assert np.allclose(x, x_ref, rtol=1e-9, atol=1e-12)
+        assert np.allclose(K, K_ref, rtol=1e-9, atol=1e-12)
+        assert np.allclose(compact.P, ekf.P, rtol=1e-9, atol=1e-12)
+
+    assert not hasattr(compact, "__dict__")
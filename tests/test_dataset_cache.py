@@ -0,0 +1,91 @@
+"""Tests for the on-disk dataset cache"""
+import os
+
+import numpy as np
+
+from src.dataset_cache import DatasetCache, config_key, simulate_1d, simulate_2d
+from src.robot_2d_simulator import Robot2D
+
+US = np.tile([1.0, 0.1], (50, 1))
+
+
+def test_simulate_2d_matches_manual_loop():
+    """Test that generated data equals stepping Robot2D after seeding, without touching the RNG"""
+    np.random.seed(42)
+    robot = Robot2D([0.0, 0.0, 0.0], [0.05, 0.05, 0.02], [0.3, 0.3, 0.1], dt=0.1)
+    for u in US:
+        robot.move(u)
+
+    np.random.seed(7)
+    before = np.random.get_state()[1].copy()
+    data = simulate_2d([0.0, 0.0, 0.0], [0.05, 0.05, 0.02], [0.3, 0.3, 0.1], US, dt=0.1, seed=42)
+    assert np.array_equal(np.random.get_state()[1], before)
+    assert np.array_equal(data["truth"], np.array(robot.state_history))
+    assert np.array_equal(data["observations"], np.array(robot.observation_history))
+
+    data_1d = simulate_1d(0.0, 0.1, 0.5, np.ones(10))
+    assert data_1d["truth"].shape == data_1d["observations"].shape == (11,)
+
+
+def test_repeat_runs_load_from_disk(tmp_path):
+    """Test that a repeated configuration is served memory-mapped from the cache"""
+    cache = DatasetCache(str(tmp_path))
+    first = cache.simulate_2d([0.0, 0.0, 0.0], [0.05, 0.05, 0.02], [0.3, 0.3, 0.1], US, dt=0.1)
+    second = DatasetCache(str(tmp_path)).simulate_2d(
+        [0.0, 0.0, 0.0], [0.05, 0.05, 0.02], [0.3, 0.3, 0.1], US, dt=0.1
+    )
+    assert cache.n_misses == 1
+    assert isinstance(second["truth"], np.memmap)
+    assert not second["truth"].flags.writeable
+    for name in ("truth", "observations", "controls"):
+        assert np.array_equal(first[name], second[name])
+
+    # 設定が変わると別のエントリになる
+    cache.simulate_2d([0.0, 0.0, 0.0], [0.05, 0.05, 0.02], [0.3, 0.3, 0.1], US, dt=0.1, seed=1)
+    cache.simulate_1d(0.0, 0.1, 0.5, np.ones(10))
+    assert cache.n_misses == 3
+    assert len(cache) == 3
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp")]
+
+
+def test_config_key():
+    """Test that keys depend on array contents and dtype but not on dict order"""
+    a = {"controls": np.ones((3, 2)), "seed": 1}
+    assert config_key(a) == config_key({"seed": 1, "controls": np.ones((3, 2))})
+    assert config_key(a) != config_key({"controls": np.ones((2, 3)), "seed": 1})
+    assert config_key(a) != config_key({"controls": np.ones((3, 2), dtype=int), "seed": 1})
+    assert config_key({"x": [1.0, 2.0]}) == config_key({"x": np.array([1.0, 2.0])})
+
+
+def test_lru_eviction(tmp_path):
+    """Test that entry and size limits evict the least recently used datasets"""
+    cache = DatasetCache(str(tmp_path), max_entries=2)
+    for i in range(2):
+        cache.put(f"k{i}", {"a": np.full(100, i)})
+        os.utime(tmp_path / f"k{i}" / "meta.json", (1000 + i, 1000 + i))
+    assert cache.get("k0") is not None  # k0 を最近使ったことにする
+    cache.put("k2", {"a": np.full(100, 2)})
+    assert "k1" not in cache
+    assert "k0" in cache and "k2" in cache
+
+    size = cache.size_bytes
+    cache.max_entries = None
+    cache.max_bytes = size
+    cache.put("k3", {"a": np.zeros(1000)})
+    # 新しいエントリ自体が上限を超える場合も、そのエントリは残す
+    assert list(os.listdir(tmp_path)) == ["k3"]
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_put_replaces_existing_entry(tmp_path):
+    """Test that storing an existing key swaps in the new arrays"""
+    cache = DatasetCache(str(tmp_path))
+    cache.put("k", {"a": np.zeros(10), "b": np.ones(3)})
+    cache.put("k", {"a": np.arange(5.0)})
+    data = cache.get("k")
+    assert list(data) == ["a"]
+    assert np.array_equal(data["a"], np.arange(5.0))
+    assert not os.path.exists(tmp_path / "k" / "b.npy")
+    assert os.listdir(tmp_path) == ["k"]
+    assert len(cache) == 1
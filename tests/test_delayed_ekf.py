@@ -0,0 +1,68 @@
+"""Tests for delayed / out-of-sequence measurement handling"""
+import numpy as np
+import pytest
+
+from src.delayed_ekf import DelayedMeasurementEKF
+from src.extended_kf import ExtendedKalmanFilter
+
+Q = np.diag([0.01, 0.01, 0.001])
+R = np.diag([0.1, 0.1, 0.01])
+
+
+def _sequence(T=40, seed=0):
+    rng = np.random.default_rng(seed)
+    us = np.column_stack([np.full(T, 1.0), np.full(T, 0.2)])
+    zs = rng.normal(size=(T, 3)) * 0.3 + np.column_stack(
+        [np.linspace(0, 4, T), np.linspace(0, 1, T), np.linspace(0, 0.8, T)]
+    )
+    return us, zs
+
+
+def test_delayed_measurement_matches_in_order_processing():
+    """Test that a late measurement gives the same result as applying it on time"""
+    us, zs = _sequence()
+    delay = 4
+
+    reference = ExtendedKalmanFilter(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=0.1)
+    delayed = DelayedMeasurementEKF(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=0.1, horizon=0.5)
+
+    for k in range(len(us)):
+        reference.predict(us[k])
+        reference.update(zs[k])
+        delayed.predict(us[k])
+        # 観測は delay ステップ遅れて届く
+        if k >= delay:
+            delayed.update(zs[k - delay], t=(k - delay + 1) * 0.1)
+
+    for k in range(len(us) - delay, len(us)):
+        delayed.update(zs[k], t=(k + 1) * 0.1)
+
+    assert np.allclose(delayed.x, reference.x)
+    assert np.allclose(delayed.P, reference.P)
+    assert delayed.n_updates == reference.n_updates
+
+
+def test_history_is_bounded_by_horizon():
+    """Test that the buffer keeps horizon/dt slots and drops older measurements"""
+    us, zs = _sequence(T=20)
+    ekf = DelayedMeasurementEKF(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=0.1, horizon=0.5)
+    for u in us:
+        ekf.predict(u)
+
+    times, xs, Ps = ekf.history()
+    assert ekf.capacity == 6
+    assert len(times) == 6
+    assert np.allclose(np.diff(times), 0.1)
+    assert np.isclose(times[-1], ekf.t)
+
+    x_before = ekf.x.copy()
+    assert ekf.update(zs[0], t=0.5) is None
+    assert ekf.n_dropped == 1
+    assert np.allclose(ekf.x, x_before)
+
+
+def test_future_measurement_raises():
+    """Test that a measurement ahead of the filter time is rejected"""
+    ekf = DelayedMeasurementEKF(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=0.1)
+    with pytest.raises(ValueError):
+        ekf.update(np.zeros(3), t=1.0)
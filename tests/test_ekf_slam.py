@@ -0,0 +1,94 @@
+"""Tests for EKF-SLAM"""
+import numpy as np
+
+from src.ekf_slam import EKFSLAM, range_bearing
+from src.robot_2d_simulator import Robot2D
+
+
+def _make_slam(**kwargs):
+    Q = np.diag([0.01, 0.01, 0.001])
+    R = np.diag([0.01, 0.001])
+    return EKFSLAM(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3) * 1e-6, dt=1.0, **kwargs)
+
+
+def test_range_bearing():
+    """Test vectorized range-bearing observations"""
+    z = range_bearing(np.array([1.0, 1.0, np.pi / 2]), [[1.0, 3.0], [2.0, 1.0]])
+    assert np.allclose(z, [[2.0, 0.0], [1.0, -np.pi / 2]])
+
+
+def test_landmark_initialization_and_growth():
+    """Test that landmarks are added and the buffers grow by doubling"""
+    slam = _make_slam(initial_capacity=2)
+    landmarks = np.array([[5.0, 0.0], [0.0, 5.0], [-5.0, 0.0], [0.0, -5.0], [3.0, 3.0]])
+    slam.update_many(range(5), range_bearing(slam.x, landmarks))
+
+    assert slam.n_landmarks == 5
+    assert slam.n == 13
+    assert slam.capacity == 8
+    assert np.allclose(slam.landmarks(), landmarks)
+    assert np.allclose(slam.P, slam.P.T)
+
+
+def test_predict_only_touches_robot_rows():
+    """Test that the map block is unchanged by prediction"""
+    slam = _make_slam()
+    slam.update_many([0, 1], range_bearing(slam.x, [[5.0, 0.0], [0.0, 5.0]]))
+    P_mm = slam.P[3:, 3:].copy()
+
+    slam.predict([1.0, 0.1])
+
+    assert np.array_equal(slam.P[3:, 3:], P_mm)
+    assert np.allclose(slam.P, slam.P.T)
+
+
+def test_update_matches_dense_ekf():
+    """Test that the block-sparse update equals the dense EKF update"""
+    slam = _make_slam()
+    landmarks = np.array([[5.0, 1.0], [2.0, 4.0]])
+    slam.update_many([0, 1], range_bearing(slam.x, landmarks) + 0.05)
+    slam.predict([1.0, 0.2])
+
+    x, P = slam.x.copy(), slam.P.copy()
+    z = range_bearing(x, landmarks[1:])[0] + np.array([0.1, -0.02])
+
+    dx, dy = x[5] - x[0], x[6] - x[1]
+    q = dx**2 + dy**2
+    r = np.sqrt(q)
+    H = np.zeros((2, 7))
+    H[:, :3] = [[-dx / r, -dy / r, 0.0], [dy / q, -dx / q, -1.0]]
+    H[:, 5:7] = [[dx / r, dy / r], [-dy / q, dx / q]]
+    S = H @ P @ H.T + slam.R
+    K_ref = P @ H.T @ np.linalg.inv(S)
+    y = z - range_bearing(x, x[5:7])[0]
+    P_ref = (np.eye(7) - K_ref @ H) @ P
+
+    K = slam.update(1, z)
+
+    assert np.allclose(K, K_ref)
+    assert np.allclose(slam.x, x + K_ref @ y)
+    assert np.allclose(slam.P, P_ref)
+
+
+def test_slam_loop_with_simulated_robot():
+    """Test that the map converges while the robot drives a circle"""
+    np.random.seed(0)
+    robot = Robot2D([0.0, 0.0, 0.0], [0.02, 0.02, 0.005], [0.0, 0.0, 0.0])
+    slam = _make_slam()
+    landmarks = np.array([[4.0, 2.0], [-1.0, 6.0], [2.0, 8.0], [-4.0, 3.0]])
+
+    for _ in range(60):
+        u = [0.5, 0.1]
+        robot.move(u)
+        slam.predict(u)
+        z = range_bearing(robot.state, landmarks) + np.random.randn(4, 2) * [0.1, 0.03]
+        slam.update_many(range(4), z)
+
+    # 地図の相対配置は真値に近い（大域的な並進・回転は不定）
+    est = slam.landmarks()
+    assert np.allclose(
+        np.linalg.norm(est[1:] - est[0], axis=1),
+        np.linalg.norm(landmarks[1:] - landmarks[0], axis=1),
+        atol=0.5,
+    )
+    assert np.all(np.linalg.eigvalsh(slam.P) > -1e-9)
@@ -1,13 +1,7 @@
 """Tests for Extended Kalman Filter"""
-import sys
-from pathlib import Path
-
 import numpy as np
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from extended_kf import ExtendedKalmanFilter
+from src.extended_kf import ExtendedKalmanFilter
 
 
 def test_initialization():
@@ -108,3 +102,111 @@ def test_multiple_steps():
         assert np.all(np.diag(ekf.P) >= 0)
         # Angle should remain normalized
         assert -np.pi <= ekf.x[2] <= np.pi
+
+
+def test_partial_observation():
+    """Test update with a missing heading component"""
+    Q = np.diag([0.01, 0.01, 0.001])
+    R = np.diag([0.25, 0.25, 0.01])
+    P0 = np.array([[1.0, 0.0, 0.2], [0.0, 1.0, 0.1], [0.2, 0.1, 0.5]])
+    ekf = ExtendedKalmanFilter(Q=Q, R=R, x0=np.zeros(3), P0=P0, dt=1.0)
+
+    z = np.array([1.0, -1.0, np.nan])
+    K = ekf.update(z)
+
+    # 観測された成分 (x, y) のみの更新と一致する
+    H = np.eye(3)[:2]
+    S = H @ P0 @ H.T + R[:2, :2]
+    K_ref = P0 @ H.T @ np.linalg.inv(S)
+    x_ref = K_ref @ z[:2]
+    P_ref = (np.eye(3) - K_ref @ H) @ P0
+
+    assert np.allclose(K[:, :2], K_ref)
+    assert np.allclose(K[:, 2], 0.0)
+    assert np.allclose(ekf.x, x_ref)
+    assert np.allclose(ekf.P, P_ref)
+
+
+def test_fully_missing_observation():
+    """Test that an all-NaN observation reduces to predict only"""
+    Q = np.diag([0.01, 0.01, 0.001])
+    R = np.diag([0.25, 0.25, 0.01])
+    ekf = ExtendedKalmanFilter(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=1.0)
+    ekf.predict([1.0, 0.1])
+    x_pred, P_pred = ekf.x.copy(), ekf.P.copy()
+
+    K = ekf.update(np.ma.masked_all(3))
+
+    assert np.allclose(K, 0.0)
+    assert np.allclose(ekf.x, x_pred)
+    assert np.allclose(ekf.P, P_pred)
+    # 何も更新していない呼び出しは数えない
+    assert ekf.n_updates == 0
+    ekf.update([np.nan, np.nan, np.nan])
+    assert ekf.n_updates == 0
+    ekf.update([0.5, 0.0, np.nan])
+    assert ekf.n_updates == 1
+
+
+def test_filter_sequence_with_dropouts():
+    """Test sequence processing with dropped observations"""
+    Q = np.diag([0.01, 0.01, 0.001])
+    R = np.diag([0.25, 0.25, 0.01])
+    np.random.seed(0)
+    T = 40
+    us = np.tile([1.0, 0.1], (T, 1))
+    zs = np.random.randn(T, 3) * 0.1
+    zs[::3] = np.nan
+    zs[1::5, 2] = np.nan
+
+    ekf_seq = ExtendedKalmanFilter(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=1.0)
+    xs, Ps = ekf_seq.filter_sequence(zs, us)
+
+    ekf = ExtendedKalmanFilter(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=1.0)
+    for k in range(T):
+        x, _ = ekf.filter_step(zs[k], us[k])
+        assert np.allclose(xs[k], x)
+        assert np.allclose(Ps[k], ekf.P)
+    assert np.all(np.isfinite(xs))
+
+
+def test_outlier_rejection():
+    """Test that a gross outlier is rejected and counted"""
+    Q = np.diag([0.01, 0.01, 0.001])
+    R = np.diag([0.25, 0.25, 0.01])
+    ekf = ExtendedKalmanFilter(
+        Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3) * 0.1, dt=1.0, gate_threshold=11.345
+    )
+
+    K = ekf.update(np.array([50.0, -50.0, 0.0]))
+
+    assert np.allclose(K, 0.0)
+    assert np.allclose(ekf.x, 0.0)
+    assert ekf.n_rejected == 1
+    assert ekf.n_gated == 1
+    assert ekf.nis > 11.345
+
+    ekf.update(np.array([0.1, 0.1, 0.0]))
+    assert ekf.n_rejected == 1
+    assert ekf.n_updates == 2
+
+
+def test_outlier_inflate_and_robust():
+    """Test that inflate and robust modes shrink the gain for outliers"""
+    Q = np.diag([0.01, 0.01, 0.001])
+    R = np.diag([0.25, 0.25, 0.01])
+    z = np.array([50.0, -50.0, 0.0])
+
+    plain = ExtendedKalmanFilter(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=1.0)
+    K_plain = plain.update(z)
+
+    for kwargs in [
+        {"gate_threshold": 11.345, "gate_policy": "inflate"},
+        {"robust": "huber"},
+        {"robust": "student_t"},
+    ]:
+        ekf = ExtendedKalmanFilter(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=1.0, **kwargs)
+        K = ekf.update(z)
+        assert np.linalg.norm(K) < np.linalg.norm(K_plain)
+        assert np.linalg.norm(ekf.x) < np.linalg.norm(plain.x)
+        assert ekf.n_rejected == 0
@@ -0,0 +1,94 @@
+"""Tests for the online fixed-lag smoother"""
+import numpy as np
+import pytest
+
+from src.extended_kf import ExtendedKalmanFilter
+from src.fixed_lag_smoother import FixedLagSmoother
+from src.motion_models import euler
+from src.robot_2d_simulator import Robot2D
+
+Q = np.diag([0.01, 0.01, 0.002])
+R = np.diag([0.3, 0.3, 0.05])
+
+
+def _sequence(T=60, seed=0):
+    np.random.seed(seed)
+    robot = Robot2D(np.zeros(3), np.sqrt(np.diag(Q)), np.sqrt(np.diag(R)), dt=0.1)
+    us = np.column_stack([np.full(T, 1.0), 0.5 * np.sin(np.linspace(0, 3, T))])
+    truth, zs = [], []
+    for u in us:
+        robot.move(u)
+        truth.append(robot.get_state())
+        zs.append(robot.observe())
+    zs = np.array(zs)
+    zs[5::7] = np.nan
+    return np.array(truth), zs, us
+
+
+def _rts(zs, us):
+    """全系列に対する RTS 平滑化（参照実装）"""
+    ekf = ExtendedKalmanFilter(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=0.1)
+    xf, Pf, xp, Pp, Fs = [ekf.x.copy()], [ekf.P.copy()], [], [], []
+    for z, u in zip(zs, us):
+        _, F = euler(ekf.x, u, 0.1)
+        ekf.predict(u)
+        xp.append(ekf.x.copy())
+        Pp.append(ekf.P.copy())
+        Fs.append(F)
+        ekf.update(z)
+        xf.append(ekf.x.copy())
+        Pf.append(ekf.P.copy())
+    xs, Ps = [xf[-1]], [Pf[-1]]
+    for k in range(len(zs) - 1, -1, -1):
+        G = Pf[k] @ Fs[k].T @ np.linalg.inv(Pp[k])
+        dx = xs[0] - xp[k]
+        dx[2] = (dx[2] + np.pi) % (2 * np.pi) - np.pi
+        xs.insert(0, xf[k] + G @ dx)
+        Ps.insert(0, Pf[k] + G @ (Ps[0] - Pp[k]) @ G.T)
+    return np.array(xs[1:]), np.array(Ps[1:])
+
+
+def _smoother(lag):
+    return FixedLagSmoother(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=0.1, lag=lag)
+
+
+def test_window_matches_full_rts():
+    """Test that with a lag covering the whole log the smoother equals batch RTS"""
+    _, zs, us = _sequence(T=30)
+    xs_ref, Ps_ref = _rts(zs, us)
+    xs, Ps = _smoother(lag=40).smooth_sequence(zs, us)
+    assert np.allclose(xs, xs_ref)
+    assert np.allclose(Ps, Ps_ref)
+
+
+def test_lagged_estimates_use_lag_future_measurements():
+    """Test that each emitted estimate is the RTS estimate given L future measurements"""
+    _, zs, us = _sequence(T=25)
+    lag = 4
+    smoother = _smoother(lag)
+    for k in range(len(zs)):
+        x, P = smoother.step(zs[k], us[k])
+        if k + 1 < lag:
+            assert x is None
+            continue
+        xs_ref, Ps_ref = _rts(zs[: k + 1], us[: k + 1])
+        # step k+1 - lag（ステップ 0 は初期状態）
+        if k + 1 > lag:
+            assert np.allclose(x, xs_ref[k - lag])
+            assert np.allclose(P, Ps_ref[k - lag])
+    assert smoother._xf.shape == (lag + 1, 3)
+
+
+@pytest.mark.parametrize("lag", [5, 20])
+def test_smoothing_reduces_error(lag):
+    """Test that fixed-lag estimates are more accurate than filtered ones"""
+    truth, zs, us = _sequence(T=200, seed=3)
+    ekf = ExtendedKalmanFilter(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=0.1)
+    xs_filtered, Ps_filtered = ekf.filter_sequence(zs, us)
+    xs, Ps = _smoother(lag).smooth_sequence(zs, us)
+
+    def rmse(xs):
+        return np.sqrt(np.mean(np.sum((xs[:, :2] - truth[:, :2]) ** 2, axis=1)))
+
+    assert rmse(xs) < 0.8 * rmse(xs_filtered)
+    assert np.all(np.trace(Ps, axis1=1, axis2=2) <= np.trace(Ps_filtered, axis1=1, axis2=2))
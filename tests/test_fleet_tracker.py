@@ -0,0 +1,142 @@
+"""Tests for the sharded fleet tracker"""
+import collections
+import threading
+
+import numpy as np
+
+from src import backends
+from src.fleet_tracker import FleetTracker
+
+Q = np.diag([0.01, 0.01, 0.002])
+R = np.diag([0.2, 0.2, 0.05])
+
+
+def _data(T=20, N=37, seed=0):
+    rng = np.random.default_rng(seed)
+    us = np.stack([np.full((T, N), 1.0), rng.normal(0.2, 0.05, (T, N))], axis=-1)
+    zs = rng.normal(size=(T, N, 3)) * [0.5, 0.5, 0.2]
+    zs[rng.random((T, N, 3)) < 0.1] = np.nan
+    x0 = rng.normal(size=(N, 3)) * 0.1
+    return zs, us, x0
+
+
+def test_parallel_step_matches_fleet_kernel():
+    """Test that sharded parallel steps match the single batched kernel"""
+    zs, us, x0 = _data()
+    xs_ref, P_ref = backends.ekf_fleet(zs, us, Q, R, x0, np.eye(3), dt=0.1, backend="numpy")
+
+    with FleetTracker(Q, R, dt=0.1, n_shards=5, n_workers=3) as tracker:
+        ids = tracker.add_robots(x0, np.eye(3))
+        assert np.array_equal(ids, np.arange(37))
+        for k in range(len(zs)):
+            assert tracker.step(ids, us[k], zs[k]) == 37
+        robot_ids, x, P = tracker.states()
+
+    assert len(tracker) == 37
+    assert np.array_equal(robot_ids, ids)
+    assert np.allclose(x, xs_ref[-1])
+    assert np.allclose(P, P_ref)
+
+
+def test_work_stealing_on_imbalanced_shards():
+    """Test that an idle worker steals shards from the most loaded queue"""
+    zs, us, x0 = _data(T=1, N=12)
+    xs_ref, _ = backends.ekf_fleet(zs, us, Q, R, x0, np.eye(3), dt=0.1, backend="numpy")
+
+    with FleetTracker(Q, R, dt=0.1, n_shards=3, n_workers=2) as tracker:
+        tracker.add_robots(x0, np.eye(3))
+        queues = [collections.deque(tracker.shards), collections.deque()]
+        ids_sorted, order, u, z = tracker._sort_inputs(np.arange(12), us[0], zs[0])
+        assert tracker._worker(queues, 1, ids_sorted, order, u, z) == 12
+
+        assert tracker.n_steals == 3
+        assert not queues[0]
+        _, x, _ = tracker.states()
+    assert np.allclose(x, xs_ref[-1])
+
+
+def test_step_with_compact_inputs_after_churn():
+    """Test that step takes inputs for the live robot ids only, in any order"""
+    zs, us, x0 = _data(T=6, N=10)
+    xs_ref, P_ref = backends.ekf_fleet(zs, us, Q, R, x0, np.eye(3), dt=0.1, backend="numpy")
+
+    with FleetTracker(Q, R, dt=0.1, n_shards=3, n_workers=2) as tracker:
+        for _ in range(50):
+            tracker.remove_robot(tracker.add_robot(np.zeros(3), np.eye(3)))
+        ids = tracker.add_robots(x0, np.eye(3))
+        assert ids[0] == 50
+        order = np.random.default_rng(2).permutation(10)
+        for k in range(len(zs)):
+            # 配列の長さはロボット数のみ（最大の ID には依存しない）
+            assert tracker.step(ids[order], us[k, order], zs[k, order]) == 10
+        # 削除済み・未登録の ID の入力は無視される
+        assert tracker.step([3, 999], us[0, :2], zs[0, :2]) == 0
+        _, x, P = tracker.states()
+    assert np.allclose(x, xs_ref[-1])
+    assert np.allclose(P, P_ref)
+
+
+def test_concurrent_partial_updates():
+    """Test updates from several ingestion threads with per-shard locks"""
+    zs, us, x0 = _data(T=10, N=16)
+    xs_ref, P_ref = backends.ekf_fleet(zs, us, Q, R, x0, np.eye(3), dt=0.1, backend="numpy")
+
+    tracker = FleetTracker(Q, R, dt=0.1, n_shards=4, n_workers=1)
+    tracker.add_robots(x0, np.eye(3))
+
+    def ingest(robot_ids):
+        for k in range(len(zs)):
+            tracker.update(robot_ids, us[k, robot_ids], zs[k, robot_ids])
+
+    threads = [threading.Thread(target=ingest, args=(np.arange(i, 16, 4),)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    _, x, P = tracker.states()
+    assert np.allclose(x, xs_ref[-1])
+    assert np.allclose(P, P_ref)
+
+
+def test_update_races_with_removal():
+    """Test that concurrent removals never redirect an update to another robot"""
+    zs, us, x0 = _data(T=30, N=40)
+    keep = np.arange(0, 40, 2)
+    xs_ref, P_ref = backends.ekf_fleet(
+        zs[:, keep], us[:, keep], Q, R, x0[keep], np.eye(3), dt=0.1, backend="numpy"
+    )
+
+    tracker = FleetTracker(Q, R, dt=0.1, n_shards=2, n_workers=1)
+    tracker.add_robots(x0, np.eye(3))
+    removed = threading.Event()
+
+    def remove():
+        for robot_id in range(1, 40, 2):
+            tracker.remove_robot(robot_id)
+        removed.set()
+
+    thread = threading.Thread(target=remove)
+    thread.start()
+    for k in range(len(zs)):
+        tracker.update(np.arange(40), us[k], zs[k])
+    thread.join()
+
+    robot_ids, x, P = tracker.states()
+    assert removed.is_set()
+    assert np.array_equal(robot_ids, keep)
+    assert np.allclose(x, xs_ref[-1])
+    assert np.allclose(P, P_ref)
+
+
+def test_remove_robot_keeps_other_states():
+    """Test that swap-removal keeps the remaining robots addressable"""
+    tracker = FleetTracker(Q, R, n_shards=1, n_workers=1)
+    for i in range(5):
+        tracker.add_robot([float(i), 0.0, 0.0], np.eye(3))
+    tracker.remove_robot(1)
+
+    robot_ids, x, _ = tracker.states()
+    assert list(robot_ids) == [0, 2, 3, 4]
+    assert np.allclose(x[:, 0], [0.0, 2.0, 3.0, 4.0])
+    assert tracker.state(4)[0][0] == 4.0
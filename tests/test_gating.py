@@ -0,0 +1,45 @@
+"""Tests for outlier gating helpers"""
+import numpy as np
+
+from src import gating
+
+
+def test_mahalanobis_squared_batched():
+    """Test NIS computation over a batch of innovations"""
+    np.random.seed(0)
+    y = np.random.randn(5, 3)
+    A = np.random.randn(5, 3, 3)
+    S = A @ A.transpose(0, 2, 1) + np.eye(3)
+    S_inv = np.linalg.inv(S)
+
+    d2 = gating.mahalanobis_squared(y, S_inv)
+
+    assert d2.shape == (5,)
+    for i in range(5):
+        assert np.isclose(d2[i], y[i] @ np.linalg.solve(S[i], y[i]))
+
+
+def test_measurement_weight_policies():
+    """Test reject and inflate policies on a batch of distances"""
+    d2 = np.array([1.0, 20.0, 40.0])
+
+    w, gated = gating.measurement_weight(d2, 3, gate_threshold=10.0, gate_policy="reject")
+    assert np.array_equal(gated, [False, True, True])
+    assert np.allclose(w, [1.0, 0.0, 0.0])
+
+    w, _ = gating.measurement_weight(d2, 3, gate_threshold=10.0, gate_policy="inflate")
+    # 拡大後の距離 w * d2 は閾値に一致する
+    assert np.allclose(w * d2, [1.0, 10.0, 10.0])
+
+
+def test_robust_weight_fixed_point():
+    """Test that the reweighting iteration converges to the fixed point"""
+    d2 = np.array([0.5, 100.0])
+
+    w = gating.robust_weight(d2, 3, method="huber", param=2.0, iterations=50)
+    assert w[0] == 1.0
+    assert np.isclose(w[1], min(1.0, 2.0 / np.sqrt(w[1] * d2[1])))
+
+    w = gating.robust_weight(d2, 3, method="student_t", param=4.0, iterations=50)
+    assert np.isclose(w[1], (4.0 + 3) / (4.0 + w[1] * d2[1]))
+    assert 0.0 < w[1] < 1.0
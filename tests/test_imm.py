@@ -0,0 +1,48 @@
+"""Tests for IMM filter"""
+import numpy as np
+
+from src.imm import IMMFilter
+from src.robot_2d_simulator import Robot2D
+
+
+def _make_imm():
+    Q = np.diag([1e-4, 1e-4, 1e-4, 1e-3, 1e-3])
+    R = np.diag([0.01, 0.01, 0.001])
+    transition = np.array([[0.9, 0.05, 0.05], [0.05, 0.9, 0.05], [0.05, 0.05, 0.9]])
+    return IMMFilter(
+        Q=Q,
+        R=R,
+        x0=np.zeros(5),
+        P0=np.diag([0.1, 0.1, 0.1, 1.0, 1.0]),
+        transition=transition,
+        modes=("cv", "ct", "stationary"),
+        dt=0.5,
+    )
+
+
+def test_shapes_and_probabilities():
+    """Test stacked shapes and normalized mode probabilities"""
+    imm = _make_imm()
+    x, mu = imm.filter_step([0.1, 0.0, 0.0])
+
+    assert imm.xs.shape == (3, 5)
+    assert imm.Ps.shape == (3, 5, 5)
+    assert x.shape == (5,)
+    assert np.isclose(mu.sum(), 1.0)
+    assert np.allclose(imm.P, imm.P.T)
+
+
+def test_mode_switching():
+    """Test that mode probabilities follow straight / turning / stopped phases"""
+    np.random.seed(0)
+    robot = Robot2D([0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.1, 0.1, 0.03], dt=0.5)
+    imm = _make_imm()
+    phases = [([1.0, 0.0], 0), ([1.0, 0.8], 1), ([0.0, 0.0], 2)]
+
+    for u, expected in phases:
+        for _ in range(30):
+            robot.move(u)
+            imm.filter_step(robot.observe())
+        assert np.argmax(imm.mode_probabilities) == expected
+
+    assert np.linalg.norm(imm.x[:2] - robot.state[:2]) < 0.5
@@ -0,0 +1,87 @@
+"""Tests for Extended Information Filter"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from src.extended_kf import ExtendedKalmanFilter
+from src.information_filter import ExtendedInformationFilter, information_contribution
+
+Q = np.diag([0.01, 0.01, 0.001])
+R = np.diag([0.25, 0.25, 0.01])
+
+
+def test_matches_ekf():
+    """Test that the information form reproduces the EKF estimate"""
+    ekf = ExtendedKalmanFilter(Q=Q, R=R, x0=np.zeros(3), P0=np.eye(3), dt=1.0)
+    eif = ExtendedInformationFilter(Q=Q, x0=np.zeros(3), P0=np.eye(3), dt=1.0)
+
+    np.random.seed(0)
+    for i in range(30):
+        u = [1.0, 0.1]
+        z = np.array([i * 1.0, i * 0.1, 3.0]) + np.random.randn(3) * 0.1
+        ekf.filter_step(z, u)
+        eif.predict(u)
+        eif.update(z, R)
+
+        assert np.allclose(eif.x, ekf.x)
+        assert np.allclose(eif.P, ekf.P)
+
+
+def test_fusion_is_additive():
+    """Test that fusing N observations at once equals sequential EKF updates"""
+    np.random.seed(1)
+    zs = np.random.randn(5, 3) * 0.2 + np.array([1.0, 2.0, 0.5])
+    Rs = np.array([R * (i + 1) for i in range(5)])
+
+    ekf = ExtendedKalmanFilter(Q=Q, R=R, x0=np.array([1.0, 2.0, 0.5]), P0=np.eye(3), dt=1.0)
+    for z, R_i in zip(zs, Rs):
+        ekf.R = R_i
+        ekf.update(z)
+
+    eif = ExtendedInformationFilter(Q=Q, x0=np.array([1.0, 2.0, 0.5]), P0=np.eye(3), dt=1.0)
+    eif.update(zs, Rs)
+
+    assert np.allclose(eif.x, ekf.x)
+    assert np.allclose(eif.P, ekf.P)
+
+
+def test_repeated_updates_across_heading_wrap():
+    """Test consecutive updates without predict when the heading crosses +-pi"""
+    Q_wrap = np.diag([0.01, 0.01, 0.01])
+    R_wrap = np.diag([1.0, 1.0, 0.01])
+    x0 = np.array([0.0, 0.0, 3.1])
+    ekf = ExtendedKalmanFilter(Q=Q_wrap, R=R_wrap, x0=x0, P0=np.eye(3), dt=1.0)
+    eif = ExtendedInformationFilter(Q=Q_wrap, x0=x0, P0=np.eye(3), dt=1.0)
+
+    z = np.array([0.0, 0.0, -3.0])
+    for _ in range(3):
+        ekf.update(z)
+        eif.update(z, R_wrap)
+        assert np.allclose(eif.x, ekf.x)
+        assert np.allclose(eif.P, ekf.P)
+    assert ekf.x[2] < -3.0
+
+
+def test_linear_observation_matrix():
+    """Test contributions from a position-only observation matrix"""
+    H = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    R2 = np.diag([0.5, 0.5])
+    dY, dy = information_contribution(np.array([[1.0, 2.0], [3.0, 4.0]]), np.zeros(3), R2, H)
+
+    assert np.allclose(dY, np.diag([4.0, 4.0, 0.0]))
+    assert np.allclose(dy, [8.0, 12.0, 0.0])
+
+
+def test_parallel_reduction():
+    """Test that thread and process reductions match the serial update"""
+    np.random.seed(2)
+    zs = np.random.randn(64, 3) * 0.3
+    serial = ExtendedInformationFilter(Q=Q, x0=np.zeros(3), P0=np.eye(3), dt=1.0)
+    serial.update(zs, R)
+
+    for executor_cls in [ThreadPoolExecutor, ProcessPoolExecutor]:
+        eif = ExtendedInformationFilter(Q=Q, x0=np.zeros(3), P0=np.eye(3), dt=1.0)
+        with executor_cls(max_workers=2) as executor:
+            eif.update_parallel(zs, R, executor=executor, n_chunks=4)
+        assert np.allclose(eif.Y, serial.Y)
+        assert np.allclose(eif.x, serial.x)
@@ -0,0 +1,85 @@
+"""Tests for the simulated 2D lidar"""
+import numpy as np
+import pytest
+
+from src.lidar import Lidar2D, OccupancyGrid, SegmentMap
+
+ROOM = [[0, 0, 10, 0], [10, 0, 10, 10], [10, 10, 0, 10], [0, 10, 0, 0]]
+
+
+def _random_segments(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    p = rng.uniform(0, 50, (n, 2))
+    return np.hstack([p, p + rng.normal(0, 2, (n, 2))])
+
+
+def _brute_force(segments, origins, angles, max_range):
+    """全ビーム×全線分の交差を1本ずつ計算（参照実装）"""
+    ranges = np.full(len(angles), np.inf)
+    for b, ((ox, oy), a) in enumerate(zip(origins, angles)):
+        d = np.array([np.cos(a), np.sin(a)])
+        for x1, y1, x2, y2 in segments:
+            e = np.array([x2 - x1, y2 - y1])
+            w = np.array([x1 - ox, y1 - oy])
+            denom = d[0] * e[1] - d[1] * e[0]
+            if denom == 0:
+                continue
+            t = (w[0] * e[1] - w[1] * e[0]) / denom
+            s = (w[0] * d[1] - w[1] * d[0]) / denom
+            if 0 <= t <= max_range and 0 <= s <= 1:
+                ranges[b] = min(ranges[b], t)
+    return ranges
+
+
+def test_room_scan():
+    """Test ranges to the walls of a square room"""
+    lidar = Lidar2D(SegmentMap(ROOM), n_beams=4, max_range=20.0)
+    assert np.allclose(lidar.angles, [-np.pi, -np.pi / 2, 0, np.pi / 2])
+    assert np.allclose(lidar.scan([2.0, 3.0, 0.0]), [2.0, 3.0, 8.0, 7.0])
+    # 向きを変えるとビームも回転する
+    assert np.allclose(lidar.scan([2.0, 3.0, np.pi / 2]), [3.0, 8.0, 7.0, 2.0])
+    # 最大距離より遠い壁は max_range
+    short = Lidar2D(SegmentMap(ROOM), n_beams=4, max_range=5.0)
+    assert np.allclose(short.scan([2.0, 3.0, 0.0]), [2.0, 3.0, 5.0, 5.0])
+
+
+@pytest.mark.parametrize("cell_size", [None, 0.7, 5.0])
+def test_grid_acceleration_matches_brute_force(cell_size):
+    """Test that grid-culled raycasting equals checking every segment"""
+    segments = _random_segments(n=200)
+    world = SegmentMap(segments, cell_size=cell_size)
+    rng = np.random.default_rng(1)
+    origins = rng.uniform(-5, 55, (300, 2))
+    angles = rng.uniform(-np.pi, np.pi, 300)
+    # 格子線に沿ったビームも含める
+    angles[:8] = np.arange(8) * np.pi / 4
+    ranges = world.raycast(origins, angles, 15.0)
+    assert np.allclose(ranges, _brute_force(segments, origins, angles, 15.0))
+
+
+def test_occupancy_grid_raycast():
+    """Test that grid traversal stops at the first occupied cell"""
+    occupied = np.zeros((20, 20), dtype=bool)
+    occupied[[0, -1], :] = True
+    occupied[:, [0, -1]] = True
+    occupied[10, 14] = True
+    grid = OccupancyGrid(occupied, resolution=0.5)
+    lidar = Lidar2D(grid, n_beams=4, max_range=50.0)
+    # セル (14, 10) の左端は x = 7.0
+    assert np.allclose(lidar.scan([5.25, 5.25, 0.0]), [4.75, 4.75, 1.75, 4.25])
+    assert np.allclose(grid.raycast([5.25, 5.25], [np.pi / 4], 50.0), [4.25 * np.sqrt(2)])
+
+
+def test_scan_batch_and_noise():
+    """Test that batched scans match single scans and noise keeps ranges in bounds"""
+    world = SegmentMap(_random_segments())
+    lidar = Lidar2D(world, n_beams=90, fov=np.pi, max_range=10.0)
+    poses = np.column_stack([np.linspace(5, 45, 7), np.linspace(5, 45, 7), np.linspace(-3, 3, 7)])
+    batch = lidar.scan_batch(poses)
+    assert batch.shape == (7, 90)
+    assert np.allclose(batch, [lidar.scan(p) for p in poses])
+    assert np.isclose(lidar.angles[-1] - lidar.angles[0], np.pi)
+
+    np.random.seed(0)
+    noisy = Lidar2D(world, n_beams=90, max_range=10.0, noise_std=0.5).scan_batch(poses)
+    assert np.all((noisy >= 0.0) & (noisy <= 10.0))
@@ -1,13 +1,7 @@
 """Tests for Linear Kalman Filter"""
-import sys
-from pathlib import Path
-
 import numpy as np
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from linear_kf import LinearKalmanFilter
+from src.linear_kf import BatchLinearKalmanFilter, LinearKalmanFilter
 
 
 def test_initialization():
@@ -63,3 +57,71 @@ def test_multiple_steps():
         assert 0 <= K <= 1
         # Uncertainty should remain positive
         assert kf.P >= 0
+
+
+def test_batch_matches_scalar_filters():
+    """Test that each channel of the batch filter matches a scalar filter"""
+    Q = np.array([0.01, 0.1, 0.001])
+    R = np.array([0.25, 0.5, 1.0])
+    batch = BatchLinearKalmanFilter(Q=Q, R=R, x0=0.0, P0=1.0)
+    scalars = [LinearKalmanFilter(Q=q, R=r, x0=0.0, P0=1.0) for q, r in zip(Q, R)]
+
+    np.random.seed(0)
+    for i in range(20):
+        z = i + 1.0 + np.random.randn(3) * 0.5
+        x, K = batch.filter_step(z=z, u=1.0)
+        for c, kf in enumerate(scalars):
+            x_c, K_c = kf.filter_step(z=z[c], u=1.0)
+            assert np.isclose(x[c], x_c)
+            assert np.isclose(K[c], K_c)
+            assert np.isclose(batch.P[c], kf.P)
+
+
+def test_batch_masked_update():
+    """Test that masked channels only run the prediction step"""
+    batch = BatchLinearKalmanFilter(Q=0.01, R=0.25, x0=0.0, P0=1.0, n_channels=2)
+    K = batch.filter_step(z=np.array([1.0, np.nan]), u=0.5, mask=np.array([True, False]))[1]
+
+    assert K[1] == 0.0
+    assert batch.x[1] == 0.5
+    assert batch.P[1] == 1.01
+    assert 0.5 < batch.x[0] < 1.0
+
+
+def test_batch_filter_sequence():
+    """Test (T, C) block processing against step-by-step processing"""
+    np.random.seed(1)
+    zs = np.cumsum(np.ones((30, 4)), axis=0) + np.random.randn(30, 4) * 0.5
+    mask = np.random.rand(30, 4) > 0.2
+
+    block = BatchLinearKalmanFilter(Q=0.01, R=0.25, n_channels=4)
+    xs, Ks = block.filter_sequence(zs, us=1.0, mask=mask)
+
+    step = BatchLinearKalmanFilter(Q=0.01, R=0.25, n_channels=4)
+    for k in range(30):
+        x, K = step.filter_step(zs[k], u=1.0, mask=mask[k])
+        assert np.allclose(xs[k], x)
+        assert np.allclose(Ks[k], K)
+    assert xs.shape == (30, 4)
+
+
+def test_missing_observation_is_predict_only():
+    """Test that a NaN observation skips the update step"""
+    kf = LinearKalmanFilter(Q=0.01, R=0.25, x0=0.0, P0=1.0)
+    x, K = kf.filter_step(z=float("nan"), u=1.0)
+
+    assert K == 0.0
+    assert x == 1.0
+    assert kf.P == 1.01
+
+
+def test_batch_nan_and_masked_observations():
+    """Test that NaN and masked elements are treated as missing channels"""
+    z = np.ma.masked_array([1.0, 1.0, np.nan], mask=[False, True, False])
+    batch = BatchLinearKalmanFilter(Q=0.01, R=0.25, x0=0.0, P0=1.0, n_channels=3)
+    K = batch.update(z)
+
+    assert K[0] > 0.0
+    assert K[1] == 0.0 and K[2] == 0.0
+    assert np.allclose(batch.x[1:], 0.0)
+    assert np.all(np.isfinite(batch.x))
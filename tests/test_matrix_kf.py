@@ -0,0 +1,90 @@
+"""Tests for n-dimensional Matrix Kalman Filter"""
+import numpy as np
+import pytest
+
+from src.linear_kf import LinearKalmanFilter
+from src.matrix_kf import MatrixKalmanFilter, solve_dare
+
+
+def _constant_velocity(dt=0.1):
+    F = np.array([[1.0, dt], [0.0, 1.0]])
+    H = np.array([[1.0, 0.0]])
+    Q = np.diag([1e-4, 1e-2])
+    R = np.array([[0.25]])
+    return F, H, Q, R
+
+
+def test_matches_scalar_filter():
+    """Test that the 1x1 case reproduces LinearKalmanFilter"""
+    kf = LinearKalmanFilter(Q=0.01, R=0.25, x0=0.0, P0=1.0)
+    mkf = MatrixKalmanFilter(F=1.0, H=1.0, Q=0.01, R=0.25, x0=[0.0], P0=1.0, B=1.0)
+
+    np.random.seed(0)
+    for i in range(20):
+        z = i + np.random.randn() * 0.5
+        x, K = kf.filter_step(z=z, u=1.0)
+        x_m, K_m = mkf.filter_step(z=[z], u=[1.0])
+        assert np.isclose(x, x_m[0])
+        assert np.isclose(K, K_m[0, 0])
+        assert np.isclose(kf.P, mkf.P[0, 0])
+
+
+def test_constant_velocity_tracking():
+    """Test position/velocity tracking from position measurements"""
+    F, H, Q, R = _constant_velocity()
+    mkf = MatrixKalmanFilter(F, H, Q, R, x0=[0.0, 0.0], P0=np.eye(2))
+
+    np.random.seed(1)
+    for k in range(1, 300):
+        z = np.array([0.1 * k * 2.0 + np.random.randn() * 0.5])
+        mkf.filter_step(z)
+
+    # 速度 2.0 m/s を推定できる
+    assert abs(mkf.x[1] - 2.0) < 0.3
+    assert np.allclose(mkf.P, mkf.P.T)
+
+
+def test_out_argument_reuses_buffer():
+    """Test that out= writes into the provided buffer"""
+    F, H, Q, R = _constant_velocity()
+    mkf = MatrixKalmanFilter(F, H, Q, R, x0=[0.0, 1.0], P0=np.eye(2))
+    out = np.empty(2)
+    x, K = mkf.filter_step(np.array([0.5]), out=out)
+    assert x is out
+    assert np.allclose(out, mkf.x)
+    assert K.shape == (2, 1)
+
+
+def test_control_input_requires_B():
+    """Test that a control input without a B matrix is rejected instead of ignored"""
+    F, H, Q, R = _constant_velocity()
+    mkf = MatrixKalmanFilter(F, H, Q, R, x0=[0.0, 1.0], P0=np.eye(2))
+    with pytest.raises(ValueError):
+        mkf.predict(u=[1.0])
+    with pytest.raises(ValueError):
+        mkf.filter_step(np.array([0.5]), u=[1.0])
+    assert np.array_equal(mkf.x, [0.0, 1.0])
+
+
+def test_solve_dare_fixed_point():
+    """Test that the DARE solution is a fixed point of the Riccati recursion"""
+    F, H, Q, R = _constant_velocity()
+    P = solve_dare(F, H, Q, R)
+    S = H @ P @ H.T + R
+    P_next = F @ (P - P @ H.T @ np.linalg.solve(S, H @ P)) @ F.T + Q
+    assert np.allclose(P, P_next, atol=1e-10)
+
+
+def test_steady_state_gain_matches_converged_filter():
+    """Test that the steady-state gain equals the converged time-varying gain"""
+    F, H, Q, R = _constant_velocity()
+    tv = MatrixKalmanFilter(F, H, Q, R, x0=[0.0, 0.0], P0=np.eye(2))
+    ss = MatrixKalmanFilter(F, H, Q, R, x0=[0.0, 0.0], P0=np.eye(2), steady_state=True)
+
+    for _ in range(2000):
+        tv.predict()
+        tv.update(np.array([0.0]))
+
+    assert np.allclose(tv.K, ss.K, atol=1e-8)
+    ss.filter_step(np.array([0.0]))
+    assert np.allclose(tv.P, ss.P, atol=1e-8)
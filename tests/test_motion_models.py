@@ -0,0 +1,120 @@
+"""Tests for motion models"""
+import numpy as np
+import pytest
+
+from src.extended_kf import ExtendedKalmanFilter
+from src.motion_models import (
+    MOTION_MODELS,
+    euler,
+    exact_arc,
+    get_motion_model,
+    is_builtin,
+    rk4,
+    unicycle_jacobian,
+)
+from src.robot_2d_simulator import Robot2D
+
+
+def _integrate(model, state, u, dt, steps):
+    for _ in range(steps):
+        state, _ = model(state, u, dt / steps)
+    return state
+
+
+@pytest.mark.parametrize("name", sorted(MOTION_MODELS))
+def test_jacobian_matches_finite_difference(name):
+    """Test analytic Jacobians against central differences"""
+    model = MOTION_MODELS[name]
+    state = np.array([1.0, -2.0, 0.7])
+    u = [1.5, 0.4]
+    _, F = model(state, u, 0.5)
+
+    eps = 1e-6
+    F_num = np.zeros((3, 3))
+    for i in range(3):
+        d = np.zeros(3)
+        d[i] = eps
+        F_num[:, i] = (model(state + d, u, 0.5)[0] - model(state - d, u, 0.5)[0]) / (2 * eps)
+    assert np.allclose(F, F_num, atol=1e-6)
+
+
+def test_exact_arc_on_circle():
+    """Test that the exact model stays on the true circle for large dt"""
+    v, omega = 1.0, 0.5
+    state = np.zeros(3)
+    for _ in range(10):
+        state, _ = exact_arc(state, [v, omega], 1.0)
+
+    radius = v / omega
+    center = np.array([0.0, radius])
+    assert np.isclose(np.linalg.norm(state[:2] - center), radius)
+    assert np.isclose(state[2], 10 * omega * 1.0)
+
+
+def test_straight_line_limit():
+    """Test the omega -> 0 limit of the exact and RK4 models"""
+    state = np.array([0.0, 0.0, 0.3])
+    expected = np.array([2.0 * np.cos(0.3), 2.0 * np.sin(0.3), 0.3])
+    for model in [exact_arc, rk4]:
+        assert np.allclose(model(state, [1.0, 0.0], 2.0)[0], expected)
+        assert np.allclose(model(state, [1.0, 1e-12], 2.0)[0], expected)
+
+
+def test_large_step_accuracy():
+    """Test that exact / RK4 with large dt beat Euler against a fine reference"""
+    state = np.array([0.0, 0.0, 0.0])
+    u = [1.0, 0.8]
+    reference = _integrate(euler, state, u, 1.0, 10000)
+
+    err_euler = np.linalg.norm(euler(state, u, 1.0)[0][:2] - reference[:2])
+    err_exact = np.linalg.norm(exact_arc(state, u, 1.0)[0][:2] - reference[:2])
+    err_rk4 = np.linalg.norm(rk4(state, u, 1.0)[0][:2] - reference[:2])
+
+    assert err_exact < 1e-3
+    assert err_rk4 < 1e-3
+    assert err_euler > 100 * err_exact
+
+
+def test_models_shared_by_robot_and_filter():
+    """Test selecting models by name in Robot2D and the EKF"""
+    robot = Robot2D([0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], dt=1.0, motion_model="exact")
+    ekf = ExtendedKalmanFilter(
+        Q=np.eye(3) * 1e-4,
+        R=np.eye(3),
+        x0=np.zeros(3),
+        P0=np.eye(3),
+        dt=1.0,
+        motion_model="exact",
+    )
+    for _ in range(5):
+        robot.move([1.0, 0.5])
+        ekf.predict([1.0, 0.5])
+    assert np.allclose(robot.state, ekf.x)
+    assert get_motion_model(rk4) is rk4
+    with pytest.raises(ValueError):
+        get_motion_model("unknown")
+
+
+@pytest.mark.parametrize("name", sorted(MOTION_MODELS))
+def test_state_only_matches_full_call(name):
+    """Test jacobian=False and the shared unicycle Jacobian against the full call"""
+    model = MOTION_MODELS[name]
+    state = np.array([0.5, 1.0, -2.5])
+    u = [0.8, -0.6]
+    next_state, F = model(state, u, 0.3)
+    assert np.array_equal(model(state, u, 0.3, jacobian=False), next_state)
+    assert np.array_equal(unicycle_jacobian(state, next_state), F)
+
+
+def test_robot_with_custom_model_matches_builtin():
+    """Test that Robot2D gives the same path with a built-in model and a wrapping callable"""
+    assert is_builtin(euler) and not is_builtin(lambda state, u, dt: euler(state, u, dt))
+    builtin = Robot2D([0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], motion_model="rk4")
+    custom = Robot2D(
+        [0.0, 0.0, 0.0],
+        [0.0, 0.0, 0.0],
+        [0.0, 0.0, 0.0],
+        motion_model=lambda state, u, dt: rk4(state, u, dt),
+    )
+    for _ in range(5):
+        assert np.array_equal(builtin.move([1.0, 0.3]), custom.move([1.0, 0.3]))
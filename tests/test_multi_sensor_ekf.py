@@ -0,0 +1,98 @@
+"""Tests for multi-rate sensor fusion"""
+import numpy as np
+
+from src.extended_kf import ExtendedKalmanFilter
+from src.multi_sensor_ekf import MultiSensorEKF, Sensor, gnss_sensor, heading_sensor, pose_sensor
+from src.robot_2d_simulator import Robot2D
+
+Q = np.diag([0.01, 0.01, 0.001])
+
+
+def _make_filter():
+    return MultiSensorEKF(
+        Q=Q,
+        x0=np.zeros(3),
+        P0=np.eye(3),
+        dt=0.01,
+        sensors=[gnss_sensor(np.eye(2) * 0.25, rate=10.0), heading_sensor([[0.01]], rate=100.0)],
+    )
+
+
+def test_stacked_update_matches_pose_update():
+    """Test that GNSS + heading together equal a full pose update"""
+    msf = _make_filter()
+    ekf = ExtendedKalmanFilter(
+        Q=Q, R=np.diag([0.25, 0.25, 0.01]), x0=np.zeros(3), P0=np.eye(3), dt=0.01
+    )
+
+    msf.update_sensors({"gnss": [1.0, 2.0], "imu": 0.3})
+    ekf.update([1.0, 2.0, 0.3])
+
+    assert np.allclose(msf.x, ekf.x)
+    assert np.allclose(msf.P, ekf.P)
+
+
+def test_only_present_sensors_are_applied():
+    """Test that a heading-only tick applies only the heading sensor"""
+    msf = _make_filter()
+    K = msf.update_sensors({"imu": 0.5, "gnss": None})
+
+    assert K.shape == (3, 1)
+    assert np.allclose(msf.x[:2], 0.0)
+    assert msf.x[2] > 0.0
+    assert msf.update_sensors({}) is None
+    assert ("imu",) in msf._stack_cache
+
+
+def test_nonlinear_sensor_matches_linear_equivalent():
+    """Test a nonlinear range + pose update against an EKF update with stacked H and R"""
+    beacon = np.array([5.0, 0.0])
+
+    def h(x):
+        return np.array([np.hypot(*(beacon - x[:2]))])
+
+    def jacobian(x):
+        d = x[:2] - beacon
+        r = np.hypot(*d)
+        return np.array([[d[0] / r, d[1] / r, 0.0]])
+
+    x0 = np.array([1.0, 1.0, 0.0])
+    P0 = np.diag([0.5, 0.8, 0.1])
+    msf = MultiSensorEKF(Q=Q, x0=x0, P0=P0, dt=0.1)
+    msf.register_sensor(Sensor("range", [[0.04]], h=h, jacobian=jacobian))
+    msf.register_sensor(pose_sensor(np.eye(3)))
+    z_pose = np.array([1.2, 0.9, 0.1])
+    msf.update_sensors({"range": 4.0, "pose": z_pose})
+
+    # 参照: センサ名の順 (pose, range) に H を縦に並べ、R はブロック対角
+    H = np.vstack([np.eye(3), jacobian(x0)])
+    R = np.zeros((4, 4))
+    R[:3, :3] = np.eye(3)
+    R[3, 3] = 0.04
+    innovation = np.concatenate([z_pose - x0, [4.0 - h(x0)[0]]])
+    S = H @ P0 @ H.T + R
+    K = P0 @ H.T @ np.linalg.inv(S)
+    x_ref = x0 + K @ innovation
+    P_ref = (np.eye(3) - K @ H) @ P0
+
+    assert np.allclose(msf.x, x_ref)
+    assert np.allclose(msf.P, P_ref)
+
+
+def test_multi_rate_tracking():
+    """Test a 100 Hz loop with 10 Hz GNSS and 100 Hz heading"""
+    np.random.seed(0)
+    robot = Robot2D([0.0, 0.0, 0.0], [0.001, 0.001, 0.0005], [0.3, 0.3, 0.02], dt=0.01)
+    msf = _make_filter()
+
+    for k in range(1, 1001):
+        u = [1.0, 0.3]
+        robot.move(u)
+        z = robot.observe()
+        due = msf.sensors_due(k * 0.01)
+        measurements = {"imu": z[2]}
+        if "gnss" in due:
+            measurements["gnss"] = z[:2]
+        msf.step(u, measurements)
+
+    assert np.linalg.norm(msf.x[:2] - robot.state[:2]) < 0.3
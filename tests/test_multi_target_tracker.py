@@ -0,0 +1,94 @@
+"""Tests for the multi-target tracker"""
+import itertools
+
+import numpy as np
+import pytest
+
+from src.multi_target_tracker import MultiTargetTracker, hungarian
+
+Q = np.diag([0.01, 0.01, 0.002, 0.05, 0.01])
+R = np.diag([0.05, 0.05, 0.01])
+
+
+def _brute_force(cost):
+    """総当たりで求めた最小コスト（n <= m）"""
+    n, m = cost.shape
+    return min(cost[np.arange(n), cols].sum() for cols in itertools.permutations(range(m), n))
+
+
+@pytest.mark.parametrize("shape", [(4, 4), (3, 5), (5, 3)])
+def test_hungarian_matches_brute_force(shape):
+    """Test that the Hungarian solver finds the optimal assignment"""
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        cost = rng.random(shape)
+        rows, cols = hungarian(cost)
+        assert len(rows) == min(shape)
+        assert len(set(rows)) == len(rows) and len(set(cols)) == len(cols)
+        reference = _brute_force(cost if shape[0] <= shape[1] else cost.T)
+        assert np.isclose(cost[rows, cols].sum(), reference)
+
+
+def test_hungarian_skips_forbidden_pairs():
+    """Test that infinite-cost pairs are never assigned"""
+    cost = np.array([[1.0, np.inf], [np.inf, np.inf], [np.inf, 2.0]])
+    rows, cols = hungarian(cost)
+    assert rows.tolist() == [0, 2]
+    assert cols.tolist() == [0, 1]
+    assert hungarian(np.empty((0, 3)))[0].shape == (0,)
+
+
+def _trajectories(N=6, T=40, dt=0.1, seed=1):
+    """Circle-ish trajectories of N robots with noisy, shuffled observations"""
+    rng = np.random.default_rng(seed)
+    x = np.column_stack([np.arange(N) * 3.0, rng.uniform(-1, 1, N), rng.uniform(-np.pi, np.pi, N)])
+    v = rng.uniform(0.5, 1.5, N)
+    omega = rng.uniform(-0.3, 0.3, N)
+    truth, frames = [], []
+    for _ in range(T):
+        x = x.copy()
+        x[:, 0] += v * np.cos(x[:, 2]) * dt
+        x[:, 1] += v * np.sin(x[:, 2]) * dt
+        x[:, 2] = (x[:, 2] + omega * dt + np.pi) % (2 * np.pi) - np.pi
+        z = x + rng.multivariate_normal(np.zeros(3), R, N)
+        truth.append(x)
+        frames.append(z[rng.permutation(N)])
+    return truth, frames
+
+
+@pytest.mark.parametrize("association", ["gnn", "jpda"])
+def test_tracks_unlabeled_robots(association):
+    """Test that shuffled observations of several robots are tracked without label swaps"""
+    truth, frames = _trajectories()
+    tracker = MultiTargetTracker(Q, R, dt=0.1, association=association)
+    for z in frames:
+        ids, x = tracker.step(z)
+
+    assert len(ids) == 6
+    # 各トラックは最も近い真値に一意に対応し、位置誤差は小さい
+    error = np.linalg.norm(x[:, None, :2] - truth[-1][None, :, :2], axis=-1)
+    nearest = error.argmin(axis=1)
+    assert len(set(nearest.tolist())) == 6
+    assert error.min(axis=1).max() < 0.5
+    # 最初に生成されたトラックが最後まで維持される
+    assert np.array_equal(np.sort(ids), np.arange(6))
+
+
+def test_track_initiation_and_deletion():
+    """Test that tracks are confirmed after enough hits and deleted after misses"""
+    tracker = MultiTargetTracker(Q, R, dt=0.1, confirm_hits=3, max_misses=2)
+    z = np.array([[0.0, 0.0, 0.0], [10.0, 0.0, 0.0]])
+    assert len(tracker.step(z)[0]) == 0
+    assert len(tracker.step(z)[0]) == 0
+    assert tracker.step(z)[0].tolist() == [0, 1]
+
+    # 1台の観測が途絶えると max_misses 回後に削除される
+    assert tracker.step(z[:1])[0].tolist() == [0, 1]
+    assert tracker.step(z[:1])[0].tolist() == [0]
+
+    # 1回だけ現れたクラッタの仮トラックは次のフレームで消える
+    tracker.step(np.vstack([z[:1], [[50.0, 50.0, 0.0]]]))
+    assert len(tracker) == 2
+    tracker.step(z[:1])
+    assert len(tracker) == 1
+    assert tracker.cost_matrix(np.array([[0.0, 0.0, 0.0], [5.0, 5.0, 0.0]]))[0, 1] == np.inf
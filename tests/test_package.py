@@ -0,0 +1,41 @@
+"""Tests for the package public API"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+import src
+
+
+def test_public_api_is_lazy():
+    """Test that filter-only imports do not load matplotlib"""
+    code = (
+        "import sys, src; src.ExtendedKalmanFilter; src.Robot2D; "
+        "assert 'matplotlib' not in sys.modules; "
+        "assert 'src.visualizer' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_public_names_resolve():
+    """Test that every exported name resolves to its submodule object"""
+    from src.extended_kf import ExtendedKalmanFilter
+
+    assert src.ExtendedKalmanFilter is ExtendedKalmanFilter
+    for name in src.__all__:
+        if not name.startswith("visualizer"):
+            assert getattr(src, name) is not None
+    assert "ExtendedKalmanFilter" in dir(src)
+    with pytest.raises(AttributeError):
+        src.does_not_exist
+
+
+def test_distribution_package_name():
+    """Test that the project installs as kf_robot_sim rather than a top-level src package"""
+    tomllib = pytest.importorskip("tomllib")
+    root = os.path.join(os.path.dirname(__file__), "..")
+    with open(os.path.join(root, "pyproject.toml"), "rb") as f:
+        config = tomllib.load(f)["tool"]["setuptools"]
+    assert config["packages"] == ["kf_robot_sim"]
+    assert config["package-dir"] == {"kf_robot_sim": "src"}
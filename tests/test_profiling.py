@@ -0,0 +1,157 @@
+"""Tests for profiling hooks"""
+import json
+
+import numpy as np
+
+from src import profiling
+from src.extended_kf import ExtendedKalmanFilter
+from src.linear_kf import LinearKalmanFilter
+from src.motion_models import euler
+from src.robot_2d_simulator import Robot2D
+
+
+def _make_ekf():
+    return ExtendedKalmanFilter(
+        Q=np.diag([0.01, 0.01, 0.001]),
+        R=np.diag([0.25, 0.25, 0.01]),
+        x0=np.zeros(3),
+        P0=np.eye(3),
+        dt=1.0,
+    )
+
+
+def test_disabled_by_default():
+    """Test that no profiler is active outside the context manager"""
+    assert profiling.active() is None
+    ekf = _make_ekf()
+    ekf.filter_step([1.0, 0.0, 0.0], [1.0, 0.0])
+    assert profiling.active() is None
+
+
+def test_stage_timers_and_counters():
+    """Test per-stage histograms for filters and simulator"""
+    ekf = _make_ekf()
+    kf = LinearKalmanFilter(Q=0.01, R=0.25)
+    robot = Robot2D([0.0, 0.0, 0.0], [0.01, 0.01, 0.001], [0.1, 0.1, 0.01])
+
+    with profiling.profile() as prof:
+        for _ in range(5):
+            ekf.filter_step(robot.observe(), [1.0, 0.1])
+            kf.filter_step(1.0, 1.0)
+            robot.move([1.0, 0.1])
+
+    assert profiling.active() is None
+    assert prof.counters["ekf.predict"] == 5
+    assert prof.counters["ekf.update"] == 5
+    assert prof.counters["linear_kf.update"] == 5
+    assert prof.counters["robot2d.move"] == 5
+    for stage in [
+        "ekf.predict.motion",
+        "ekf.predict.jacobian",
+        "ekf.predict.covariance",
+        "ekf.update.gain",
+        "ekf.update.covariance",
+        "linear_kf.update.gain",
+        "robot2d.move.noise",
+    ]:
+        assert prof.histograms[stage].count == 5
+        assert prof.histograms[stage].total_ns >= 0
+
+
+def test_custom_motion_model_stages():
+    """Test that a callable motion model is timed as a single motion stage"""
+    ekf = ExtendedKalmanFilter(
+        Q=np.diag([0.01, 0.01, 0.001]),
+        R=np.diag([0.25, 0.25, 0.01]),
+        x0=np.zeros(3),
+        P0=np.eye(3),
+        dt=1.0,
+        motion_model=lambda state, u, dt: euler(state, u, dt),
+    )
+    with profiling.profile() as prof:
+        ekf.predict([1.0, 0.1])
+    assert prof.histograms["ekf.predict.motion"].count == 1
+    assert "ekf.predict.jacobian" not in prof.histograms
+    assert prof.histograms["ekf.predict.covariance"].count == 1
+
+
+def test_linear_kf_missing_measurement_is_counted():
+    """Test that skipped updates for missing measurements are still timed and counted"""
+    kf = LinearKalmanFilter(Q=0.01, R=0.25)
+    with profiling.profile() as prof:
+        for z in [1.0, float("nan"), np.ma.masked, 2.0]:
+            kf.filter_step(z, 1.0)
+    assert prof.counters["linear_kf.update"] == 4
+    assert prof.counters["linear_kf.update.missing"] == 2
+    assert prof.histograms["linear_kf.update.missing"].count == 2
+    assert prof.histograms["linear_kf.update.gain"].count == 2
+
+
+def test_sample_every():
+    """Test that only every N-th call is timed"""
+    kf = LinearKalmanFilter(Q=0.01, R=0.25)
+    with profiling.profile(sample_every=4) as prof:
+        for _ in range(8):
+            kf.predict(1.0)
+    assert prof.counters["linear_kf.predict"] == 8
+    assert prof.histograms["linear_kf.predict"].count == 2
+
+
+def test_histogram_buckets():
+    """Test histogram bucketing and quantiles"""
+    hist = profiling.Histogram(min_exp=2, max_exp=4)
+    for ns in [1, 3, 5, 9, 100]:
+        hist.record(ns)
+    # buckets: <=4, <=8, <=16, +Inf
+    assert hist.counts == [2, 1, 1, 1]
+    assert hist.count == 5
+    assert hist.min_ns == 1
+    assert hist.max_ns == 100
+    assert hist.quantile(0.4) == 4.0
+    assert hist.quantile(1.0) == 100.0
+
+
+def test_histogram_bucket_boundaries():
+    """Test that a power-of-two sample falls in the bucket whose upper bound equals it"""
+    hist = profiling.Histogram(min_exp=2, max_exp=4)
+    for ns in [0, 4, 5, 8, 9, 16, 17]:
+        hist.record(ns)
+    # buckets: <=4, <=8, <=16, +Inf
+    assert hist.counts == [2, 2, 2, 1]
+    assert hist.quantile(2 / 7) == 4.0
+    assert hist.quantile(6 / 7) == 16.0
+
+    default = profiling.Histogram()
+    default.record(64)
+    default.record(1 << 30)
+    assert default.counts[0] == 1
+    assert default.counts[-2] == 1 and default.counts[-1] == 0
+
+
+def test_export_json_and_prometheus(tmp_path):
+    """Test JSON and Prometheus text exports"""
+    ekf = _make_ekf()
+    with profiling.profile() as prof:
+        ekf.filter_step([1.0, 0.0, 0.0], [1.0, 0.0])
+
+    json_path = tmp_path / "profile.json"
+    prom_path = tmp_path / "profile.prom"
+    prof.to_json(str(json_path))
+    prof.to_prometheus(str(prom_path))
+
+    data = json.loads(json_path.read_text())
+    assert data["counters"]["ekf.predict"] == 1
+    assert data["stages"]["ekf.update.gain"]["count"] == 1
+
+    text = prom_path.read_text()
+    assert "# TYPE kalman_stage_duration_seconds histogram" in text
+    assert 'kalman_calls_total{name="ekf.update"} 1' in text
+    assert 'kalman_stage_duration_seconds_bucket{stage="ekf.update.gain",le="+Inf"} 1' in text
+
+
+def test_cprofile():
+    """Test optional cProfile collection"""
+    kf = LinearKalmanFilter(Q=0.01, R=0.25)
+    with profiling.profile(use_cprofile=True) as prof:
+        kf.filter_step(1.0, 1.0)
+    assert prof.cprofile_stats is not None
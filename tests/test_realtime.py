@@ -0,0 +1,132 @@
+"""Tests for the fixed-rate real-time runner"""
+import numpy as np
+import pytest
+
+from src import profiling
+from src.extended_kf import ExtendedKalmanFilter
+from src.realtime import RealTimeRunner
+
+
+class FakeClock:
+    """sleep とコールバックの処理時間だけ進む時計 (ns)"""
+
+    def __init__(self):
+        self.now = 1_000_000
+
+    def __call__(self):
+        # ビジーウェイトでも進むよう、読み出しごとに 1 µs 進める
+        self.now += 1_000
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += int(seconds * 1e9)
+
+
+def _runner(durations, policy, clock, **kwargs):
+    """ティックごとの処理時間 (ms) を与えたランナ（100 Hz）"""
+    calls = []
+
+    def step(k, n):
+        calls.append((k, n))
+        clock.now += int(durations.get(k, 1) * 1e6)
+
+    runner = RealTimeRunner(
+        step, 100.0, overrun_policy=policy, clock=clock, sleep=clock.sleep, **kwargs
+    )
+    return runner, calls
+
+
+def test_deadlines_do_not_drift():
+    """Test that ticks start on absolute deadlines with bounded latency"""
+    clock = FakeClock()
+    runner, calls = _runner({}, "catch_up", clock)
+    start = clock.now
+    assert runner.run(n_ticks=50) == 50
+    assert [k for k, _ in calls] == list(range(50))
+    # 50 ティック目の終了は開始から約 50 周期後（誤差が累積しない）
+    assert abs(clock.now - start - 49 * 10_000_000 - 1_000_000) < 200_000
+    assert runner.n_overruns == 0
+    assert runner.latency.max_ns < 10_000
+    assert runner.jitter.count == 49
+
+    # duration はティック数に換算する（100 Hz で 0.1 s は 10 ティック）
+    assert runner.run(duration=0.1) == 10
+    assert runner.run(n_ticks=3, duration=0.1) == 3
+
+
+@pytest.mark.parametrize(
+    "policy, expected_calls, skipped, coalesced",
+    [
+        ("catch_up", [(k, 1) for k in range(10)], 0, 0),
+        ("skip", [(0, 1), (1, 1), (2, 1), (5, 1), (6, 1), (7, 1), (8, 1), (9, 1)], 2, 0),
+        ("coalesce", [(0, 1), (1, 1), (2, 1), (5, 3), (6, 1), (7, 1), (8, 1), (9, 1)], 0, 2),
+    ],
+)
+def test_overrun_policies(policy, expected_calls, skipped, coalesced):
+    """Test that a long tick is counted as an overrun and late ticks are skipped or coalesced"""
+    clock = FakeClock()
+    runner, calls = _runner({2: 35}, policy, clock)
+    with profiling.profile() as prof:
+        runner.run(n_ticks=10)
+
+    assert calls == expected_calls
+    assert runner.n_skipped == skipped
+    assert runner.n_coalesced == coalesced
+    assert runner.n_overruns >= 1
+    assert prof.counters["realtime.overrun"] == runner.n_overruns
+    summary = runner.summary()
+    assert summary["ticks"] == 10 and summary["calls"] == len(expected_calls)
+    assert summary["latency"]["max_ns"] >= 5_000_000
+
+
+def test_drives_filter_on_real_clock():
+    """Test a short run of EKF steps against the real monotonic clock"""
+    rng = np.random.default_rng(0)
+    zs = rng.normal(size=(20, 3))
+    ekf = ExtendedKalmanFilter(Q=np.eye(3) * 0.01, R=np.eye(3) * 0.1, x0=np.zeros(3), P0=np.eye(3))
+    runner = RealTimeRunner(lambda k, n: ekf.filter_step(zs[k], [1.0, 0.1]), rate_hz=1000.0)
+    assert runner.run(n_ticks=20) == 20
+    assert runner.execution.count == 20
+    assert runner.summary()["execution"]["p50_ns"] > 0
+    with pytest.raises(ValueError):
+        runner.run()
+    with pytest.raises(ValueError):
+        RealTimeRunner(lambda k, n: None, 100.0, overrun_policy="drop")
+
+
+def test_summary_uses_raw_samples():
+    """Test that summary percentiles come from the samples, not power-of-two bucket bounds"""
+    clock = FakeClock()
+    # 処理時間 3 ms は 2**21 < 3e6 < 2**22 ns で、バケット上限（約 4.19 ms）とずれる
+    runner, _ = _runner({k: 3 for k in range(20)}, "catch_up", clock)
+    runner.run(n_ticks=20)
+    summary = runner.summary()
+    execution = summary["execution"]
+    # 時計は読み出しごとに 1 µs 進む
+    assert 3_000_000 <= execution["p50_ns"] <= 3_010_000
+    assert 3_000_000 <= execution["p99_ns"] <= 3_010_000
+    assert runner.execution.quantile(0.5) == float(1 << 22)
+    assert summary["overruns"] == 0 and summary["overrun_fraction"] == 0.0
+
+    runner, _ = _runner({0: 15}, "catch_up", clock)
+    runner.run(n_ticks=1)
+    summary = runner.summary()
+    assert summary["overrun_fraction"] == 1.0
+    assert summary["execution"]["p50_ns"] >= 15_000_000
+    assert summary["jitter"] == {"mean_ns": None, "p50_ns": None, "p99_ns": None, "max_ns": None}
+
+
+def test_raw_samples_are_bounded():
+    """Test that raw samples are kept in a fixed-size window of the latest calls"""
+    clock = FakeClock()
+    # 最初の 10 ティックは 5 ms、残りは 1 ms
+    runner, _ = _runner({k: 5 for k in range(10)}, "catch_up", clock, sample_capacity=8)
+    runner.run(n_ticks=30)
+    assert len(runner.samples["execution"]) == 8
+    assert runner.samples["execution"].total == 30
+    summary = runner.summary()
+    # 分位点は直近 8 回分、最大値は全期間
+    assert summary["execution"]["p99_ns"] < 2_000_000
+    assert summary["execution"]["max_ns"] >= 5_000_000
+    with pytest.raises(ValueError):
+        RealTimeRunner(lambda k, n: None, 100.0, sample_capacity=0)
@@ -0,0 +1,34 @@
+"""Tests for the fixed-capacity ring buffer"""
+import numpy as np
+import pytest
+
+from src.ring_buffer import RingBuffer
+
+
+def test_ring_buffer_wraps_around():
+    """Test that the oldest items are overwritten in order"""
+    buffer = RingBuffer(3, (2,))
+    for k in range(5):
+        buffer.append([k, -k])
+
+    assert len(buffer) == 3
+    assert buffer.total == 5
+    assert np.array_equal(np.asarray(buffer)[:, 0], [2, 3, 4])
+    assert buffer[0][0] == 2
+    assert buffer[-1][0] == 4
+    assert np.array_equal(buffer[1:][:, 0], [3, 4])
+    assert [item[0] for item in buffer] == [2, 3, 4]
+    with pytest.raises(IndexError):
+        buffer[3]
+
+
+def test_ring_buffer_truncate():
+    """Test discarding the newest items"""
+    buffer = RingBuffer(4)
+    for k in range(6):
+        buffer.append(k)
+
+    buffer.truncate(5)
+    assert list(np.asarray(buffer)) == [2, 3, 4]
+    buffer.truncate(1)
+    assert len(buffer) == 0
@@ -1,14 +1,8 @@
 """Tests for Robot Simulators"""
-import sys
-from pathlib import Path
-
 import numpy as np
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from robot_2d_simulator import Robot2D
-from robot_simulator import Robot1D
+from src.robot_2d_simulator import Robot2D
+from src.robot_simulator import Robot1D
 
 
 def test_robot1d_initialization():
@@ -143,3 +137,45 @@ def test_robot2d_angle_normalization():
     robot.state[2] = -np.pi
     robot.move(control_input=[0.0, 0.0])
     assert -np.pi <= robot.state[2] <= np.pi
+
+
+def test_robot2d_bounded_history():
+    """Test that a ring-buffer history keeps memory constant"""
+    robot = Robot2D(
+        initial_state=[0.0, 0.0, 0.0],
+        process_noise_std=[0.0, 0.0, 0.0],
+        observation_noise_std=[0.0, 0.0, 0.0],
+        history_capacity=10,
+    )
+    for _ in range(100):
+        robot.move(control_input=[1.0, 0.0])
+
+    states = np.array(robot.state_history)
+    assert states.shape == (10, 3)
+    assert np.allclose(states[:, 0], np.arange(91, 101))
+    assert len(robot.observation_history) == 10
+
+
+def test_robot2d_history_free_mode():
+    """Test that move does not draw observations when history is disabled"""
+    np.random.seed(0)
+    robot = Robot2D(
+        initial_state=[0.0, 0.0, 0.0],
+        process_noise_std=[0.1, 0.1, 0.01],
+        observation_noise_std=[0.5, 0.5, 0.05],
+        history_capacity=0,
+        record_observations=False,
+    )
+    states = [robot.move(control_input=[1.0, 0.1]) for _ in range(5)]
+    assert robot.state_history is None
+
+    # 観測を生成しない場合、乱数はプロセスノイズのみで消費される
+    np.random.seed(0)
+    noise = np.random.randn(5, 3) * [0.1, 0.1, 0.01]
+    expected = []
+    x, y, theta = 0.0, 0.0, 0.0
+    for i in range(5):
+        # オイラー積分 (dt=1) の後にプロセスノイズを加える
+        x, y, theta = np.array([x + np.cos(theta), y + np.sin(theta), theta + 0.1]) + noise[i]
+        expected.append([x, y, theta])
+    assert np.allclose(states, expected)
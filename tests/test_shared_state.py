@@ -0,0 +1,74 @@
+"""Tests for the shared-memory fleet state"""
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from src.shared_state import SharedFleetState
+
+
+def _fleet(version, N=8):
+    x = np.full((N, 3), float(version))
+    P = np.full((N, 3, 3), float(version))
+    return x, P
+
+
+def _reader(name, n_reads, queue):
+    """子プロセス: 読み出した各版の内容が一貫しているかを確認"""
+    state = SharedFleetState.attach(name)
+    consistent = True
+    versions = []
+    for _ in range(n_reads):
+        version, x, P, t = state.read()
+        consistent &= bool(np.all(x == version) and np.all(P == version) and np.all(t == version))
+        versions.append(version)
+    state.close()
+    queue.put((consistent, versions[-1]))
+
+
+def test_publish_and_read():
+    """Test publishing and reading copies and zero-copy snapshots"""
+    with SharedFleetState.create(8) as writer:
+        reader = SharedFleetState.attach(writer.name)
+        assert reader.n_robots == 8
+        assert reader.version == 0
+
+        x, P = _fleet(1)
+        assert writer.publish(x, P, 1.0) == 1
+        version, x_r, P_r, t_r = reader.read()
+        assert version == 1
+        assert np.array_equal(x_r, x)
+        assert np.array_equal(P_r, P)
+        assert np.all(t_r == 1.0)
+
+        snap = reader.snapshot()
+        assert np.shares_memory(snap.x, reader._slots)
+        writer.publish(*_fleet(2), 2.0)
+        assert snap.valid()
+        writer.publish(*_fleet(3), 3.0)
+        assert not snap.valid()
+        del snap
+        reader.close()
+
+
+def test_concurrent_reader_process_sees_consistent_versions():
+    """Test that a reader process never observes a torn update"""
+    ctx = multiprocessing.get_context("spawn")
+    with SharedFleetState.create(64, n_buffers=3) as writer:
+        writer.publish(*_fleet(1, 64), 1.0)
+        queue = ctx.Queue()
+        process = ctx.Process(target=_reader, args=(writer.name, 2000, queue))
+        process.start()
+        for version in range(2, 3000):
+            writer.publish(*_fleet(version, 64), float(version))
+        consistent, last = queue.get(timeout=60)
+        process.join(timeout=60)
+
+    assert consistent
+    assert last >= 1
+
+
+def test_invalid_arguments():
+    """Test buffer count validation"""
+    with pytest.raises(ValueError):
+        SharedFleetState.create(4, n_buffers=1)
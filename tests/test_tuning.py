@@ -0,0 +1,63 @@
+"""Tests for noise parameter tuning"""
+import numpy as np
+
+from src.robot_2d_simulator import Robot2D
+from src.tuning import evaluate_parameters, tune_noise_parameters
+
+
+def _linear_data(T=200):
+    np.random.seed(0)
+    truth = np.cumsum(1.0 + np.random.randn(T) * 0.1)
+    zs = truth + np.random.randn(T) * 0.5
+    return truth, zs, np.ones(T)
+
+
+def test_grid_search_finds_reasonable_parameters():
+    """Test that grid search prefers parameters near the true noise levels"""
+    truth, zs, us = _linear_data()
+    result = tune_noise_parameters(truth, zs, us, space={"Q": (1e-4, 1.0), "R": (1e-2, 10.0)})
+
+    assert len(result.table) == 25
+    assert result.table[0]["score"] == result.best_score
+    assert result.best_score <= min(row["score"] for row in result.table)
+    good = evaluate_parameters({"Q": 0.01, "R": 0.25}, truth, zs, us)
+    assert result.best_score <= good * 1.1
+
+
+def test_cache_skips_finished_evaluations(tmp_path):
+    """Test that a repeated search is served from the cache"""
+    truth, zs, us = _linear_data(100)
+    cache = str(tmp_path / "cache.json")
+
+    first = tune_noise_parameters(truth, zs, us, method="random", n_samples=8, cache_path=cache)
+    second = tune_noise_parameters(truth, zs, us, method="random", n_samples=8, cache_path=cache)
+
+    assert first.n_cached == 0
+    assert second.n_cached == 8
+    assert second.best_params == first.best_params
+
+
+def test_nelder_mead_parallel_2d():
+    """Test Nelder-Mead search with worker processes on 2D data"""
+    np.random.seed(1)
+    robot = Robot2D([0.0, 0.0, 0.0], [0.05, 0.05, 0.02], [0.3, 0.3, 0.1])
+    us = np.tile([1.0, 0.1], (60, 1))
+    truth = np.array([robot.move(u) for u in us])
+    zs = np.array(robot.observation_history[1:])
+
+    bases = {"Q": np.diag([0.05**2, 0.05**2, 0.02**2]), "R": np.diag([0.3**2, 0.3**2, 0.1**2])}
+    result = tune_noise_parameters(
+        truth,
+        zs,
+        us,
+        space={"Q": (0.01, 100.0), "R": (0.01, 100.0)},
+        method="nelder-mead",
+        max_iter=15,
+        n_workers=2,
+        x0=np.zeros(3),
+        bases=bases,
+    )
+
+    start = evaluate_parameters({"Q": 1.0, "R": 1.0}, truth, zs, us, x0=np.zeros(3), bases=bases)
+    assert result.best_score <= start
+    assert set(result.best_params) == {"Q", "R"}